@@ -4,28 +4,124 @@ BOOK_WIDTH = 114
 # every Minecraft book page has a height of 14 lines
 BOOK_HEIGHT = 14
 
+# a written book can have at most 100 pages, so a longer text is split into volumes, titled like this
+BOOK_MAX_PAGES = 100
+VOLUME_TITLE = "{BOOK_TITLE} (Vol. {VOLUME})"
+
+# a written book's title can be at most 32 characters long, so a long title is shortened to fit a volume's number
+BOOK_MAX_TITLE_LENGTH = 32
+
 # latest supported MC version
 DEFAULT_MC_VERSION = "1.21.5"
 
 # default file names
 DEFAULT_INPUT_FILE = "text.txt"
 DEFAULT_OUTPUT_FILE = "makebook.mcfunction"
+DEFAULT_SOCKET_FILE = "book_server.sock"
+
+# how often (in seconds) --watch checks the input file for changes, and how long it waits for the
+# file to stop changing before converting it, so an editor saving in several writes only causes one conversion
+WATCH_POLL_INTERVAL = 0.1
+WATCH_SETTLE_TIME = 0.05
+
+# how many documents (or commands) --pipeline lets wait between its reading, converting and writing threads,
+# and how many characters its reading thread reads at a time
+PIPELINE_QUEUE_SIZE = 16
+PIPELINE_READ_SIZE = 1 << 20
+
+# the data pack namespace sharded function files are called from
+DEFAULT_FUNCTION_NAMESPACE = "minecraft"
+
+# the beginning of a book's contents (its pages, title and author)
+BOOK_CONTENT_START = "{pages:["
+
+BOOK_CONTENT_END = '],title:"{BOOK_TITLE}",author:"{BOOK_AUTHOR}"}'
 
 # the beginning of the give command, depending on Minecraft version
 COMMAND_START = {
-    "1.21.0": "give @p written_book[written_book_content={pages:['",
-    "1.20.5": "give @p written_book[written_book_content={pages:['[[\"",
-    "1.4.2": 'give @p written_book{pages:[\'{"text":"',
+    "1.20.5": "give @p written_book[written_book_content=" + BOOK_CONTENT_START,
+    "1.4.2": "give @p written_book" + BOOK_CONTENT_START,
 }
 
-COMMAND_NEW_PAGE = {"1.21.0": "','", "1.20.5": "\"]]','[[\"", "1.4.2": '"}\',\'{"text":"'}
+COMMAND_END = {"1.20.5": BOOK_CONTENT_END + "]", "1.4.2": BOOK_CONTENT_END}
+
+# the quotes each page can be written in, depending on Minecraft version: for each quote, the page's start and end,
+# and how a ' and a " in the page's text are written inside it
+PAGE_QUOTES = {
+    "1.21.0": {"'": ("'", "'", "\\'", '"'), '"': ('"', '"', "'", '\\"')},
+    "1.20.5": {"'": ("'[[\"", "\"]]'", "\\'", '\\\\"'), '"': ('"[[\\"', '\\"]]"', "'", '\\\\\\"')},
+    "1.4.2": {
+        "'": ('\'{"text":"', "\"}'", "\\'", '\\\\"'),
+        '"': ('"{\\"text\\":\\"', '\\"}"', "'", '\\\\\\"'),
+    },
+}
+
+# how many books fit in a chest or shulker box
+CONTAINER_SIZE = 27
+
+# the containers books can be bundled in
+CONTAINERS = ("chest", "trapped_chest", "barrel", "shulker_box")
+
+# the block state of each container when it's placed by a structure
+CONTAINER_PROPERTIES = {
+    "chest": {"facing": "north", "type": "single", "waterlogged": "false"},
+    "trapped_chest": {"facing": "north", "type": "single", "waterlogged": "false"},
+    "barrel": {"facing": "up", "open": "false"},
+    "shulker_box": {"facing": "up"},
+}
 
-COMMAND_END = {
-    "1.21.0": "'],title:\"{BOOK_TITLE}" + '",author:"' + "{BOOK_AUTHOR}" + '"}]',
-    "1.20.5": '"]]\'],title:"' + "{BOOK_TITLE}" + '",author:"' + "{BOOK_AUTHOR}" + '"}]',
-    "1.4.2": '"}\'],title:"' + "{BOOK_TITLE}" + '",author:"' + "{BOOK_AUTHOR}" + '"}',
+# the beginning and end of a command that gives a container item full of books, depending on Minecraft version
+CONTAINER_GIVE_START = {
+    "1.20.5": "give @p {CONTAINER}[container=[",
+    "1.4.2": "give @p {CONTAINER}{BlockEntityTag:{Items:[",
 }
 
+CONTAINER_GIVE_END = {"1.20.5": "]]", "1.4.2": "]}}"}
+
+# each book in a container item, in the slot {SLOT}, with the contents {BOOK}
+CONTAINER_GIVE_BOOK = {
+    "1.20.5": '{slot:{SLOT},item:{id:"minecraft:written_book",count:1,'
+    + 'components:{"minecraft:written_book_content":{BOOK}}}}',
+    "1.4.2": '{Slot:{SLOT}b,id:"minecraft:written_book",Count:1b,tag:{BOOK}}',
+}
+
+# the beginning and end of a command that places a container full of books above the player
+CONTAINER_SETBLOCK_START = {"1.4.2": "setblock ~ ~1 ~ {CONTAINER}{Items:["}
+
+CONTAINER_SETBLOCK_END = {"1.4.2": "]}"}
+
+# each book in a placed container, in the slot {SLOT}, with the contents {BOOK}
+CONTAINER_SETBLOCK_BOOK = {
+    "1.20.5": '{Slot:{SLOT}b,id:"minecraft:written_book",count:1,components:{"minecraft:written_book_content":{BOOK}}}',
+    "1.4.2": '{Slot:{SLOT}b,id:"minecraft:written_book",Count:1b,tag:{BOOK}}',
+}
+
+# how each page is stored in a book item's NBT, where {TEXT} is the page's text and {JSON} is it as a JSON string
+NBT_PAGE_FORMAT = {"1.21.0": "{TEXT}", "1.20.5": "[[{JSON}]]", "1.4.2": '{"text":{JSON}}'}
+
+# the data version saved in structure files, depending on Minecraft version (structures can't be loaded before 1.13)
+DATA_VERSIONS = {
+    "1.13": 1519,
+    "1.14": 1952,
+    "1.15": 2225,
+    "1.16": 2566,
+    "1.17": 2724,
+    "1.18": 2860,
+    "1.19": 3105,
+    "1.20": 3463,
+    "1.20.5": 3837,
+    "1.21": 3953,
+    "1.21.2": 4080,
+    "1.21.4": 4189,
+    "1.21.5": 4325,
+}
+
+# items store their data as components, rather than an NBT tag, from this version on
+ITEM_COMPONENTS_MIN_VERSION = "1.20.5"
+
+# loot tables can only set a book's pages from this version on
+LOOT_TABLE_MIN_VERSION = "1.20.5"
+
 ESCAPE_CHARS = {
     "1.21.0": "\\",
     "1.4.2": "\\\\",
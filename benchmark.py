@@ -0,0 +1,344 @@
+"""
+Times the book generator on synthetic documents, to check that the faster code paths
+are actually faster. Every comparison also checks that each path produces identical books.
+
+Run `python benchmark.py` to run every benchmark, or name the ones to run.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import warnings
+from collections.abc import Callable
+
+from CONSTANTS import BOOK_END, DEFAULT_MC_VERSION
+from minecraft_book_generator import (
+    UnrecognizedCharacterWarning,
+    estimate,
+    iter_books_from_file,
+    text_to_book,
+    text_to_many_books,
+)
+
+LATIN_WORDS = (
+    "the of and to in a is that for it as was with be by on not he I this are or his from at which but have an they "
+    "you were her she there been one all we their has would when if so no what up out said about into than them can "
+    "only other time new some could these two may first then do any like my now over such our man me even most made "
+    "after also did many before must through back years where much your way well down should because each just those "
+    "people how too little state good very make world still own see men work long get here between both life being "
+    "under never day same another know while last might us great old year off come since against go came right used "
+    "take three Minecraft book library chapter adventure"
+).split()
+
+
+def latin_prose(num_words: int, seed: int = 0) -> str:
+    """
+    Generate English-looking prose with punctuation, quotes, and paragraphs.
+
+    Parameters
+    ----------
+    num_words: int
+        The number of words to generate.
+
+    seed: int
+        The seed for the random number generator, so runs are comparable.
+
+    Returns
+    -------
+    str
+        The generated prose.
+    """
+
+    rng = random.Random(seed)
+    words = []
+    for i in range(num_words):
+        word = rng.choice(LATIN_WORDS)
+        roll = rng.random()
+        if roll < 0.08:
+            word += ","
+        elif roll < 0.12:
+            word += "."
+        elif roll < 0.14:
+            word = f'"{word}"'
+        elif roll < 0.15:
+            word += "'s"
+        words.append(word)
+        if rng.random() < 0.01:
+            words.append("\n\n")
+    return " ".join(words)
+
+
+def cjk_prose(num_characters: int, punctuated: bool = True, seed: int = 0) -> str:
+    """
+    Generate Chinese-looking prose: runs of ideographs with full-width punctuation and paragraphs.
+
+    Parameters
+    ----------
+    num_characters: int
+        The number of characters to generate.
+
+    punctuated: bool
+        Whether to include punctuation, which isn't in the built-in width table.
+
+    seed: int
+        The seed for the random number generator, so runs are comparable.
+
+    Returns
+    -------
+    str
+        The generated prose.
+    """
+
+    rng = random.Random(seed)
+    characters = []
+    for i in range(num_characters):
+        roll = rng.random()
+        if roll < 0.09 and not punctuated:
+            characters.append(chr(rng.randint(0x4E00, 0x9FA5)))
+        elif roll < 0.06:
+            characters.append("，")
+        elif roll < 0.09:
+            characters.append("。")
+        elif roll < 0.095:
+            characters.append("\n")
+        else:
+            characters.append(chr(rng.randint(0x4E00, 0x9FA5)))
+    return "".join(characters)
+
+
+def long_token(num_characters: int, seed: int = 0) -> str:
+    """
+    Generate one enormous word with no spaces, like a hex dump or a pasted URL, with occasional escaped characters.
+
+    Parameters
+    ----------
+    num_characters: int
+        The number of characters to generate.
+
+    seed: int
+        The seed for the random number generator, so runs are comparable.
+
+    Returns
+    -------
+    str
+        The generated word.
+    """
+
+    rng = random.Random(seed)
+    return "".join(rng.choice("0123456789abcdef" * 8 + "\\\"'") for _ in range(num_characters))
+
+
+def time_call(function: Callable[[], str], repeat: int) -> tuple[float, str]:
+    """
+    Time the fastest of several calls to a function.
+
+    Parameters
+    ----------
+    function: Callable[[], str]
+        The function to time.
+
+    repeat: int
+        How many times to call it.
+
+    Returns
+    -------
+    tuple[float, str]
+        The fastest time in seconds, and what the function returned.
+    """
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(name: str, candidates: dict[str, Callable[[], str]], repeat: int) -> None:
+    """
+    Time several ways of generating the same books, print how they compare, and check they match.
+
+    Parameters
+    ----------
+    name: str
+        The name of the benchmark.
+
+    candidates: dict[str, Callable[[], str]]
+        Each way of generating the books, the first one being the baseline.
+
+    repeat: int
+        How many times to time each candidate.
+    """
+
+    print(name)
+    baseline_time, baseline_result = None, None
+    for label, function in candidates.items():
+        seconds, result = time_call(function, repeat)
+        if baseline_time is None:
+            baseline_time, baseline_result = seconds, result
+        status = "" if result == baseline_result else "  OUTPUT DIFFERS"
+        print(f"  {label:<30} {seconds * 1000:9.1f} ms  {baseline_time / seconds:5.2f}x{status}")
+
+
+class NonAsciiStr(str):
+    """
+    A string that claims not to be ASCII, to force the general (non-ASCII) path on ASCII text.
+    """
+
+    def isascii(self) -> bool:
+        return False
+
+
+def benchmark_ascii(repeat: int) -> None:
+    """
+    Compare the pure-ASCII fast path against the general path on Latin prose.
+    """
+
+    prose = latin_prose(200_000)
+
+    compare(
+        "Latin prose, 200,000 words",
+        {
+            "general path": lambda: text_to_book(NonAsciiStr(prose), "", "", DEFAULT_MC_VERSION),
+            "general path, translate engine": lambda: text_to_book(
+                NonAsciiStr(prose), "", "", DEFAULT_MC_VERSION, engine="translate"
+            ),
+            "ASCII fast path": lambda: text_to_book(prose, "", "", DEFAULT_MC_VERSION),
+        },
+        repeat,
+    )
+
+
+def benchmark_cjk(repeat: int) -> None:
+    """
+    Time Chinese prose, which is laid out in long runs of characters with the same width.
+    """
+
+    for punctuated in (False, True):
+        prose = cjk_prose(500_000, punctuated)
+
+        # punctuation missing from the width table is warned about, which isn't what's being checked
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UnrecognizedCharacterWarning)
+            compare(
+                f"Chinese prose, 500,000 characters{', punctuated' if punctuated else ''}",
+                {
+                    "default engine": lambda: text_to_book(prose, "", "", DEFAULT_MC_VERSION),
+                    "translate engine": lambda: text_to_book(prose, "", "", DEFAULT_MC_VERSION, engine="translate"),
+                },
+                repeat,
+            )
+
+
+def benchmark_long_tokens(repeat: int) -> None:
+    """
+    Time words far longer than a line, which are wrapped with prefix sums and binary search.
+    """
+
+    token = long_token(1_000_000)
+
+    compare(
+        "One 1,000,000 character word",
+        {
+            "ASCII fast path": lambda: text_to_book(token, "", "", DEFAULT_MC_VERSION),
+            "general path": lambda: text_to_book(NonAsciiStr(token), "", "", DEFAULT_MC_VERSION),
+        },
+        repeat,
+    )
+
+
+def benchmark_jobs(repeat: int) -> None:
+    """
+    Compare converting many books one at a time against converting them in several processes or threads.
+
+    Threads can only convert books at once on free-threaded Python (3.13t and later), so run this with both kinds of
+    Python to see what threads gain. With the GIL, threads are no faster than converting one book at a time (on one
+    core, 845 ms in two threads against 615 ms one at a time). The free-threaded speedup hasn't been measured yet.
+    """
+
+    jobs = max(os.cpu_count() or 1, 2)
+    gil = "with the GIL" if getattr(sys, "_is_gil_enabled", lambda: True)() else "free-threaded"
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "text.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(BOOK_END.join(latin_prose(5_000, seed) for seed in range(200)))
+
+        compare(
+            f"200 books of 5,000 words, {jobs} jobs, {gil}",
+            {
+                "one at a time": lambda: "\n".join(iter_books_from_file(path)),
+                "processes": lambda: "\n".join(iter_books_from_file(path, jobs=jobs)),
+                "threads": lambda: "\n".join(iter_books_from_file(path, jobs=jobs, executor="thread")),
+            },
+            repeat,
+        )
+    if gil == "with the GIL":
+        print("  (threads only convert books at once on free-threaded Python, which this isn't)")
+
+
+def benchmark_estimate(repeat: int) -> None:
+    """
+    Compare counting the books and bytes a text makes (`--dry-run`) against converting it and counting them.
+
+    A dry run lays the text out exactly like a conversion and only skips quoting the pages and putting the commands
+    together, so it takes about as long. Counting the pages without escaping the text or building them (measuring
+    words, skipping a line of them at a time with a binary search, and sizing each page from the quotes and slashes
+    in the text it spans) was tried, but the passes over every word it needs took as long as the layout it replaced.
+    """
+
+    def convert_and_count(text: str) -> str:
+        books = text_to_many_books(text)
+        return f"{len(books)} books, {sum(len(book.encode('utf-8')) + 1 for book in books)} bytes"
+
+    def count(text: str) -> str:
+        counts = estimate(text)
+        return f"{counts['books']} books, {counts['bytes']} bytes"
+
+    for name, text in [
+        ("Latin prose, 200,000 words", latin_prose(200_000)),
+        ("One 1,000,000 character word", long_token(1_000_000)),
+    ]:
+        compare(
+            name,
+            {"convert": lambda: convert_and_count(text), "dry run": lambda: count(text)},
+            repeat,
+        )
+
+
+BENCHMARKS = {
+    "ascii": benchmark_ascii,
+    "cjk": benchmark_cjk,
+    "long": benchmark_long_tokens,
+    "jobs": benchmark_jobs,
+    "estimate": benchmark_estimate,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Minecraft book generator.")
+
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"The benchmarks to run ({', '.join(BENCHMARKS)}). Runs all of them by default.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="How many times to time each candidate (the fastest time is reported).",
+        dest="repeat",
+    )
+    args = parser.parse_args()
+
+    for benchmark in args.benchmarks:
+        if benchmark not in BENCHMARKS:
+            parser.error(f"unknown benchmark {benchmark!r}")
+
+    for benchmark in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[benchmark](args.repeat)
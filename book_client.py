@@ -0,0 +1,161 @@
+"""
+Sends text to a running `book_server.py` to be converted into Minecraft books.
+
+This only imports the standard library, so it starts almost instantly, and it takes the
+same parameters as `minecraft_book_generator.py`. Other Python programs can import it and
+call `convert` (or keep a `BookClient` open to send many documents over one connection).
+"""
+
+import argparse
+import json
+import socket
+
+from output_files import open_output
+from CONSTANTS import DEFAULT_INPUT_FILE, DEFAULT_OUTPUT_FILE, DEFAULT_SOCKET_FILE
+
+
+class BookClient:
+    """
+    A connection to a book server, which can convert any number of documents.
+
+    Parameters
+    ----------
+    socket_file: str
+        The path of the Unix socket the server is listening on.
+    """
+
+    def __init__(self, socket_file: str = DEFAULT_SOCKET_FILE):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(socket_file)
+        self.file = self.socket.makefile("rwb")
+
+    def convert(self, text: str, **options) -> list[str]:
+        """
+        Convert a body of text to Minecraft book commands.
+
+        Parameters
+        ----------
+        text: str
+            The text to convert to Minecraft books.
+
+        **options
+            Any of `title`, `author`, `in_line_titles`, `mc_version`, `engine`, `layout`, and `book_format`
+            (see `text_to_many_books`).
+
+        Returns
+        -------
+        list[str]
+            The command for each book.
+        """
+
+        request = {"text": text, **{option: value for option, value in options.items() if value is not None}}
+        self.file.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.file.flush()
+
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The book server closed the connection.")
+        response = json.loads(line)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response["commands"]
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def convert(text: str, socket_file: str = DEFAULT_SOCKET_FILE, **options) -> list[str]:
+    """
+    Convert a body of text to Minecraft book commands with a running book server.
+
+    Parameters
+    ----------
+    text: str
+        The text to convert to Minecraft books.
+
+    socket_file: str
+        The path of the Unix socket the server is listening on.
+
+    **options
+        Any of `title`, `author`, `in_line_titles`, `mc_version`, `engine`, `layout`, and `book_format`
+        (see `text_to_many_books`).
+
+    Returns
+    -------
+    list[str]
+        The command for each book.
+    """
+
+    with BookClient(socket_file) as client:
+        return client.convert(text, **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert text into Minecraft books using a running book server.")
+
+    parser.add_argument("-a", "--author", default=None, help="The author to give the book(s).", dest="author")
+    parser.add_argument("-t", "--title", default=None, help="The title to name the book(s).", dest="title")
+    parser.add_argument(
+        "-i",
+        "--input",
+        default=DEFAULT_INPUT_FILE,
+        help="The name of the input file with the text to convert.",
+        dest="input_file",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=DEFAULT_OUTPUT_FILE,
+        help="The name of the file to output the command(s) to.",
+        dest="output_file",
+    )
+    parser.add_argument(
+        "-mcv",
+        "--minecraft-version",
+        default=None,
+        help="The version of Minecraft (ex. 1.20.5) to generate the commands for.",
+        dest="mc_version",
+    )
+    parser.add_argument(
+        "-ilt",
+        "--in-line-titles",
+        action="store_true",
+        help="Read the first line of each text document as the book title. Overrides --title.",
+        dest="in_line_titles",
+    )
+    parser.add_argument("-e", "--engine", default=None, help="How to measure words.", dest="engine")
+    parser.add_argument("-l", "--layout", default=None, help="How to choose where pages end.", dest="layout")
+    parser.add_argument(
+        "-s",
+        "--socket",
+        default=DEFAULT_SOCKET_FILE,
+        help="The path of the Unix socket the book server is listening on.",
+        dest="socket_file",
+    )
+    args = parser.parse_args()
+
+    with open(args.input_file, "r", encoding="utf-8") as file:
+        text = file.read()
+    try:
+        commands = convert(
+            text,
+            args.socket_file,
+            title=args.title,
+            author=args.author,
+            in_line_titles=args.in_line_titles,
+            mc_version=args.mc_version,
+            engine=args.engine,
+            layout=args.layout,
+        )
+    except ValueError as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+    with open_output(args.output_file) as file:
+        for command in commands:
+            file.write(f"{command}\n")
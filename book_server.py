@@ -0,0 +1,208 @@
+"""
+Runs the book generator as a long-lived server on a local Unix socket.
+
+Starting Python and importing the character widths takes far longer than converting a
+typical document, so programs that convert text on demand (like a web panel) can keep
+this running and send it documents instead of running `minecraft_book_generator.py`
+for each one. Requests take a few milliseconds since everything is already loaded.
+
+The protocol is one JSON object per line in each direction. A request looks like
+    {"text": "...", "title": "...", "author": "...", "in_line_titles": false,
+     "mc_version": "1.21.5", "engine": "default", "layout": "greedy", "book_format": "command"}
+where every field but `text` is optional, and the response is either
+    {"commands": ["give @p written_book...", ...]}
+with one command (or loot table, if `book_format` is "loot_table", or count of its pages, lines and
+bytes, if it's "estimate") per book, or
+    {"error": "..."}
+if the request couldn't be converted. A connection can send any number of requests.
+
+Use `book_client.py` to talk to the server without importing the generator.
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import socketserver
+import sys
+
+from packaging.version import Version
+
+from minecraft_book_generator import (
+    BOOK_FORMATS,
+    ENGINES,
+    LAYOUTS,
+    get_version_profile,
+    load_pixel_widths,
+    text_to_many_books,
+    warm_up,
+)
+from CONSTANTS import DEFAULT_MC_VERSION, DEFAULT_SOCKET_FILE
+
+# what a Minecraft release version looks like (like "1.21" or "1.21.5")
+MC_VERSION_PATTERN = re.compile(r"1\.\d{1,2}(\.\d{1,2})?")
+
+# the fields a request can have, and the type each must be
+REQUEST_FIELDS = {
+    "text": str,
+    "title": str,
+    "author": str,
+    "in_line_titles": bool,
+    "mc_version": str,
+    "engine": str,
+    "layout": str,
+    "book_format": str,
+}
+
+
+def convert_request(request: dict, pixel_widths: dict[str, int]) -> list[str]:
+    """
+    Convert the text in a request to book commands.
+
+    Parameters
+    ----------
+    request: dict
+        The decoded request.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    list[str]
+        The command for each book.
+    """
+
+    if not isinstance(request, dict):
+        raise ValueError("The request must be a JSON object.")
+    for field, value in request.items():
+        if field not in REQUEST_FIELDS:
+            raise ValueError(f"Unknown field {field!r}.")
+        if not isinstance(value, REQUEST_FIELDS[field]):
+            raise ValueError(f"{field!r} must be a {REQUEST_FIELDS[field].__name__}.")
+    if "text" not in request:
+        raise ValueError("The request has no 'text'.")
+    if request.get("engine", "default") not in ENGINES:
+        raise ValueError(f"Unknown engine {request['engine']!r}.")
+    if request.get("layout", "greedy") not in LAYOUTS:
+        raise ValueError(f"Unknown layout {request['layout']!r}.")
+    if request.get("book_format", "command") not in BOOK_FORMATS:
+        raise ValueError(f"Unknown book format {request['book_format']!r}.")
+    if request.get("book_format") == "book_nbt":
+        raise ValueError("Binary NBT books can't be sent as JSON; write a structure file instead.")
+    # every version profile looked up is kept, so only versions that could exist are looked up
+    mc_version = request.get("mc_version", DEFAULT_MC_VERSION)
+    if not MC_VERSION_PATTERN.fullmatch(mc_version) or Version(mc_version) > Version(DEFAULT_MC_VERSION):
+        raise ValueError(f"Unsupported Minecraft version {mc_version!r}.")
+    try:
+        get_version_profile(mc_version)
+    except ValueError:
+        raise ValueError(f"Unsupported Minecraft version {mc_version!r}.") from None
+
+    return text_to_many_books(
+        request["text"],
+        request.get("title"),
+        request.get("author"),
+        request.get("in_line_titles", False),
+        mc_version,
+        pixel_widths,
+        request.get("engine", "default"),
+        request.get("layout", "greedy"),
+        request.get("book_format", "command"),
+    )
+
+
+class BookRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers every request sent over one connection.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                response = {"commands": convert_request(json.loads(line), self.server.pixel_widths)}
+                reply = json.dumps(response, ensure_ascii=False).encode("utf-8")
+            except ValueError as error:
+                # malformed JSON, bad fields, unsupported versions, in-line titles without a title line, and text
+                # with a lone surrogate (which can't be encoded in UTF-8), so the errors are sent in ASCII
+                reply = json.dumps({"error": str(error)}).encode("utf-8")
+            except Exception as error:
+                # anything else still gets an answer, and the connection stays open for the next request
+                reply = json.dumps({"error": f"{type(error).__name__}: {error}"}).encode("utf-8")
+
+            self.wfile.write(reply + b"\n")
+            self.wfile.flush()
+
+
+class BookServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A Unix socket server that converts text to books, each connection on its own thread.
+
+    Parameters
+    ----------
+    socket_file: str
+        The path of the Unix socket to listen on. A leftover socket file from a previous server is replaced.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_file: str, pixel_widths: dict[str, int]):
+        self.pixel_widths = pixel_widths
+
+        # build every lookup table now, before the first request
+        warm_up(pixel_widths)
+
+        if os.path.exists(socket_file):
+            os.remove(socket_file)
+        super().__init__(socket_file, BookRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Minecraft book conversions over a Unix socket.")
+
+    parser.add_argument(
+        "-s",
+        "--socket",
+        default=DEFAULT_SOCKET_FILE,
+        help="The path of the Unix socket to listen on.",
+        dest="socket_file",
+    )
+    parser.add_argument(
+        "-wt",
+        "--width-table",
+        default=None,
+        help="A binary width table (made by generate_width_table.py) to use instead of the built-in character widths.",
+        dest="width_table",
+    )
+    parser.add_argument(
+        "-fo",
+        "--font-overlay",
+        action="append",
+        default=[],
+        help="A resource pack's width overrides (a width table or JSON file) to layer over the character widths. "
+        + "Can be passed more than once, highest priority first.",
+        dest="font_overlays",
+    )
+    args = parser.parse_args()
+
+    # stop cleanly (removing the socket file) when a service manager stops the server
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+
+    with BookServer(args.socket_file, load_pixel_widths(args.width_table, args.font_overlays)) as server:
+        print(f"Serving book conversions on {args.socket_file}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,468 @@
+"""
+Generates a binary character width table from Minecraft's own font assets.
+
+Point it at a client jar (or a folder it was extracted to) and it reads the font
+definition (`assets/minecraft/font/default.json` and everything it references), measures
+every glyph in the bitmap and unifont providers the same way Minecraft does, and writes
+the widths as a binary width table (see `width_table.py`). Nothing is downloaded, so
+regenerating for a new Minecraft version only takes a few seconds.
+
+Resource packs use the same layout as a client jar, so pointing this at a resource pack
+produces a small table with only the characters that pack defines.
+"""
+
+import argparse
+import io
+import json
+import os
+import struct
+import zipfile
+import zlib
+
+from width_table import write_width_table
+
+DEFAULT_FONT = "minecraft:default"
+DEFAULT_WIDTH_TABLE_FILE = "pixel_widths.bin"
+
+# the height, in pixels, a bitmap font provider's glyphs are drawn at unless it says otherwise
+DEFAULT_BITMAP_HEIGHT = 8
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# number of color channels for each PNG color type (grayscale, RGB, palette, grayscale + alpha, RGBA)
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class AssetSource:
+    """
+    Reads resources out of client jars, resource pack zips, or folders either was extracted to.
+
+    Parameters
+    ----------
+    paths: list[str]
+        The jars, zips, or folders containing an `assets` folder, highest priority first.
+    """
+
+    def __init__(self, paths: list[str]):
+        self.layers = [path if os.path.isdir(path) else zipfile.ZipFile(path) for path in paths]
+
+    def read_all(self, resource_location: str, folder: str, extension: str = "") -> list[bytes]:
+        """
+        Read every copy of the resource named by a resource location (like `minecraft:font/ascii.png`).
+
+        Parameters
+        ----------
+        resource_location: str
+            The namespaced resource location of the resource.
+
+        folder: str
+            The folder inside the namespace the resource lives in (like `textures` or `font`), if any.
+
+        extension: str
+            The file extension to add to the resource location, if it doesn't include one.
+
+        Returns
+        -------
+        list[bytes]
+            The contents of the resource in each jar, pack or folder that contains it, highest priority first.
+        """
+
+        namespace, _, path = resource_location.rpartition(":")
+        member = "/".join(part for part in ("assets", namespace or "minecraft", folder, path + extension) if part)
+
+        copies: list[bytes] = []
+        for layer in self.layers:
+            if isinstance(layer, zipfile.ZipFile):
+                try:
+                    copies.append(layer.read(member))
+                except KeyError:
+                    pass
+            else:
+                try:
+                    with open(os.path.join(layer, *member.split("/")), "rb") as file:
+                        copies.append(file.read())
+                except FileNotFoundError:
+                    pass
+
+        return copies
+
+    def read(self, resource_location: str, folder: str, extension: str = "") -> bytes | None:
+        """
+        Read the highest priority copy of the resource named by a resource location.
+
+        Parameters
+        ----------
+        resource_location: str
+            The namespaced resource location of the resource.
+
+        folder: str
+            The folder inside the namespace the resource lives in (like `textures` or `font`), if any.
+
+        extension: str
+            The file extension to add to the resource location, if it doesn't include one.
+
+        Returns
+        -------
+        bytes | None
+            The contents of the resource, or `None` if no jar, pack or folder contains it.
+        """
+
+        copies = self.read_all(resource_location, folder, extension)
+        return copies[0] if copies else None
+
+
+def read_png_alpha(data: bytes) -> tuple[int, int, list[bytes]]:
+    """
+    Decode a PNG image into rows of per-pixel opacity.
+
+    Only the formats Minecraft's font textures use are supported: non-interlaced images with
+    8 bits per channel, or palette images with 1, 2, 4 or 8 bits per pixel.
+
+    Parameters
+    ----------
+    data: bytes
+        The contents of the PNG file.
+
+    Returns
+    -------
+    tuple[int, int, list[bytes]]
+        The width and height of the image, and one row of opacities (0 is fully transparent) per image row.
+    """
+
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a PNG image.")
+
+    position = len(PNG_SIGNATURE)
+    compressed = b""
+    palette_alpha = b""
+    while position < len(data):
+        length, chunk_type = struct.unpack_from(">I4s", data, position)
+        chunk = data[position + 8 : position + 8 + length]
+        position += length + 12
+
+        if chunk_type == b"IHDR":
+            width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"tRNS":
+            palette_alpha = chunk
+        elif chunk_type == b"IDAT":
+            compressed += chunk
+        elif chunk_type == b"IEND":
+            break
+
+    if interlace:
+        raise ValueError("Interlaced PNG images aren't supported.")
+    if color_type not in PNG_CHANNELS or (bit_depth != 8 and color_type != 3):
+        raise ValueError(f"PNG color type {color_type} with bit depth {bit_depth} isn't supported.")
+
+    channels = PNG_CHANNELS[color_type]
+    pixel_bytes = max(1, channels * bit_depth // 8)
+    stride = (width * channels * bit_depth + 7) // 8
+    raw = zlib.decompress(compressed)
+
+    rows: list[bytes] = []
+    previous = bytearray(stride)
+    for y in range(height):
+        filter_type = raw[y * (stride + 1)]
+        row = bytearray(raw[y * (stride + 1) + 1 : (y + 1) * (stride + 1)])
+
+        # undo the row's PNG filter
+        if filter_type == 1:
+            for i in range(pixel_bytes, stride):
+                row[i] = (row[i] + row[i - pixel_bytes]) & 0xFF
+        elif filter_type == 2:
+            for i in range(stride):
+                row[i] = (row[i] + previous[i]) & 0xFF
+        elif filter_type == 3:
+            for i in range(stride):
+                left = row[i - pixel_bytes] if i >= pixel_bytes else 0
+                row[i] = (row[i] + (left + previous[i]) // 2) & 0xFF
+        elif filter_type == 4:
+            for i in range(stride):
+                left = row[i - pixel_bytes] if i >= pixel_bytes else 0
+                up_left = previous[i - pixel_bytes] if i >= pixel_bytes else 0
+                estimate = left + previous[i] - up_left
+                distances = (abs(estimate - left), abs(estimate - previous[i]), abs(estimate - up_left))
+                if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                    predictor = left
+                elif distances[1] <= distances[2]:
+                    predictor = previous[i]
+                else:
+                    predictor = up_left
+                row[i] = (row[i] + predictor) & 0xFF
+        previous = row
+
+        # pull the opacity of every pixel out of the row
+        if color_type == 6:
+            rows.append(bytes(row[3::4]))
+        elif color_type == 4:
+            rows.append(bytes(row[1::2]))
+        elif color_type == 3:
+            pixels_per_byte = 8 // bit_depth
+            indices = [
+                (row[x // pixels_per_byte] >> (8 - bit_depth * (x % pixels_per_byte + 1))) & ((1 << bit_depth) - 1)
+                for x in range(width)
+            ]
+            rows.append(bytes(palette_alpha[index] if index < len(palette_alpha) else 255 for index in indices))
+        elif color_type == 0:
+            # Minecraft measures grayscale glyphs by their luminance
+            rows.append(bytes(row))
+        else:
+            rows.append(b"\xff" * width)
+
+    return width, height, rows
+
+
+def bitmap_widths(provider: dict, source: AssetSource) -> dict[str, int]:
+    """
+    Measure the glyphs of a `bitmap` font provider.
+
+    Parameters
+    ----------
+    provider: dict
+        The provider's definition from the font JSON.
+
+    source: AssetSource
+        Where to read the provider's texture from.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each character the provider defines.
+    """
+
+    data = source.read(provider["file"], "textures")
+    if data is None:
+        print(f"Texture {provider['file']} not found. Skipping its characters.")
+        return {}
+
+    image_width, image_height, alpha = read_png_alpha(data)
+    rows = provider["chars"]
+    cell_width = image_width // max(len(row) for row in rows)
+    cell_height = image_height // len(rows)
+    scale = provider.get("height", DEFAULT_BITMAP_HEIGHT) / cell_height
+
+    widths: dict[str, int] = {}
+    for row_index, row in enumerate(rows):
+        cell_rows = alpha[row_index * cell_height : (row_index + 1) * cell_height]
+        for column_index, character in enumerate(row):
+
+            # a null character is used to pad out rows with no glyph
+            if character == "\0":
+                continue
+
+            # the glyph is as wide as its rightmost column with any visible pixel
+            left = column_index * cell_width
+            glyph_width = 0
+            for x in range(cell_width - 1, -1, -1):
+                if any(cell_row[left + x] for cell_row in cell_rows):
+                    glyph_width = x + 1
+                    break
+
+            widths.setdefault(character, int(0.5 + glyph_width * scale))
+
+    return widths
+
+
+def space_widths(provider: dict) -> dict[str, int]:
+    """
+    Get the widths of the characters defined by a `space` font provider.
+
+    Parameters
+    ----------
+    provider: dict
+        The provider's definition from the font JSON.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each character the provider defines.
+    """
+
+    # a space provider lists advances, which include the 1 pixel spacing after every character
+    return {character: int(advance) - 1 for character, advance in provider["advances"].items()}
+
+
+def unihex_widths(provider: dict, source: AssetSource) -> dict[str, int]:
+    """
+    Measure the glyphs of a `unihex` (GNU Unifont) font provider.
+
+    Parameters
+    ----------
+    provider: dict
+        The provider's definition from the font JSON.
+
+    source: AssetSource
+        Where to read the provider's zip of .hex files from.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each character the provider defines.
+    """
+
+    data = source.read(provider["hex_file"], "")
+    if data is None:
+        print(f"Unifont file {provider['hex_file']} not found. Skipping its characters.")
+        return {}
+
+    # unifont glyphs are 16 rows high, so each row takes up a sixteenth of the hex digits
+    widths: dict[str, int] = {}
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for member in archive.namelist():
+            if not member.endswith(".hex"):
+                continue
+
+            for line in archive.read(member).decode("ascii").splitlines():
+                codepoint, _, bitmap = line.partition(":")
+                if not bitmap:
+                    continue
+
+                row_bits = len(bitmap) * 4 // 16
+                combined = 0
+                for row in range(16):
+                    combined |= int(bitmap[row * row_bits // 4 : (row + 1) * row_bits // 4], 16)
+
+                # the glyph spans from its leftmost to its rightmost set column, drawn at half scale
+                if combined:
+                    left = row_bits - combined.bit_length()
+                    right = row_bits - 1 - ((combined & -combined).bit_length() - 1)
+                    width = (right - left + 1) // 2
+                else:
+                    width = 0
+                widths[chr(int(codepoint, 16))] = width
+
+    for override in provider.get("size_overrides", []):
+        width = (override["right"] - override["left"] + 1) // 2
+        for codepoint in range(ord(override["from"]), ord(override["to"]) + 1):
+            if chr(codepoint) in widths:
+                widths[chr(codepoint)] = width
+
+    return widths
+
+
+def legacy_unicode_widths(provider: dict, source: AssetSource) -> dict[str, int]:
+    """
+    Get the widths of the glyphs of a `legacy_unicode` font provider (used before Minecraft 1.20).
+
+    Parameters
+    ----------
+    provider: dict
+        The provider's definition from the font JSON.
+
+    source: AssetSource
+        Where to read the provider's glyph sizes and page textures from.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each character the provider defines.
+    """
+
+    sizes = source.read(provider["sizes"], "")
+    if sizes is None:
+        print(f"Glyph sizes {provider['sizes']} not found. Skipping its characters.")
+        return {}
+
+    widths: dict[str, int] = {}
+    for page in range(len(sizes) // 256):
+
+        # a glyph only exists if the texture for its page of 256 characters does
+        if source.read(provider["template"].replace("%s", f"{page:02x}"), "textures") is None:
+            continue
+
+        for codepoint in range(page * 256, page * 256 + 256):
+            size = sizes[codepoint]
+            if size:
+                widths[chr(codepoint)] = ((size & 0xF) + 1 - (size >> 4)) // 2
+
+    return widths
+
+
+def font_widths(font: str, source: AssetSource, options: dict[str, bool] = None) -> dict[str, int]:
+    """
+    Measure every character defined by a Minecraft font.
+
+    Parameters
+    ----------
+    font: str
+        The resource location of the font (like `minecraft:default`).
+
+    source: AssetSource
+        The jars, resource packs and folders to read the font from.
+
+    options: dict[str, bool]
+        The font options (like `uniform`) in effect. Providers filtered on other values are skipped.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each character the font defines.
+    """
+
+    if options is None:
+        options = {}
+
+    # every pack's copy of a font adds its providers, with the highest priority pack's providers first
+    widths: dict[str, int] = {}
+    for definition in source.read_all(font, "font", ".json"):
+        for provider in json.loads(definition)["providers"]:
+
+            # skip providers that only apply with different font options (like forced Unicode)
+            if any(options.get(option, False) != value for option, value in provider.get("filter", {}).items()):
+                continue
+
+            # the first provider to define a character is the one Minecraft draws it with
+            if provider["type"] == "reference":
+                provider_widths = font_widths(provider["id"], source, options)
+            elif provider["type"] == "bitmap":
+                provider_widths = bitmap_widths(provider, source)
+            elif provider["type"] == "space":
+                provider_widths = space_widths(provider)
+            elif provider["type"] == "unihex":
+                provider_widths = unihex_widths(provider, source)
+            elif provider["type"] == "legacy_unicode":
+                provider_widths = legacy_unicode_widths(provider, source)
+            else:
+                print(f"Font provider type {provider['type']} currently unsupported. Skipping its characters.")
+                continue
+
+            for character, width in provider_widths.items():
+                widths.setdefault(character, width)
+
+    return widths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a character width table from Minecraft font assets.")
+
+    parser.add_argument(
+        "assets",
+        nargs="+",
+        help="The client jar(s), resource pack(s), or extracted folder(s) to read the font from, highest priority first.",
+    )
+    parser.add_argument(
+        "-f",
+        "--font",
+        default=DEFAULT_FONT,
+        help="The resource location of the font to measure.",
+        dest="font",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=DEFAULT_WIDTH_TABLE_FILE,
+        help="The name of the file to write the width table to.",
+        dest="output_file",
+    )
+    parser.add_argument(
+        "-u",
+        "--uniform",
+        action="store_true",
+        help="Measure the font as drawn with the 'Force Unicode Font' option on.",
+        dest="uniform",
+    )
+    args = parser.parse_args()
+
+    widths = font_widths(args.font, AssetSource(args.assets), {"uniform": args.uniform})
+    write_width_table(widths, args.output_file)
+    print(f"Wrote the widths of {len(widths)} characters to {args.output_file}.")
@@ -13,196 +13,3232 @@ Author: Aidan Dalgarno-Platt
 """
 
 import argparse
+import heapq
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import warnings
+from bisect import bisect_left, bisect_right
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing, nullcontext
+from functools import lru_cache, partial, wraps
+from itertools import accumulate, repeat
+from operator import length_hint
+from typing import Any
+
 from packaging.version import Version
 
-from pixel_widths import PIXEL_WIDTHS
-from CONSTANTS import (
-    BOOK_END,
-    BOOK_WIDTH,
-    BOOK_HEIGHT,
-    COMMAND_START,
-    COMMAND_NEW_PAGE,
-    COMMAND_END,
-    DEFAULT_INPUT_FILE,
-    DEFAULT_MC_VERSION,
-    DEFAULT_OUTPUT_FILE,
-    ESCAPE_CHARS,
-    PAGE_END,
-)
+from pixel_widths import PIXEL_WIDTHS
+from nbt_writer import TAG_STRING, NbtWriter, write_book_structure
+from output_files import (
+    COMPRESSED_OPENERS,
+    BackgroundWriter,
+    get_partial_path,
+    open_output,
+    open_output_atomically,
+    write_loot_tables,
+    write_sharded_functions,
+)
+from width_table import FrozenWidthTable, layer_width_tables, read_width_overlay, read_width_table
+from CONSTANTS import (
+    BOOK_CONTENT_END,
+    BOOK_CONTENT_START,
+    BOOK_END,
+    BOOK_WIDTH,
+    BOOK_HEIGHT,
+    BOOK_MAX_PAGES,
+    BOOK_MAX_TITLE_LENGTH,
+    COMMAND_START,
+    COMMAND_END,
+    DATA_VERSIONS,
+    CONTAINER_GIVE_BOOK,
+    CONTAINER_GIVE_END,
+    CONTAINER_GIVE_START,
+    CONTAINER_PROPERTIES,
+    CONTAINER_SETBLOCK_BOOK,
+    CONTAINER_SETBLOCK_END,
+    CONTAINER_SETBLOCK_START,
+    CONTAINER_SIZE,
+    CONTAINERS,
+    DEFAULT_FUNCTION_NAMESPACE,
+    DEFAULT_INPUT_FILE,
+    DEFAULT_MC_VERSION,
+    DEFAULT_OUTPUT_FILE,
+    ESCAPE_CHARS,
+    ITEM_COMPONENTS_MIN_VERSION,
+    LOOT_TABLE_MIN_VERSION,
+    NBT_PAGE_FORMAT,
+    PAGE_QUOTES,
+    PAGE_END,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_READ_SIZE,
+    VOLUME_TITLE,
+    WATCH_POLL_INTERVAL,
+    WATCH_SETTLE_TIME,
+)
+
+# every conversion (on every thread) shares the built-in widths, so they're frozen before anything uses them
+PIXEL_WIDTHS = FrozenWidthTable(PIXEL_WIDTHS)
+
+# words at least this long are checked for having the same width throughout before being measured a character at a time
+UNIFORM_WORD_MIN_LENGTH = 16
+
+# a page end that's a word of its own (which every layout starts a new page at, from the top)
+PAGE_END_WORD_PATTERN = re.compile(f"(?<![^ \\n]){re.escape(PAGE_END)}(?![^ \\n])")
+
+# a book is only split at its page ends to lay out in several workers if each piece would be at least this long,
+# and it's split into this many pieces per worker, so workers that finish early can take another
+PARALLEL_CHUNK_MIN_LENGTH = 1 << 16
+PARALLEL_CHUNKS_PER_JOB = 4
+
+# how many lines early the optimal layout may end a page so that it ends between paragraphs
+OPTIMAL_MAX_EMPTY_LINES = 3
+
+# the badness of splitting a paragraph across two pages, which is worse than ending any page early
+PARAGRAPH_SPLIT_BADNESS = (OPTIMAL_MAX_EMPTY_LINES + 1) ** 2
+
+# how many characters to compare at once when looking for where an edited text changed
+COMPARE_BLOCK_SIZE = 1 << 16
+
+
+def get_command_by_version(command_dict: dict, mc_version: str) -> str:
+    """
+    Get the correct syntax for the Minecraft command depending on the Minecraft version.
+
+    Parameters
+    ----------
+    command_dict: {COMMAND_START, COMMAND_END, ESCAPE_CHARS, PAGE_QUOTES}
+        The dictionary containing the command portion corresponding to a specific Minecraft version.
+
+    mc_version: str
+        The version of Minecraft being used for the command.
+
+    Returns
+    -------
+    str
+        The correct command portion corresponding to `mc_version`.
+    """
+
+    return command_dict[
+        max(
+            ([version for version in command_dict if Version(version) <= Version(mc_version)]), key=lambda x: Version(x)
+        )
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_version_profile(mc_version: str) -> tuple[str, str, str, dict[str, tuple[str, str, str, str]]]:
+    """
+    Get every version-specific command portion for a Minecraft version at once.
+
+    Looking these up with `get_command_by_version` parses every version string involved, so
+    the results are cached for each version rather than looked up again for every character.
+
+    Parameters
+    ----------
+    mc_version: str
+        The version of Minecraft being used for the command.
+
+    Returns
+    -------
+    tuple[str, str, str, dict[str, tuple[str, str, str, str]]]
+        The `COMMAND_START`, `COMMAND_END`, `ESCAPE_CHARS` and `PAGE_QUOTES` entries for `mc_version`.
+    """
+
+    return (
+        get_command_by_version(COMMAND_START, mc_version),
+        get_command_by_version(COMMAND_END, mc_version),
+        get_command_by_version(ESCAPE_CHARS, mc_version),
+        get_command_by_version(PAGE_QUOTES, mc_version),
+    )
+
+
+def escape_text(text: str, escape: str) -> str:
+    """
+    Escape every \\, ", ', and newline in a body of text for command formatting.
+
+    Parameters
+    ----------
+    text: str
+        The text to escape.
+
+    escape: str
+        The escape sequence for the Minecraft version (from `ESCAPE_CHARS`).
+
+    Returns
+    -------
+    str
+        The escaped text.
+    """
+
+    # escape the slashes first, so the slashes added by the other escapes aren't escaped again
+    return (
+        text.replace("\\", escape + escape).replace('"', escape + '"').replace("'", "\\'").replace("\n", escape + "n")
+    )
+
+
+# lookup tables built from each width table, keyed by the width table's id and the function that built them
+# (threads that need a table at the same time may both build it, but each gets the same table either way)
+_width_table_caches: dict[tuple[int, Callable], tuple[dict[str, int], Any]] = {}
+
+
+def cache_per_width_table(build: Callable[[dict[str, int]], Any]) -> Callable[[dict[str, int]], Any]:
+    """
+    Decorate a function that builds a lookup table from a width table so it only builds it once for each width table.
+
+    Width tables are dictionaries (or layered mappings) and so can't be hashed, so they're cached by identity.
+    That means width tables can't be changed after they're first used, which is why they're frozen (see
+    `FrozenWidthTable`).
+
+    Parameters
+    ----------
+    build: Callable[[dict[str, int]], Any]
+        The function that builds the lookup table.
+
+    Returns
+    -------
+    Callable[[dict[str, int]], Any]
+        The cached version of `build`.
+    """
+
+    @wraps(build)
+    def cached_build(pixel_widths: dict[str, int]) -> Any:
+        cached = _width_table_caches.get((id(pixel_widths), build))
+        if cached is not None and cached[0] is pixel_widths:
+            return cached[1]
+
+        lookup_table = build(pixel_widths)
+        _width_table_caches[(id(pixel_widths), build)] = (pixel_widths, lookup_table)
+        return lookup_table
+
+    return cached_build
+
+
+@cache_per_width_table
+def get_advance_translation(
+    pixel_widths: dict[str, int],
+) -> tuple[dict[int, str] | None, frozenset[str], str | None]:
+    """
+    Get the `str.translate` table that maps each character to its advance (its pixel width + 1) as a one-byte character.
+
+    Parameters
+    ----------
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    tuple[dict[int, str] | None, frozenset[str], str | None]
+        The translation table (or `None` if a character's advance doesn't fit in a byte), the set of characters
+        it covers, and a character with the default pixel width of 9 (if there is one) to stand in for the rest.
+    """
+
+    translation: dict[int, str] | None = {}
+    for character, width in pixel_widths.items():
+        if len(character) != 1:
+            continue
+        if not 0 <= width + 1 <= 0xFF:
+            translation = None
+            break
+        translation[ord(character)] = chr(width + 1)
+    known_characters = frozenset(character for character in pixel_widths if len(character) == 1)
+    stand_in = next((character for character in known_characters if pixel_widths[character] == 9), None)
+
+    return translation, known_characters, stand_in
+
+
+@cache_per_width_table
+def get_word_advance_translation(pixel_widths: dict[str, int]) -> tuple[dict[int, str] | None, str | None]:
+    """
+    Get a `str.translate` table like `get_advance_translation`'s, except that it maps spaces to a byte that isn't
+    any character's advance, so a translated text can be split into its words' advances.
+
+    Parameters
+    ----------
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    tuple[dict[int, str] | None, str | None]
+        The translation table and the character spaces are mapped to (or `None` and `None` if a character's
+        advance doesn't fit in a byte, or every byte is some character's advance).
+    """
+
+    translation = get_advance_translation(pixel_widths)[0]
+    if translation is None:
+        return None, None
+
+    # characters missing from the width table are mapped to the default advance of 10 (see `get_advances`)
+    advances = set(translation.values()) | {"\x0a"}
+    separator = next((chr(byte) for byte in range(0x100) if chr(byte) not in advances), None)
+    if separator is None:
+        return None, None
+    return {**translation, ord(" "): separator}, separator
+
+
+def get_advances(text: str, pixel_widths: dict[str, int], translation: dict[int, str] | None = None) -> bytes | None:
+    """
+    Map every character of a text to its advance (its pixel width + 1) with a single `str.translate` call.
+
+    Characters missing from the width table are given the default pixel width of 9.
+
+    Parameters
+    ----------
+    text: str
+        The text to measure.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    translation: dict[int, str] | None
+        The `str.translate` table to use instead of `get_advance_translation`'s (like `get_word_advance_translation`'s).
+
+    Returns
+    -------
+    bytes | None
+        The advance of each character, or `None` if some character's advance doesn't fit in a byte.
+    """
+
+    default_translation, known_characters, stand_in = get_advance_translation(pixel_widths)
+    if translation is None:
+        translation = default_translation
+    if translation is None:
+        return None
+
+    # swap unknown characters for a known character with the default width, rather than copying the whole table
+    unknown_characters = set(text).difference(known_characters)
+    if unknown_characters and stand_in is not None:
+        text = text.translate(dict.fromkeys(map(ord, unknown_characters), stand_in))
+    elif unknown_characters:
+        translation = {**translation, **dict.fromkeys(map(ord, unknown_characters), "\x0a")}
+
+    return text.translate(translation).encode("latin-1")
+
+
+@cache_per_width_table
+def get_uniform_ranges(pixel_widths: dict[str, int]) -> tuple[list[int], list[int], list[int]]:
+    """
+    Get every range of consecutive codepoints that all have the same width (like most CJK ideographs).
+
+    Parameters
+    ----------
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    tuple[list[int], list[int], list[int]]
+        The first codepoint, last codepoint, and advance (pixel width + 1) of each range, in order.
+    """
+
+    firsts: list[int] = []
+    lasts: list[int] = []
+    advances: list[int] = []
+    for codepoint in sorted(ord(character) for character in pixel_widths if len(character) == 1):
+        advance = pixel_widths[chr(codepoint)] + 1
+        if lasts and lasts[-1] == codepoint - 1 and advances[-1] == advance:
+            lasts[-1] = codepoint
+        else:
+            firsts.append(codepoint)
+            lasts.append(codepoint)
+            advances.append(advance)
+
+    return firsts, lasts, advances
+
+
+def get_uniform_advance(word: str, pixel_widths: dict[str, int]) -> int | None:
+    """
+    Check whether every character of a word has the same width, without looking at each character in Python.
+
+    Only the word's lowest and highest characters are looked up: if both fall in the same range of
+    consecutive codepoints with the same width, so does every character between them.
+
+    Parameters
+    ----------
+    word: str
+        The (non-empty) word to check.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    int | None
+        The advance (pixel width + 1) every character of the word has, or `None` if they don't all have the same one.
+    """
+
+    firsts, lasts, advances = get_uniform_ranges(pixel_widths)
+    lowest, highest = ord(min(word)), ord(max(word))
+
+    range_index = bisect_right(firsts, lowest) - 1
+    if range_index >= 0 and highest <= lasts[range_index]:
+        return advances[range_index]
+    return None
+
+
+def measure_words(words: list[str], pixel_widths: dict[str, int]) -> Iterator[int]:
+    """
+    Find the pixel length of each word by looking up every character's width.
+
+    Parameters
+    ----------
+    words: list[str]
+        The words to measure.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    Iterator[int]
+        The pixel length of each word, including the 1 pixel spacing after every character.
+    """
+
+    for word in words:
+
+        # a long word of characters with the same width (like a paragraph of Chinese) can be measured at once
+        if len(word) > UNIFORM_WORD_MIN_LENGTH:
+            advance = get_uniform_advance(word, pixel_widths)
+            if advance is not None:
+                yield len(word) * advance
+                continue
+
+        curr_word_num_pixels = 0
+        for character in word:
+
+            # if a character isn't in the dictionary, assume a pixel spacing of 9 (the max potential spacing of a character)
+            # + 1 pixel because there is a 1 character spacing between characters (with a few but handleable exceptions)
+            curr_word_num_pixels += pixel_widths.get(character, 9) + 1
+
+        yield curr_word_num_pixels
+
+
+def measure_words_translated(
+    words: list[str], pixel_widths: dict[str, int], words_text: str | None = None
+) -> Iterator[int]:
+    """
+    Find the pixel length of each word with a single `str.translate` pass over all of them.
+
+    Every character is mapped to a one-byte advance at once, and every space to a byte no character's advance is,
+    so the text splits into each word's advances, which are summed with no Python code run for each character or
+    word.
+
+    Parameters
+    ----------
+    words: list[str]
+        The words to measure.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    words_text: str | None
+        The words joined by spaces, if the caller already has them that way (so they aren't joined again).
+
+    Returns
+    -------
+    Iterator[int]
+        The pixel length of each word, including the 1 pixel spacing after every character.
+    """
+
+    translation, separator = get_word_advance_translation(pixel_widths)
+    advances = None
+    if translation is not None:
+        advances = get_advances(" ".join(words) if words_text is None else words_text, pixel_widths, translation)
+    if advances is None:
+        raise ValueError(
+            "The translate engine can only be used with pixel widths from -1 to 254, when some width from -1 to 254 "
+            + "isn't any character's."
+        )
+
+    return map(sum, advances.split(separator.encode("latin-1")))
+
+
+@cache_per_width_table
+def get_ascii_advance_table(pixel_widths: dict[str, int]) -> tuple[bytes | None, frozenset[str]]:
+    """
+    Get the `bytes.translate` table that maps each ASCII character to its advance (its pixel width + 1).
+
+    Parameters
+    ----------
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    tuple[bytes | None, frozenset[str]]
+        The translation table (or `None` if an ASCII character's advance doesn't fit in a byte), and
+        the set of ASCII characters missing from the width table.
+    """
+
+    advances = tuple(pixel_widths.get(chr(codepoint), 9) + 1 for codepoint in range(128))
+    table = bytes(advances) + bytes(128) if all(0 <= advance <= 0xFF for advance in advances) else None
+    unknown_characters = frozenset(chr(codepoint) for codepoint in range(128) if chr(codepoint) not in pixel_widths)
+
+    return table, unknown_characters
+
+
+class _AsciiWordWidths(dict):
+    """
+    The pixel length of every ASCII word measured so far, measuring new words as they're looked up.
+    """
+
+    def __init__(self, table: bytes):
+        super().__init__()
+        self.table = table
+
+    def __missing__(self, word: str) -> int:
+        curr_word_num_pixels = self[word] = sum(word.encode("ascii").translate(self.table))
+        return curr_word_num_pixels
+
+
+def measure_words_ascii(words: list[str], pixel_widths: dict[str, int]) -> Iterator[int]:
+    """
+    Find the pixel length of each word of a pure-ASCII text.
+
+    Each distinct word is measured once with `bytes.translate` against a 128-entry table, and
+    repeats (most words, in ordinary prose) are a single dictionary lookup.
+
+    Parameters
+    ----------
+    words: list[str]
+        The words to measure. Every character must be ASCII.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    Returns
+    -------
+    Iterator[int]
+        The pixel length of each word, including the 1 pixel spacing after every character.
+    """
+
+    return map(_AsciiWordWidths(get_ascii_advance_table(pixel_widths)[0]).__getitem__, words)
+
+
+def add_uniform_run(
+    run: str, advance: int, curr_line: int, curr_num_pixels: int, command: list[str], command_new_page: str
+) -> tuple[int, int]:
+    """
+    Add a run of characters that all have the same advance to the page, wrapping it across lines and pages.
+
+    Since every character takes up the same space, where each line breaks is simple arithmetic
+    rather than a check for every character.
+
+    Parameters
+    ----------
+    run: str
+        The characters to add.
+
+    advance: int
+        The pixel width + 1 of every character in the run.
+
+    curr_line: int
+        What number line of the current page the run starts on.
+
+    curr_num_pixels: int
+        How many pixels of the current line are already taken up.
+
+    command: list[str]
+        The pieces of the command being built, which the run (and any new pages) is added to.
+
+    command_new_page: str
+        The command portion that starts a new page.
+
+    Returns
+    -------
+    tuple[int, int]
+        The line and the number of pixels on that line after adding the run.
+    """
+
+    # characters fit on a line as long as they don't push it past the width of the page
+    if curr_num_pixels + advance > BOOK_WIDTH:
+        num_fitting = 0
+    elif advance == 0:
+        num_fitting = len(run)
+    else:
+        num_fitting = (BOOK_WIDTH - curr_num_pixels) // advance
+
+    if num_fitting >= len(run):
+        command.append(run)
+        return curr_line, curr_num_pixels + len(run) * advance
+
+    # every line after the first starts with one character, then fits as many more as it can
+    line_capacity = max(1, BOOK_WIDTH // advance) if advance > 0 else len(run)
+
+    page_start = 0
+    num_added = num_fitting
+    while num_added < len(run):
+
+        # go to the next line, and if the current line is off the page, go to the next page
+        curr_line += 1
+        if curr_line > BOOK_HEIGHT:
+            command.append(run[page_start:num_added])
+            command.append(command_new_page)
+            page_start = num_added
+            curr_line = 1
+
+        num_on_line = min(line_capacity, len(run) - num_added)
+        num_added += num_on_line
+
+    command.append(run[page_start:])
+    return curr_line, num_on_line * advance
+
+
+def add_long_word_by_character(
+    new_word: str,
+    curr_line: int,
+    curr_num_pixels: int,
+    pixel_widths: dict[str, int],
+    command: list[str],
+    command_new_page: str,
+) -> tuple[int, int]:
+    """
+    Add an (escaped) word that's longer than a line to the page one character at a time.
+
+    This is only used for width tables too unusual for `add_long_word`'s faster approach. The parameters
+    and return value are the same as `add_long_word`'s.
+    """
+
+    page_start = 0
+    position = 0
+    while position < len(new_word):
+
+        # if the next character will push the word onto the next line, go to the next line
+        if curr_num_pixels + pixel_widths.get(new_word[position], 9) + 1 > BOOK_WIDTH:
+
+            curr_line += 1
+            curr_num_pixels = 0
+
+            # if the current line is off the page, go to the next page
+            if curr_line > BOOK_HEIGHT:
+
+                command.append(new_word[page_start:position])
+                command.append(command_new_page)
+                page_start = position
+                curr_line = 1
+
+        # if the character is a slash, then it is the start of an escape sequence
+        if new_word[position] == "\\":
+
+            # count the character after the slash but not the slash itself, then skip both
+            curr_num_pixels += pixel_widths.get(new_word[position + 1], 9) + 1
+            position += 2
+
+        else:
+            curr_num_pixels += pixel_widths.get(new_word[position], 9) + 1
+            position += 1
+
+    command.append(new_word[page_start:])
+    return curr_line, curr_num_pixels
+
+
+def add_long_word(
+    new_word: str,
+    curr_line: int,
+    curr_num_pixels: int,
+    pixel_widths: dict[str, int],
+    command: list[str],
+    command_new_page: str,
+) -> tuple[int, int]:
+    """
+    Add an (escaped) word that's longer than a line to the page piecemeal, wrapping it across lines and pages.
+
+    A word of characters that all have the same width (like a paragraph of Chinese) and no escape
+    sequences is placed arithmetically. Any other word is broken into units (a character, or an escape sequence,
+    which is checked against the width of its slash but takes up the width of the character it
+    escapes), the units' cumulative widths are computed once, and each line break is found with
+    a binary search, so even a single enormous word is laid out in linear time.
+
+    Parameters
+    ----------
+    new_word: str
+        The escaped word to add.
+
+    curr_line: int
+        What number line of the current page the word starts on.
+
+    curr_num_pixels: int
+        How many pixels of the current line are already taken up.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    command: list[str]
+        The pieces of the command being built, which the word (and any new pages) is added to.
+
+    command_new_page: str
+        The command portion that starts a new page.
+
+    Returns
+    -------
+    tuple[int, int]
+        The line and the number of pixels on that line after adding the word.
+    """
+
+    # a word of characters with the same width (like a paragraph of Chinese) is one run, as long as it
+    # has no escape sequences, which take up the width of one character but are more than one long
+    if "\\" not in new_word:
+        advance = get_uniform_advance(new_word, pixel_widths)
+        if advance is not None:
+            return add_uniform_run(new_word, advance, curr_line, curr_num_pixels, command, command_new_page)
+
+    advances = get_advances(new_word, pixel_widths)
+    if advances is None:
+        return add_long_word_by_character(new_word, curr_line, curr_num_pixels, pixel_widths, command, command_new_page)
+
+    # a character wider than a whole line would break the binary search below
+    if max(advances) > BOOK_WIDTH:
+        return add_long_word_by_character(new_word, curr_line, curr_num_pixels, pixel_widths, command, command_new_page)
+
+    # find where each unit starts and the width it takes up, and which units are escape sequences
+    escape_units: list[int] = []
+    escape_checks: list[int] = []
+    if "\\" not in new_word:
+        unit_starts = range(len(new_word))
+        unit_advances = advances
+    else:
+        unit_starts = []
+        unit_advances = bytearray()
+        position = 0
+        while True:
+            escape_position = new_word.find("\\", position)
+            segment_end = len(new_word) if escape_position == -1 else escape_position
+            unit_starts.extend(range(position, segment_end))
+            unit_advances += advances[position:segment_end]
+            if escape_position == -1:
+                break
+
+            escape_units.append(len(unit_starts))
+            escape_checks.append(advances[escape_position])
+            unit_starts.append(escape_position)
+            unit_advances.append(advances[escape_position + 1])
+            position = escape_position + 2
+
+    # the width of every unit before each unit (and of the whole word, at the end)
+    preceding_num_pixels = list(accumulate(unit_advances, initial=0))
+    num_units = len(unit_starts)
+
+    def find_break(line_start: int, max_num_pixels: int) -> int:
+        """
+        Find the first unit from line_start on that doesn't fit within max_num_pixels of the start of the word.
+        """
+
+        # a character doesn't fit if it ends past the limit, and since the ends only grow, the first one is binary searched
+        next_break = bisect_right(preceding_num_pixels, max_num_pixels, line_start + 1) - 1
+
+        # an escape sequence doesn't fit if its slash would end past the limit, even if the character it escapes wouldn't
+        escape_index = bisect_left(escape_units, line_start)
+        while escape_index < len(escape_units) and escape_units[escape_index] < next_break:
+            unit = escape_units[escape_index]
+            if preceding_num_pixels[unit] + escape_checks[escape_index] > max_num_pixels:
+                return unit
+            escape_index += 1
+
+        return next_break
+
+    page_start = 0
+    line_start = None
+    next_break = find_break(0, BOOK_WIDTH - curr_num_pixels)
+    while next_break < num_units:
+
+        # go to the next line, and if the current line is off the page, go to the next page
+        curr_line += 1
+        if curr_line > BOOK_HEIGHT:
+            command.append(new_word[page_start : unit_starts[next_break]])
+            command.append(command_new_page)
+            page_start = unit_starts[next_break]
+            curr_line = 1
+
+        line_start = next_break
+        next_break = find_break(line_start, preceding_num_pixels[line_start] + BOOK_WIDTH)
+
+    command.append(new_word[page_start:])
+    if line_start is None:
+        return curr_line, curr_num_pixels + preceding_num_pixels[-1]
+    return curr_line, preceding_num_pixels[-1] - preceding_num_pixels[line_start]
+
+
+def load_pixel_widths(width_table: str | None = None, font_overlays: list[str] = ()) -> dict[str, int]:
+    """
+    Load the character widths to lay out books with.
+
+    Parameters
+    ----------
+    width_table: str | None
+        A binary width table file to use instead of `PIXEL_WIDTHS`, if any.
+
+    font_overlays: list[str]
+        Resource pack width override files to layer over the widths, highest priority first.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each character.
+    """
+
+    pixel_widths = PIXEL_WIDTHS if width_table is None else read_width_table(width_table)
+    if font_overlays:
+        pixel_widths = layer_width_tables(pixel_widths, [read_width_overlay(path) for path in font_overlays])
+    return pixel_widths
+
+
+class UnrecognizedCharacterWarning(UserWarning):
+    """
+    Warns that a text has characters that aren't in the width table, which are laid out as 9 pixels wide.
+    """
+
+
+def warn_unrecognized_characters(text: str, pixel_widths: dict[str, int]) -> None:
+    """
+    Warn (with an `UnrecognizedCharacterWarning`) about every character of a text that isn't in the width table.
+
+    They're found once for each text instead of being printed as each word is measured, so measuring words never
+    waits on the console (which every thread converting books at once would share). Each set of characters is
+    only warned about once, like any warning.
+
+    Parameters
+    ----------
+    text: str
+        The text to check.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+    """
+
+    if text.isascii():
+        unknown_characters = [character for character in get_ascii_advance_table(pixel_widths)[1] if character in text]
+    else:
+        unknown_characters = [character for character in set(text) if character not in pixel_widths]
+
+    if unknown_characters:
+        warnings.warn(
+            f"Characters currently unrecognized: {', '.join(map(repr, sorted(unknown_characters)))}. "
+            + "Using default pixel width 9.",
+            UnrecognizedCharacterWarning,
+        )
+
+
+# the ways of measuring words that text_to_book can use
+ENGINES = {"default": measure_words, "translate": measure_words_translated}
+
+
+def measure_text_words(
+    text: str, words: list[str], pixel_widths: dict[str, int], engine: str, words_text: str | None = None
+) -> Iterator[int]:
+    """
+    Find the pixel length of each word of a text.
+
+    Parameters
+    ----------
+    text: str
+        The text the words are from.
+
+    words: list[str]
+        The words to measure.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    engine: {"default", "translate"}
+        How to measure words (see `text_to_book`).
+
+    words_text: str | None
+        The words joined by spaces, if the caller already has them that way (see `measure_words_translated`).
+
+    Returns
+    -------
+    Iterator[int]
+        The pixel length of each word, including the 1 pixel spacing after every character.
+    """
+
+    warn_unrecognized_characters(text, pixel_widths)
+
+    # plain ASCII text (most English text) can be measured a byte at a time
+    if text.isascii() and get_ascii_advance_table(pixel_widths)[0] is not None:
+        return measure_words_ascii(words, pixel_widths)
+    if engine == "translate":
+        return measure_words_translated(words, pixel_widths, words_text)
+    return ENGINES[engine](words, pixel_widths)
+
+
+def lay_out_page(
+    escaped_words: list[str],
+    word_num_pixels: list[int],
+    start: int,
+    curr_num_pixels: int,
+    pixel_widths: dict[str, int],
+    escaped_newline: str,
+    space_num_pixels: int,
+) -> tuple[int | None, int, int, int, list[tuple[int, int, int]]]:
+    """
+    Lay out words from the top of a page exactly like `text_to_book` does, until it would start a new page.
+
+    Parameters
+    ----------
+    escaped_words: list[str]
+        Every escaped word of the text.
+
+    word_num_pixels: list[int]
+        The pixel width of every word.
+
+    start: int
+        The index of the word at the top of the page.
+
+    curr_num_pixels: int
+        How many pixels of the first line are already taken up.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    escaped_newline: str
+        What a newline looks like once escaped.
+
+    space_num_pixels: int
+        The pixel width of a space, including the gap after it.
+
+    Returns
+    -------
+    tuple[int | None, int, int, int, list[tuple[int, int, int]]]
+        The index of the word the next page starts after (None if the text ends first), how many pixels of
+        the next page's first line are taken up, how many pages were filled (a long word can fill several),
+        the badness of where the page ended, and every newline the page could end early at instead, along
+        with how many pages were filled by then and how many lines would be left empty.
+    """
+
+    # long words are added to a throwaway list, which gets a piece of the word and a new page for every page filled
+    scratch: list[str] = []
+    early_breaks: list[tuple[int, int, int]] = []
+    num_pages = 1
+    curr_line = 1
+
+    for word_num in range(start, len(escaped_words)):
+        new_word = escaped_words[word_num]
+        curr_word_num_pixels = word_num_pixels[word_num]
+
+        if new_word == escaped_newline:
+
+            # if it's the very start of a new page, don't write any newlines
+            if curr_line == 1 and curr_num_pixels == 0:
+                new_word = ""
+                curr_word_num_pixels = 0
+
+            # the page could end just before this newline, leaving the rest of its lines empty
+            elif 0 < BOOK_HEIGHT - curr_line <= OPTIMAL_MAX_EMPTY_LINES:
+                early_breaks.append((word_num, num_pages, BOOK_HEIGHT - curr_line))
+
+        # if the addition of this word would make the line too long
+        if curr_num_pixels + curr_word_num_pixels > BOOK_WIDTH:
+
+            # if the word by itself is longer than a line, add it to the page piecemeal
+            if curr_word_num_pixels > BOOK_WIDTH:
+                scratch.clear()
+                curr_line, curr_num_pixels = add_long_word(
+                    new_word, curr_line, curr_num_pixels, pixel_widths, scratch, ""
+                )
+                num_pages += len(scratch) // 2
+                new_word = ""
+
+            # go to the next line
+            curr_line += 1
+            curr_num_pixels = 0
+
+        # a newline on the last line of the page goes to the next page (without resetting the line's pixels)
+        if new_word == escaped_newline:
+            if curr_line == BOOK_HEIGHT:
+                return word_num + 1, curr_num_pixels, num_pages, 0, early_breaks
+            curr_line += 1
+            curr_num_pixels = 0
+
+        # the author chose to end the page here
+        if new_word == PAGE_END:
+            return word_num + 1, 0, num_pages, 0, early_breaks
+
+        # the page is full partway through a paragraph, so the word goes on the next page
+        if curr_line > BOOK_HEIGHT:
+            next_num_pixels = curr_word_num_pixels + (space_num_pixels if new_word.strip() else 0)
+            return word_num + 1, next_num_pixels, num_pages, PARAGRAPH_SPLIT_BADNESS, early_breaks
+
+        curr_num_pixels += curr_word_num_pixels
+        if new_word.strip():
+            curr_num_pixels += space_num_pixels
+
+    return None, 0, num_pages, 0, early_breaks
+
+
+def find_optimal_page_breaks(
+    escaped_words: list[str],
+    word_num_pixels: list[int],
+    pixel_widths: dict[str, int],
+    escaped_newline: str,
+    space_num_pixels: int,
+) -> list[int]:
+    """
+    Find which newlines to end pages early at so that a book has as few pages as possible and as few paragraphs
+    split across pages as possible.
+
+    Minecraft wraps lines itself, so only page breaks can be chosen. Like Knuth and Plass's line breaking, every
+    way of breaking the text into pages is scored (first by number of pages, then by badness: the square of the
+    number of lines left empty by ending a page early, or a fixed penalty for splitting a paragraph) and the best
+    is found by dynamic programming. Pages can only end early in their last few lines, and only between
+    paragraphs, so there are a handful of places each page can end and the search takes near-linear time.
+
+    Parameters
+    ----------
+    escaped_words: list[str]
+        Every escaped word of the text.
+
+    word_num_pixels: list[int]
+        The pixel width of every word.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+
+    escaped_newline: str
+        What a newline looks like once escaped.
+
+    space_num_pixels: int
+        The pixel width of a space, including the gap after it.
+
+    Returns
+    -------
+    list[int]
+        The index of every newline word to end a page at instead of writing.
+    """
+
+    # a page starts at a word with some pixels of its first line taken up. every page start found so far has the
+    # best (number of pages, badness) before it, the page start before it, and the newline that page ended at (if any)
+    best: dict[tuple[int, int], tuple[tuple[int, int], tuple[int, int] | None, int | None]] = {
+        (0, 0): ((0, 0), None, None)
+    }
+    best_end: tuple[tuple[float, int], tuple[int, int] | None] = ((float("inf"), 0), None)
+
+    def reach(page_start: tuple[int, int], cost: tuple[int, int], previous: tuple[int, int], early_break: int | None):
+        if page_start not in best:
+            heapq.heappush(page_starts, page_start)
+        elif best[page_start][0] <= cost:
+            return
+        best[page_start] = (cost, previous, early_break)
+
+    # every page ends at a later word than it starts, so page starts are laid out in order once all their
+    # possible previous pages have been
+    page_starts = [(0, 0)]
+    while page_starts:
+        page_start = heapq.heappop(page_starts)
+        (num_pages, badness), _, _ = best[page_start]
+
+        next_start, next_num_pixels, num_filled, end_badness, early_breaks = lay_out_page(
+            escaped_words, word_num_pixels, *page_start, pixel_widths, escaped_newline, space_num_pixels
+        )
+        if next_start is None:
+            if (num_pages + num_filled, badness) < best_end[0]:
+                best_end = ((num_pages + num_filled, badness), page_start)
+        else:
+            reach((next_start, next_num_pixels), (num_pages + num_filled, badness + end_badness), page_start, None)
+
+        # ending the page at a newline skips writing it, so the next page starts after it
+        for word_num, num_filled, num_empty_lines in early_breaks:
+            reach((word_num + 1, 0), (num_pages + num_filled, badness + num_empty_lines**2), page_start, word_num)
+
+    # follow the best pages back from the end of the text
+    page_breaks = []
+    page_start = best_end[1]
+    while page_start is not None:
+        _, page_start, early_break = best[page_start]
+        if early_break is not None:
+            page_breaks.append(early_break)
+
+    return page_breaks
+
+
+# the ways of choosing where pages end that text_to_book can use
+LAYOUTS = ("greedy", "optimal")
+
+
+def lay_out_text(
+    text: str,
+    command: list[str],
+    command_new_page: str,
+    escape: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    start: tuple[int, int, int] = (0, 1, 0),
+    checkpoints: list[tuple[int, int, int, int]] | None = None,
+    stop_at: dict[int, tuple[int, int]] | None = None,
+    page_starts: list[int] | None = None,
+    page_lines: list[int] | None = None,
+) -> int | None:
+    """
+    Escape a body of text and lay it out into pages, adding it to a command piece by piece.
+
+    Parameters
+    ----------
+    text: str
+        The text to lay out.
+
+    command: list[str]
+        The pieces of the command being built, which the text (and every new page) is added to.
+
+    command_new_page: str
+        The command portion that starts a new page.
+
+    escape: str
+        The escape sequence for the Minecraft version (from `ESCAPE_CHARS`).
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character. Defaults to `PIXEL_WIDTHS`.
+
+    engine: {"default", "translate"}
+        How to measure words (see `text_to_book`).
+
+    layout: {"greedy", "optimal"}
+        How to choose where pages end (see `text_to_book`).
+
+    start: tuple[int, int, int]
+        The word to start at, and the line and pixel it starts on (from a checkpoint), to carry on an earlier
+        layout of the same words. Only works with the "greedy" layout.
+
+    checkpoints: list[tuple[int, int, int, int]] | None
+        If given, a checkpoint is added to it for every page that starts between words: how many pieces of
+        the command came before it, and the word that starts the page with the line and pixel before it.
+
+    stop_at: dict[int, tuple[int, int]] | None
+        If given, stop as soon as a page starts at one of these words with this line and pixel before it.
+
+    page_starts: list[int] | None
+        If given, the position in the text where each page after the first starts is added to it.
+
+    page_lines: list[int] | None
+        If given, how many lines each page takes up is added to it (the last page's only if every word is laid out).
+
+    Returns
+    -------
+    int | None
+        The word the layout stopped at (because of `stop_at`), or None if every word was laid out.
+    """
+
+    escaped_newline = escape + "n"
+
+    # add a space before and after every newline, then split by spaces
+    spaced_text = text.replace("\n", " \n ")
+    words = all_words = spaced_text.split(" ")
+
+    # escape every \, ", ', and \n for command formatting at once (escapes never add spaces, so the words line up)
+    escaped_words = escape_text(spaced_text, escape).split(" ")
+
+    # only the words from the start on need to be measured
+    word_num, curr_line, curr_num_pixels = start
+    words_text = spaced_text
+    if word_num:
+        words = words[word_num:]
+        escaped_words = escaped_words[word_num:]
+        words_text = spaced_text[sum(map(len, all_words[:word_num])) + word_num :]
+
+    word_num_pixels = measure_text_words(text, words, pixel_widths, engine, words_text)
+
+    space_num_pixels = pixel_widths[" "] + 1
+
+    # end pages early by replacing the newlines they end at with page ends
+    if layout == "optimal":
+        word_num_pixels = list(word_num_pixels)
+        for break_word_num in find_optimal_page_breaks(
+            escaped_words, word_num_pixels, pixel_widths, escaped_newline, space_num_pixels
+        ):
+            escaped_words[break_word_num] = PAGE_END
+
+    # curr_line is what number line of the current page the program is on, and
+    # curr_num_pixels is how many pixels on the current line the program is on
+
+    # which word a page starts at is only needed for checkpoints and page starts, so rather than counting
+    # every word, it's worked out from how many words are left
+    tracking = checkpoints is not None or stop_at is not None or page_starts is not None
+    num_words = word_num + len(escaped_words)
+    remaining_words = iter(escaped_words)
+    stopped_at = None
+
+    # the word each page starts in, and how far into the (unescaped) word
+    word_starts: list[tuple[int, int]] = []
+
+    # add every word to the command string
+    for new_word, curr_word_num_pixels in zip(remaining_words, word_num_pixels):
+        line_before, pixels_before = curr_line, curr_num_pixels
+
+        # if it's the very start of a new page, don't write any newlines
+        if new_word == escaped_newline and curr_line == 1 and curr_num_pixels == 0:
+            new_word = ""
+            curr_word_num_pixels = 0
+
+        # if the addition of this word would make the line too long
+        if curr_num_pixels + curr_word_num_pixels > BOOK_WIDTH:
+
+            # if the word by itself is longer than a line, add it to the page piecemeal
+            if curr_word_num_pixels > BOOK_WIDTH:
+
+                num_pieces = len(command)
+                curr_line, curr_num_pixels = add_long_word(
+                    new_word, curr_line, curr_num_pixels, pixel_widths, command, command_new_page
+                )
+
+                # every page the word filled up to the bottom and went past has all of its lines
+                if page_lines is not None:
+                    page_lines += [BOOK_HEIGHT] * command[num_pieces:].count(command_new_page)
+
+                # find how far into the word each page it started begins
+                if page_starts is not None and command_new_page in command[num_pieces:]:
+                    word_num = num_words - length_hint(remaining_words) - 1
+                    escaped_positions = []
+                    position = 0
+                    for piece in command[num_pieces:]:
+                        if piece == command_new_page:
+                            escaped_positions.append(position)
+                        else:
+                            position += len(piece)
+                    word_starts += [
+                        (word_num, offset) for offset in get_unescaped_positions(new_word, escaped_positions, escape)
+                    ]
+                new_word = ""
+
+            # go to the next line
+            curr_line += 1
+            curr_num_pixels = 0
+
+        # if the current word is a newline
+        if new_word == escaped_newline:
+
+            # if the current line is the last line of the page
+            if curr_line == BOOK_HEIGHT:
+
+                # go the next page and don't write the newline
+                if tracking:
+                    word_num = num_words - length_hint(remaining_words) - 1
+                    if stop_at is not None and stop_at.get(word_num) == (line_before, pixels_before):
+                        stopped_at = word_num
+                        break
+                    if checkpoints is not None:
+                        checkpoints.append((len(command), word_num, line_before, pixels_before))
+                    word_starts.append((word_num, 0))
+                if page_lines is not None:
+                    page_lines.append(BOOK_HEIGHT)
+                command.append(command_new_page)
+                curr_line = 1
+                continue
+
+            else:
+
+                # go to the next line
+                curr_line += 1
+
+            curr_num_pixels = 0
+
+        # if the current line is off the page,
+        if curr_line > BOOK_HEIGHT or new_word == PAGE_END:
+
+            # go the next page (if the word was too long for a line, part of it is on the last page already,
+            # and the page starts with the next word)
+            if tracking:
+                word_num = num_words - length_hint(remaining_words) - 1
+                if not new_word:
+                    word_starts.append((word_num + 1, 0))
+                else:
+                    if stop_at is not None and stop_at.get(word_num) == (line_before, pixels_before):
+                        stopped_at = word_num
+                        break
+                    if checkpoints is not None:
+                        checkpoints.append((len(command), word_num, line_before, pixels_before))
+                    word_starts.append((word_num, 0))
+            if page_lines is not None:
+                page_lines.append(min(curr_line, BOOK_HEIGHT))
+            command.append(command_new_page)
+            curr_line = 1
+            curr_num_pixels = 0
+
+        # add the current word to the page
+        if new_word != PAGE_END:
+            command.append(new_word)
+            curr_num_pixels += curr_word_num_pixels
+
+            # if the word isn't made up of whitespace, add a space at the end of it
+            if new_word.strip():
+                command.append(" ")
+                curr_num_pixels += space_num_pixels
+
+    if page_starts is not None:
+        page_starts += get_text_positions(text, spaced_text, all_words, word_starts)
+    if page_lines is not None and stopped_at is None:
+        page_lines.append(curr_line)
+    return stopped_at
+
+
+def get_unescaped_positions(escaped_text: str, positions: list[int], escape: str) -> list[int]:
+    """
+    Find where positions in an escaped text are in the text before it was escaped.
+
+    Parameters
+    ----------
+    escaped_text: str
+        The escaped text.
+
+    positions: list[int]
+        The positions in the escaped text, in order. A position inside an escape sequence is taken to be after
+        it, since a page that starts there starts after it (see `pieces_to_pages`).
+
+    escape: str
+        The escape sequence the text was escaped with (from `ESCAPE_CHARS`).
+
+    Returns
+    -------
+    list[int]
+        The position in the unescaped text of each position.
+    """
+
+    unescaped_positions = []
+    num_removed = 0
+    matches = get_unescape_pattern(escape).finditer(escaped_text)
+    match = next(matches, None)
+    for position in positions:
+        while match is not None and match.start() < position:
+            num_removed += len(match[0]) - 1
+            position = max(position, match.end())
+            match = next(matches, None)
+        unescaped_positions.append(position - num_removed)
+    return unescaped_positions
+
+
+def get_text_positions(
+    text: str, spaced_text: str, words: list[str], word_positions: list[tuple[int, int]]
+) -> Iterator[int]:
+    """
+    Find where positions in the words `lay_out_text` splits a text into are in the text.
+
+    Parameters
+    ----------
+    text: str
+        The text.
+
+    spaced_text: str
+        The text with a space before and after every newline, which the words were split from.
+
+    words: list[str]
+        The words.
+
+    word_positions: list[tuple[int, int]]
+        The word and how far into it of each position, in order. A word past the last one is the end of the text.
+
+    Returns
+    -------
+    Iterator[int]
+        The position in the text of each position.
+    """
+
+    spaced_position = 0
+    num_newlines = 0
+    num_words = 0
+    for word_num, offset in word_positions:
+        previous_position = spaced_position
+        spaced_position += sum(map(len, words[num_words:word_num])) + word_num - num_words
+        num_words = word_num
+
+        # every newline before the position added a space before and after it
+        num_newlines += spaced_text.count("\n", previous_position, spaced_position)
+        position = spaced_position - 2 * num_newlines + offset
+        if word_num < len(words) and words[word_num] == "\n":
+            position -= 1
+        yield min(position, len(text))
+
+
+def pieces_to_pages(pieces: list[str], escape: str) -> list[str]:
+    """
+    Join the pieces of a layout made with newlines as page starts into its pages.
+
+    Parameters
+    ----------
+    pieces: list[str]
+        The pieces `lay_out_text` added, with a newline at the start of every page but the first.
+
+    escape: str
+        The escape sequence the text was escaped with (from `ESCAPE_CHARS`).
+
+    Returns
+    -------
+    list[str]
+        The escaped text of each page.
+    """
+
+    escaped_text = "".join(pieces)
+
+    # a page can start partway through an escape sequence (like between a two character escape sequence and
+    # the character it escapes), which always leaves a slash right before the page start, so keep the whole
+    # escape sequence on the page it started on and start the next page after it
+    if "\\\n" in escaped_text:
+        escaped_text = get_split_escape_pattern(escape).sub(
+            lambda match: match[0].replace("\n", "") + "\n" * match[0].count("\n"), escaped_text
+        )
+    return escaped_text.split("\n")
+
+
+def common_prefix_length(text: str, other_text: str) -> int:
+    """
+    Find how many characters two texts start with in common.
+
+    Parameters
+    ----------
+    text: str
+        One text.
+
+    other_text: str
+        The other text.
+
+    Returns
+    -------
+    int
+        The length of the longest string both texts start with.
+    """
+
+    # compare big blocks until one differs, then binary search for the first difference in it
+    length = min(len(text), len(other_text))
+    low = 0
+    while low < length and text[low : low + COMPARE_BLOCK_SIZE] == other_text[low : low + COMPARE_BLOCK_SIZE]:
+        low += COMPARE_BLOCK_SIZE
+    high = min(low + COMPARE_BLOCK_SIZE, length)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if text[low:middle] == other_text[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return min(low, length)
+
+
+def common_suffix_length(text: str, other_text: str, max_length: int) -> int:
+    """
+    Find how many characters two texts end with in common.
+
+    Parameters
+    ----------
+    text: str
+        One text.
+
+    other_text: str
+        The other text.
+
+    max_length: int
+        The most characters to count (so the end doesn't overlap the start the texts have in common).
+
+    Returns
+    -------
+    int
+        The length of the longest string (up to `max_length`) both texts end with.
+    """
+
+    return min(common_prefix_length(text[::-1], other_text[::-1]), max_length)
+
+
+def get_word_num(text: str, position: int) -> int:
+    """
+    Find which of the words `lay_out_text` splits a text into has the character at a position.
+
+    Parameters
+    ----------
+    text: str
+        The text.
+
+    position: int
+        The position of the character.
+
+    Returns
+    -------
+    int
+        The number of the word the character is in (or the space after).
+    """
+
+    # every newline is a word of its own, with a space added before and after it
+    return text.count(" ", 0, position) + 2 * text.count("\n", 0, position)
+
+
+def relay_out_pages(
+    text: str,
+    escape: str,
+    layout_record: dict[str, Any],
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+) -> list[str]:
+    """
+    Lay out a text into pages, reusing an earlier layout of an earlier draft of it.
+
+    The earlier layout has a checkpoint at the start of every page. The text is only laid out again from
+    the last page that starts before the first edit, and stops as soon as a page starts after the last
+    edit in the same place it did before, since every page after that is the same as before.
+
+    Parameters
+    ----------
+    text: str
+        The text to lay out.
+
+    escape: str
+        The escape sequence for the Minecraft version (from `ESCAPE_CHARS`).
+
+    layout_record: dict[str, Any]
+        The earlier layout, which is replaced with this one. It's empty if the text hasn't been laid out before,
+        and holds the `text`, the `escape` sequence, the `layout`, its escaped `pages`, the position in the text
+        each page starts at (`page_starts`), and a checkpoint for every page that starts between words: the
+        page number, the word that starts it, and the line and pixel before it.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character, which must be the same as the earlier layout's.
+
+    engine: {"default", "translate"}
+        How to measure words (see `text_to_book`).
+
+    Returns
+    -------
+    list[str]
+        The escaped text of each page.
+    """
+
+    previous_text = None
+    if layout_record.get("escape") == escape and layout_record.get("layout") == "greedy":
+        previous_text = layout_record["text"]
+    if previous_text == text:
+        return layout_record["pages"]
+
+    start = (0, 1, 0)
+    first_page = 0
+    checkpoints: list[tuple[int, int, int, int]] = []
+    stop_at: dict[int, tuple[int, int]] = {}
+    resync_checkpoints: dict[int, int] = {}
+
+    if previous_text is not None:
+        previous_pages = layout_record["pages"]
+        previous_checkpoints = layout_record["checkpoints"]
+
+        # the first word that could have changed, and the first word after the last change
+        prefix_length = common_prefix_length(previous_text, text)
+        suffix_length = common_suffix_length(previous_text, text, min(len(previous_text), len(text)) - prefix_length)
+        changed_word_num = get_word_num(text, prefix_length)
+        unchanged_word_num = get_word_num(text, len(text) - suffix_length) + 1
+        word_shift = get_word_num(text, len(text)) - get_word_num(previous_text, len(previous_text))
+
+        # carry on from the last page that starts before the first change, keeping every page before it
+        resume = bisect_left([checkpoint[1] for checkpoint in previous_checkpoints], changed_word_num) - 1
+        if resume >= 0:
+            first_page, word_num, line, num_pixels = previous_checkpoints[resume]
+            start = (word_num, line, num_pixels)
+            checkpoints = [tuple(checkpoint) for checkpoint in previous_checkpoints[:resume]]
+
+        # stop at the first page that starts after the last change the same way it did before
+        for checkpoint_num, (page_num, word_num, line, num_pixels) in enumerate(previous_checkpoints):
+            if word_num + word_shift >= unchanged_word_num:
+                stop_at[word_num + word_shift] = (line, num_pixels)
+                resync_checkpoints[word_num + word_shift] = checkpoint_num
+
+    pieces: list[str] = []
+    new_checkpoints: list[tuple[int, int, int, int]] = []
+    new_page_starts: list[int] = []
+    stopped_at = lay_out_text(
+        text, pieces, "\n", escape, pixel_widths, engine, "greedy", start, new_checkpoints, stop_at, new_page_starts
+    )
+
+    # a layout carried on from a checkpoint starts by starting that checkpoint's page
+    pages = pieces_to_pages(pieces, escape)
+    if first_page:
+        pages = previous_pages[:first_page] + pages[1:]
+        page_starts = layout_record["page_starts"][:first_page] + new_page_starts
+    else:
+        page_starts = [0] + new_page_starts
+
+    # number the pages of the new checkpoints by the page starts before each of them
+    page_num = first_page or 1
+    num_pieces = 0
+    for piece_num, word_num, line, num_pixels in new_checkpoints:
+        page_num += pieces[num_pieces:piece_num].count("\n")
+        num_pieces = piece_num
+        checkpoints.append((page_num, word_num, line, num_pixels))
+
+    # every page from where the layout stopped on is the same as before
+    if stopped_at is not None:
+        resync = resync_checkpoints[stopped_at]
+        resync_page = previous_checkpoints[resync][0]
+        page_shift = len(pages) - resync_page
+        pages += previous_pages[resync_page:]
+        page_starts += [
+            page_start + len(text) - len(previous_text) for page_start in layout_record["page_starts"][resync_page:]
+        ]
+        checkpoints += [
+            (page_num + page_shift, word_num + word_shift, line, num_pixels)
+            for page_num, word_num, line, num_pixels in previous_checkpoints[resync:]
+        ]
+
+    layout_record.update(
+        text=text, escape=escape, layout="greedy", pages=pages, page_starts=page_starts, checkpoints=checkpoints
+    )
+    return pages
+
+
+def lay_out_pages(
+    text: str,
+    escape: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    executor: str = "process",
+) -> list[str]:
+    """
+    Escape a body of text and lay it out into pages.
+
+    Parameters
+    ----------
+    layout_record: dict[str, Any] | None
+        If given, the text's layout is kept in it (see `relay_out_pages`). With the "greedy" layout, only the pages
+        that changed since the layout that's already in it are laid out again.
+
+    jobs: int
+        How many workers to lay out a long text in, split at its page ends (see `lay_out_pages_in_parallel`).
+        Only used without a `layout_record`.
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `make_executor`).
+
+    The other parameters are the same as `lay_out_text`'s.
+
+    Returns
+    -------
+    list[str]
+        The escaped text of each page.
+    """
+
+    if layout_record is not None and layout == "greedy":
+        return relay_out_pages(text, escape, layout_record, pixel_widths, engine)
+    if layout_record is None and jobs > 1 and len(text) >= 2 * PARALLEL_CHUNK_MIN_LENGTH:
+        return lay_out_pages_in_parallel(text, escape, pixel_widths, engine, layout, jobs, executor)
+
+    # escaped text never has a raw newline in it, so one can mark where each page starts
+    pieces: list[str] = []
+    if layout_record is None:
+        lay_out_text(text, pieces, "\n", escape, pixel_widths, engine, layout)
+        return pieces_to_pages(pieces, escape)
+
+    # other layouts can't be carried on from a checkpoint, so they're only recorded
+    page_starts: list[int] = []
+    lay_out_text(text, pieces, "\n", escape, pixel_widths, engine, layout, page_starts=page_starts)
+    pages = pieces_to_pages(pieces, escape)
+    layout_record.clear()
+    layout_record.update(
+        text=text, escape=escape, layout=layout, pages=pages, page_starts=[0] + page_starts, checkpoints=[]
+    )
+    return pages
+
+
+def lay_out_pages_in_parallel(
+    text: str,
+    escape: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    jobs: int = 2,
+    executor: str = "process",
+) -> list[str]:
+    """
+    Escape a body of text and lay it out into pages in several workers, exactly like `lay_out_pages` does.
+
+    Every layout starts a new page from the top at a `PAGE_END`, just like at the start of the text, so the text
+    between page ends can be laid out on its own, and the pages of each piece put one after another. The text is
+    split at the page ends closest to evenly spaced points, so each worker gets about as much text. A text with
+    no page ends in the right places is laid out in one piece.
+
+    Parameters
+    ----------
+    jobs: int
+        How many workers to lay out the text in.
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `make_executor`).
+
+    The other parameters are the same as `lay_out_text`'s.
+
+    Returns
+    -------
+    list[str]
+        The escaped text of each page.
+    """
+
+    page_ends = [match.span() for match in PAGE_END_WORD_PATTERN.finditer(text)]
+    num_chunks = min(jobs * PARALLEL_CHUNKS_PER_JOB, len(text) // PARALLEL_CHUNK_MIN_LENGTH)
+
+    # split at the first page end after each evenly spaced point, leaving out the page end and the spaces next to it
+    # (the empty word a space at the end of a piece makes would go to the next line if the last line were overfull)
+    chunks = []
+    chunk_start = 0
+    for chunk_num in range(1, num_chunks):
+        page_end_num = bisect_left(page_ends, (max(len(text) * chunk_num // num_chunks, chunk_start),))
+        if page_end_num == len(page_ends):
+            break
+        page_end_start, page_end_stop = page_ends[page_end_num]
+        if page_end_start > chunk_start and text[page_end_start - 1] == " ":
+            page_end_start -= 1
+        chunks.append(text[chunk_start:page_end_start])
+        chunk_start = page_end_stop + (text[page_end_stop : page_end_stop + 1] == " ")
+    chunks.append(text[chunk_start:])
+
+    if len(chunks) == 1:
+        return lay_out_pages(text, escape, pixel_widths, engine, layout)
+
+    pages = []
+    # threads share the caller's widths, and processes were sent them when they started
+    worker_widths = pixel_widths if executor == "thread" else None
+    with make_executor(executor, min(jobs, len(chunks)), pixel_widths) as workers:
+        for chunk_pages in workers.map(
+            lay_out_chunk, chunks, repeat(escape), repeat(engine), repeat(layout), repeat(worker_widths)
+        ):
+            pages += chunk_pages
+    return pages
+
+
+def choose_page_quote(
+    num_single_quotes: int, num_double_quotes: int, page_quotes: dict[str, tuple[str, str, str, str]]
+) -> tuple[str, str, str, str]:
+    """
+    Choose whichever quote makes a page with this many quotes in it shortest.
+
+    Parameters
+    ----------
+    num_single_quotes: int
+        How many ' are in the page.
+
+    num_double_quotes: int
+        How many " are in the page.
+
+    page_quotes: dict[str, tuple[str, str, str, str]]
+        The `PAGE_QUOTES` entry for the Minecraft version.
+
+    Returns
+    -------
+    tuple[str, str, str, str]
+        The `PAGE_QUOTES` entry of the quote: what the page starts and ends with, and how ' and " are written in it.
+    """
+
+    return min(
+        page_quotes.values(),
+        key=lambda quote: len(quote[0])
+        + len(quote[1])
+        + num_single_quotes * len(quote[2])
+        + num_double_quotes * len(quote[3]),
+    )
+
+
+def quote_page(page: str, escape: str, page_quotes: dict[str, tuple[str, str, str, str]]) -> str:
+    """
+    Quote a page in whichever quote makes it shortest.
+
+    The text is escaped as if the page were in single quotes, so every ' and " in it has to be escaped, but
+    a page in single quotes doesn't need its double quotes escaped (and vice versa). Dialogue is mostly
+    one kind of quote, so this usually leaves far fewer escapes.
+
+    Parameters
+    ----------
+    page: str
+        The escaped text of the page (see `lay_out_pages`).
+
+    escape: str
+        The escape sequence the text was escaped with (from `ESCAPE_CHARS`).
+
+    page_quotes: dict[str, tuple[str, str, str, str]]
+        The `PAGE_QUOTES` entry for the Minecraft version.
+
+    Returns
+    -------
+    str
+        The page, quoted.
+    """
+
+    num_single_quotes = page.count("'")
+    num_double_quotes = page.count('"')
+    start, end, single_quote, double_quote = choose_page_quote(num_single_quotes, num_double_quotes, page_quotes)
+
+    # every quote in the text is escaped (so replacing its escape sequence can't touch anything else)
+    if num_single_quotes and single_quote != "\\'":
+        page = page.replace("\\'", single_quote)
+    if num_double_quotes and double_quote != escape + '"':
+        page = page.replace(escape + '"', double_quote)
+    return start + page + end
+
+
+def get_page_ranges(start: str, quoted_pages: list[str]) -> list[tuple[int, int]]:
+    """
+    Find where each page of a book is in its command, so a single page can be read without reading the rest.
+
+    Parameters
+    ----------
+    start: str
+        The part of the command before the pages.
+
+    quoted_pages: list[str]
+        The quoted pages, which are separated by commas in the command.
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        The start and end of each page, in bytes of the command encoded in UTF-8.
+    """
+
+    page_ranges = []
+    position = len(start.encode("utf-8"))
+    for page in quoted_pages:
+        end = position + (len(page) if page.isascii() else len(page.encode("utf-8")))
+        page_ranges.append((position, end))
+        position = end + 1
+    return page_ranges
+
+
+def index_pages(
+    layout_record: dict[str, Any], command_position: int = 0, volume_num: int = 0
+) -> list[dict[str, list[int]]]:
+    """
+    Find where each page of a converted book came from in its text, and where it is in the output.
+
+    Parameters
+    ----------
+    layout_record: dict[str, Any]
+        The layout record the book was converted with (see `text_to_book` and `text_to_volumes`).
+
+    command_position: int
+        The byte the book's command starts at in the output.
+
+    volume_num: int
+        Which of the text's books (volumes) to index, counting from 0, if it was split into several.
+
+    Returns
+    -------
+    list[dict[str, list[int]]]
+        The start and end of each page in the `text` (in characters of the book's text) and in the output (in `bytes`).
+    """
+
+    volume_sizes = layout_record.get("volume_sizes", [len(layout_record["page_ranges"])])
+    first_page = sum(volume_sizes[:volume_num])
+    pages = slice(first_page, first_page + volume_sizes[volume_num])
+
+    text_ends = layout_record["page_starts"][1:] + [len(layout_record["text"])]
+    return [
+        {"text": [text_start, text_end], "bytes": [command_position + byte_start, command_position + byte_end]}
+        for text_start, text_end, (byte_start, byte_end) in zip(
+            layout_record["page_starts"][pages], text_ends[pages], layout_record["page_ranges"][pages]
+        )
+    ]
+
+
+def text_to_book(
+    text: str,
+    title: str,
+    author: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    pages: list[str] | None = None,
+    executor: str = "process",
+) -> str:
+    """
+    Takes a body of text and converts it to a command for a single Minecraft book.
+
+    The book has every page, even past the `BOOK_MAX_PAGES` a written book can have (see `text_to_volumes`).
+
+    Parameters
+    ----------
+    text: str
+        The text to convert to a Minecraft book.
+
+    title: str
+        The title to give the Minecraft book.
+
+    author: str
+        The author to give the Minecraft book.
+
+    mc_version: str
+        The version of Minecraft being used for the command.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character. Defaults to `PIXEL_WIDTHS`.
+
+    engine: {"default", "translate"}
+        How to measure words. "default" looks up every character's width in Python, while "translate"
+        measures the whole text with one `str.translate` call, which is faster on non-ASCII text with short words
+        (like accented Latin or punctuated Chinese). Either way, pure-ASCII text is measured with a specialized path
+        that gives identical results.
+
+    layout: {"greedy", "optimal"}
+        How to choose where pages end. "greedy" fills every page as full as it can, while "optimal" finds the
+        fewest pages possible and ends them between paragraphs where it can (see `find_optimal_page_breaks`).
+
+    layout_record: dict[str, Any] | None
+        If given, the book's layout is kept in it, so the next time an edited version of the text is converted
+        with it, only the pages from the first edit on are laid out again (see `relay_out_pages`). Where each
+        page is in the command is kept in it too (see `get_page_ranges`).
+
+    jobs: int
+        How many workers to lay out the book in. A long book is split at its `PAGE_END`s and the pieces are laid
+        out at once, with exactly the same pages as laying it out in one piece. Not used with a `layout_record`.
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `make_executor`). Threads only lay out pieces at once
+        on free-threaded Python.
+
+    pages: list[str] | None
+        The book's escaped pages, if they're already laid out (like one volume's, see `text_to_volumes`), so the
+        text isn't laid out again. Only where each page is in the command is kept in the `layout_record`.
+
+    Returns
+    -------
+    str
+        The command to generate a book with the input text written in it.
+    """
+
+    command_start, command_end, escape, page_quotes = get_version_profile(mc_version)
+    if pages is None:
+        pages = lay_out_pages(text, escape, pixel_widths, engine, layout, layout_record, jobs, executor)
+    quoted_pages = [quote_page(page, escape, page_quotes) for page in pages]
+    if layout_record is not None:
+        layout_record["page_ranges"] = get_page_ranges(command_start, quoted_pages)
+
+    return "".join(
+        (
+            command_start,
+            ",".join(quoted_pages),
+            command_end.replace("{BOOK_TITLE}", title).replace("{BOOK_AUTHOR}", author),
+        )
+    )
+
+
+def text_to_book_content(
+    text: str,
+    title: str,
+    author: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    pages: list[str] | None = None,
+    executor: str = "process",
+) -> str:
+    """
+    Takes a body of text and converts it to the contents of a Minecraft book: the part of `text_to_book`'s command
+    with its pages, title and author, which can be put in other commands (like a chest full of books).
+
+    The parameters are the same as `text_to_book`'s.
+
+    Returns
+    -------
+    str
+        The book's pages, title and author, in the format a written book item holds them in.
+    """
+
+    _, _, escape, page_quotes = get_version_profile(mc_version)
+    if pages is None:
+        pages = lay_out_pages(text, escape, pixel_widths, engine, layout, layout_record, jobs, executor)
+    quoted_pages = [quote_page(page, escape, page_quotes) for page in pages]
+    if layout_record is not None:
+        layout_record["page_ranges"] = get_page_ranges(BOOK_CONTENT_START, quoted_pages)
+
+    return "".join(
+        (
+            BOOK_CONTENT_START,
+            ",".join(quoted_pages),
+            BOOK_CONTENT_END.replace("{BOOK_TITLE}", title).replace("{BOOK_AUTHOR}", author),
+        )
+    )
+
+
+def bundle_books(
+    book_contents: Iterable[str], mc_version: str = DEFAULT_MC_VERSION, container: str = "chest", place: bool = False
+) -> Iterator[str]:
+    """
+    Pack books into containers, so a single command gives (or places) a whole container full of them.
+
+    Parameters
+    ----------
+    book_contents: Iterable[str]
+        The contents of each book (see `text_to_book_content`).
+
+    mc_version: str
+        The version of Minecraft being used for the commands.
+
+    container: {"chest", "trapped_chest", "barrel", "shulker_box"}
+        The container to pack the books in.
+
+    place: bool
+        Whether to place each container above the player with `/setblock`, instead of giving it to them.
+
+    Returns
+    -------
+    Iterator[str]
+        The command for each container, as soon as it's full (or the books run out).
+    """
+
+    if place:
+        starts, ends, book_templates = CONTAINER_SETBLOCK_START, CONTAINER_SETBLOCK_END, CONTAINER_SETBLOCK_BOOK
+    else:
+        starts, ends, book_templates = CONTAINER_GIVE_START, CONTAINER_GIVE_END, CONTAINER_GIVE_BOOK
+    command_start = get_command_by_version(starts, mc_version).replace("{CONTAINER}", container)
+    command_end = get_command_by_version(ends, mc_version)
+    book_template = get_command_by_version(book_templates, mc_version)
+
+    command = [command_start]
+    num_books = 0
+    for book_content in book_contents:
+
+        # if the container is full, finish its command and start the next container
+        if num_books == CONTAINER_SIZE:
+            command.append(command_end)
+            yield "".join(command)
+            command = [command_start]
+            num_books = 0
+
+        # the book template is filled in piece by piece so nothing in the book itself can be mistaken for a blank
+        book_start, book_end = book_template.replace("{SLOT}", str(num_books)).split("{BOOK}")
+        if num_books:
+            command.append(",")
+        command += (book_start, book_content, book_end)
+        num_books += 1
+
+    if num_books:
+        command.append(command_end)
+        yield "".join(command)
+
+
+@lru_cache(maxsize=None)
+def get_unescape_pattern(escape: str) -> re.Pattern:
+    """
+    Get a regular expression matching every escape sequence `escape_text` makes with an escape sequence.
+
+    Parameters
+    ----------
+    escape: str
+        The escape sequence for the Minecraft version (from `ESCAPE_CHARS`).
+
+    Returns
+    -------
+    re.Pattern
+        The pattern, with the escaped character (or nothing, for a single quote) as its second group. The first
+        group is a newline between the escape sequence and the character it escapes, if there is one.
+    """
+
+    return re.compile(f"{re.escape(escape)}(\n?)({re.escape(escape)}|\"|n)|\\\\'")
+
+
+@lru_cache(maxsize=None)
+def get_split_escape_pattern(escape: str) -> re.Pattern:
+    """
+    Get a regular expression matching every escape sequence `escape_text` makes, even with page starts in it.
+
+    Parameters
+    ----------
+    escape: str
+        The escape sequence for the Minecraft version (from `ESCAPE_CHARS`).
+
+    Returns
+    -------
+    re.Pattern
+        The pattern, which allows a newline (a page start, see `pieces_to_pages`) between any two characters of
+        an escape sequence.
+    """
+
+    escape_pattern = "\n?".join(map(re.escape, escape))
+    quote_pattern = "\n?".join(map(re.escape, "\\'"))
+    return re.compile(f'{escape_pattern}\n?(?:{escape_pattern}|"|n)|{quote_pattern}')
+
+
+def unescape_text(text: str, escape: str) -> str:
+    """
+    Undo `escape_text`.
+
+    Parameters
+    ----------
+    text: str
+        The escaped text.
+
+    escape: str
+        The escape sequence the text was escaped with (from `ESCAPE_CHARS`).
+
+    Returns
+    -------
+    str
+        The text as it was before it was escaped.
+    """
+
+    # read the escapes left to right, so an escaped slash is never taken as the start of another escape
+    escaped_characters = {escape: "\\", '"': '"', "n": "\n"}
+    pattern = get_unescape_pattern(escape)
+    return pattern.sub(lambda match: escaped_characters.get(match[2], "'"), text)
+
+
+def text_to_pages(
+    text: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    pages: list[str] | None = None,
+    executor: str = "process",
+) -> list[str]:
+    """
+    Takes a body of text and splits it into the pages of a Minecraft book, exactly as `text_to_book` would.
+
+    Parameters
+    ----------
+    text: str
+        The text to split into pages.
+
+    mc_version: str
+        The version of Minecraft the book is for.
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character. Defaults to `PIXEL_WIDTHS`.
+
+    engine: {"default", "translate"}
+        How to measure words (see `text_to_book`).
+
+    layout: {"greedy", "optimal"}
+        How to choose where pages end (see `text_to_book`).
+
+    layout_record: dict[str, Any] | None
+        Where to keep the book's layout between conversions (see `text_to_book`).
+
+    jobs: int
+        How many workers to lay out the book in (see `text_to_book`).
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `text_to_book`).
+
+    pages: list[str] | None
+        The escaped pages, if they're already laid out (see `text_to_book`).
+
+    Returns
+    -------
+    list[str]
+        The (unescaped) text of each page.
+    """
+
+    escape = get_version_profile(mc_version)[2]
+    if pages is None:
+        pages = lay_out_pages(text, escape, pixel_widths, engine, layout, layout_record, jobs, executor)
+    return [unescape_text(page, escape) for page in pages]
+
+
+def text_to_loot_table(
+    text: str,
+    title: str,
+    author: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    pages: list[str] | None = None,
+    executor: str = "process",
+) -> str:
+    """
+    Takes a body of text and converts it to a data pack loot table that drops a single Minecraft book.
+
+    The server only parses a loot table once, when the data pack loads, and `/loot give @p loot <loot table>`
+    gives the book with a tiny command, instead of parsing the whole book's `/give` command every time.
+
+    Parameters
+    ----------
+    text: str
+        The text to convert to a Minecraft book.
+
+    title: str
+        The title to give the Minecraft book.
+
+    author: str
+        The author to give the Minecraft book.
+
+    mc_version: str
+        The version of Minecraft the loot table is for (1.20.5 or later).
+
+    pixel_widths: dict[str, int]
+        The pixel width of each character. Defaults to `PIXEL_WIDTHS`.
+
+    engine: {"default", "translate"}
+        How to measure words (see `text_to_book`).
+
+    layout: {"greedy", "optimal"}
+        How to choose where pages end (see `text_to_book`).
+
+    layout_record: dict[str, Any] | None
+        Where to keep the book's layout between conversions (see `text_to_book`).
+
+    jobs: int
+        How many workers to lay out the book in (see `text_to_book`).
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `text_to_book`).
+
+    pages: list[str] | None
+        The escaped pages, if they're already laid out (see `text_to_book`).
+
+    Returns
+    -------
+    str
+        The loot table's JSON.
+    """
+
+    if Version(mc_version) < Version(LOOT_TABLE_MIN_VERSION):
+        raise ValueError(f"Loot tables can't set book pages before Minecraft {LOOT_TABLE_MIN_VERSION}.")
+
+    pages = text_to_pages(text, mc_version, pixel_widths, engine, layout, layout_record, jobs, pages, executor)
+    loot_table = {
+        "pools": [
+            {
+                "rolls": 1,
+                "entries": [
+                    {
+                        "type": "minecraft:item",
+                        "name": "minecraft:written_book",
+                        "functions": [
+                            {"function": "minecraft:set_written_book_pages", "pages": pages, "mode": "replace_all"},
+                            {"function": "minecraft:set_book_cover", "title": title, "author": author},
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+    return json.dumps(loot_table, ensure_ascii=False, indent=2)
+
+
+def text_to_book_nbt(
+    text: str,
+    title: str,
+    author: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    pages: list[str] | None = None,
+    executor: str = "process",
+) -> bytes:
+    """
+    Takes a body of text and converts it to a written book item in binary NBT, to put in a structure file.
+
+    The parameters are the same as `text_to_book`'s.
+
+    Returns
+    -------
+    bytes
+        The item's tags (besides the slot it's in), without the end of the compound they're in.
+    """
+
+    if Version(mc_version) < Version(min(DATA_VERSIONS, key=Version)):
+        raise ValueError(f"Structure files can't be loaded before Minecraft {min(DATA_VERSIONS, key=Version)}.")
+
+    page_format = get_command_by_version(NBT_PAGE_FORMAT, mc_version)
+    page_start, _, page_end = page_format.replace("{TEXT}", "{JSON}").partition("{JSON}")
+    pages = text_to_pages(text, mc_version, pixel_widths, engine, layout, layout_record, jobs, pages, executor)
+    if "{JSON}" in page_format:
+        pages = [page_start + json.dumps(page, ensure_ascii=False) + page_end for page in pages]
+
+    item = io.BytesIO()
+    nbt = NbtWriter(item)
+    nbt.write_string("minecraft:written_book", "id")
+    if Version(mc_version) >= Version(ITEM_COMPONENTS_MIN_VERSION):
+        nbt.write_int(1, "count")
+        nbt.begin_compound("components")
+        nbt.begin_compound("minecraft:written_book_content")
+    else:
+        nbt.write_byte(1, "Count")
+        nbt.begin_compound("tag")
+
+    nbt.begin_list(TAG_STRING, len(pages), "pages")
+    for page in pages:
+        nbt.write_string(page)
+    nbt.write_string(title, "title")
+    nbt.write_string(author, "author")
+
+    nbt.end_compound()
+    if Version(mc_version) >= Version(ITEM_COMPONENTS_MIN_VERSION):
+        nbt.end_compound()
+    return item.getvalue()
+
+
+def estimate_book(
+    text: str,
+    title: str,
+    author: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    max_pages: int = BOOK_MAX_PAGES,
+) -> dict[str, int]:
+    """
+    Count the books, pages and lines `text_to_volumes` would make (with the "command" format), and how big their
+    commands would be, without making them.
+
+    The text is laid out exactly like it is for a conversion, but the pages are never quoted or put together into
+    commands: how long each would be once quoted is worked out from its length and how many quotes are in it.
+
+    The parameters are the same as `text_to_volumes`'s (but `layout_record` and `jobs` aren't used).
+
+    Returns
+    -------
+    dict[str, int]
+        The number of `books` (volumes), the number of `pages` in them, the number of `lines` the pages take up,
+        and the number of `bytes` in the books' commands (encoded in UTF-8).
+    """
+
+    command_start, command_end, escape, page_quotes = get_version_profile(mc_version)
+
+    pieces: list[str] = []
+    page_lines: list[int] = []
+    lay_out_text(text, pieces, "\n", escape, pixel_widths, engine, layout, page_lines=page_lines)
+    pages = pieces_to_pages(pieces, escape)
+
+    # the escaped pages (every character of which but the text's own is ASCII), and how much longer quoting each
+    # one makes it (see `quote_page`)
+    num_bytes = len("".join(pages).encode("utf-8"))
+    for page in pages:
+        num_single_quotes = page.count("'")
+        num_double_quotes = page.count('"')
+        start, end, single_quote, double_quote = choose_page_quote(num_single_quotes, num_double_quotes, page_quotes)
+        num_bytes += (
+            len(start)
+            + len(end)
+            + num_single_quotes * (len(single_quote) - 2)
+            + num_double_quotes * (len(double_quote) - len(escape) - 1)
+        )
+
+    # the pages are split between as many volumes as they take, and separated by commas in each
+    num_pages = len(pages)
+    num_books = -(-num_pages // max_pages)
+    titles = (
+        [title] if num_books == 1 else [get_volume_title(title, volume_num) for volume_num in range(1, num_books + 1)]
+    )
+    num_bytes += num_books * len(command_start.encode("utf-8")) + num_pages - num_books
+    for book_title in titles:
+        num_bytes += len(
+            command_end.replace("{BOOK_TITLE}", book_title).replace("{BOOK_AUTHOR}", author).encode("utf-8")
+        )
+    return {"books": num_books, "pages": num_pages, "lines": sum(page_lines), "bytes": num_bytes}
+
+
+def estimate(
+    text: str,
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+) -> dict[str, int]:
+    """
+    Count the books, pages and lines `text_to_many_books` would make from a body of text, and how big the output
+    file of their commands would be, without making them (see `estimate_book`).
+
+    The parameters are the same as `text_to_many_books`'s.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of `books`, `pages` and `lines`, and the number of `bytes` of commands (one per line).
+    """
+
+    return sum_estimates(
+        iter_books(text, title, author, in_line_titles, mc_version, pixel_widths, engine, layout, "estimate")
+    )
+
+
+def sum_estimates(book_estimates: Iterable[dict[str, int]]) -> dict[str, int]:
+    """
+    Add up the estimates of many documents' books (see `estimate_book`).
+
+    Parameters
+    ----------
+    book_estimates: Iterable[dict[str, int]]
+        The estimate of each document's books.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of `books`, `pages` and `lines`, and the number of `bytes` of commands (one per line).
+    """
+
+    total = {"books": 0, "pages": 0, "lines": 0, "bytes": 0}
+    for book_estimate in book_estimates:
+        total["books"] += book_estimate["books"]
+        total["pages"] += book_estimate["pages"]
+        total["lines"] += book_estimate["lines"]
+        total["bytes"] += book_estimate["bytes"] + book_estimate["books"]
+    return total
+
+
+# what text_to_many_books and its relatives can convert each book to
+BOOK_FORMATS = {
+    "command": text_to_book,
+    "loot_table": text_to_loot_table,
+    "book_content": text_to_book_content,
+    "book_nbt": text_to_book_nbt,
+    "estimate": estimate_book,
+}
+
+
+def get_volume_title(title: str, volume_num: int) -> str:
+    """
+    Title one volume of a text too long for one book (see `VOLUME_TITLE`).
+
+    The text's title is cut short, if it has to be, so the volume's title fits in `BOOK_MAX_TITLE_LENGTH` characters
+    with its number.
+
+    Parameters
+    ----------
+    title: str
+        The title of the whole text.
+
+    volume_num: int
+        Which volume it is, counting from 1.
+
+    Returns
+    -------
+    str
+        The volume's title.
+    """
+
+    volume_title = VOLUME_TITLE.replace("{VOLUME}", str(volume_num))
+    max_title_length = BOOK_MAX_TITLE_LENGTH - len(volume_title.replace("{BOOK_TITLE}", ""))
+    return volume_title.replace("{BOOK_TITLE}", title[: max(max_title_length, 0)].rstrip()).strip()
+
+
+def text_to_volumes(
+    text: str,
+    title: str,
+    author: str,
+    mc_version: str,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
+    layout_record: dict[str, Any] | None = None,
+    jobs: int = 1,
+    max_pages: int = BOOK_MAX_PAGES,
+    executor: str = "process",
+) -> list:
+    """
+    Takes a body of text and converts it to as many Minecraft books as its pages need, since a written book can
+    only have `max_pages` pages.
+
+    The text is laid out once, and its pages are split between the books in order. If there's more than one, each
+    is titled as a volume, like "Title (Vol. 2)" (see `get_volume_title`).
+
+    Parameters
+    ----------
+    book_format: {"command", "loot_table", "book_content", "book_nbt", "estimate"}
+        What to convert each book to (see `text_to_many_books`). With "estimate", a single estimate of all the
+        books is made instead (see `estimate_book`).
+
+    layout_record: dict[str, Any] | None
+        Where to keep the text's layout between conversions (see `text_to_book`). How many pages each book has is
+        kept in it too, as its `volume_sizes`, and each page's `page_ranges` are in its own book's command.
+
+    max_pages: int
+        The most pages each book can have.
+
+    The other parameters are the same as `text_to_book`'s.
+
+    Returns
+    -------
+    list
+        Each book, as `book_format` makes it.
+    """
+
+    if book_format == "estimate":
+        return [estimate_book(text, title, author, mc_version, pixel_widths, engine, layout, max_pages=max_pages)]
+
+    escape = get_version_profile(mc_version)[2]
+    pages = lay_out_pages(text, escape, pixel_widths, engine, layout, layout_record, jobs, executor)
+    volumes = [pages[start : start + max_pages] for start in range(0, len(pages), max_pages)]
+
+    books = []
+    page_ranges = []
+    for volume_num, volume_pages in enumerate(volumes, 1):
+        volume_record = None if layout_record is None else {}
+        books.append(
+            BOOK_FORMATS[book_format](
+                text,
+                title if len(volumes) == 1 else get_volume_title(title, volume_num),
+                author,
+                mc_version,
+                pixel_widths,
+                engine,
+                layout,
+                volume_record,
+                pages=volume_pages,
+            )
+        )
+        if volume_record is not None:
+            page_ranges += volume_record.get("page_ranges", [])
+
+    if layout_record is not None:
+        layout_record["page_ranges"] = page_ranges
+        layout_record["volume_sizes"] = list(map(len, volumes))
+    return books
+
+
+def split_documents(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Split text read in pieces into the documents between each `BOOK_END`, as soon as each one is complete.
+
+    Parameters
+    ----------
+    chunks: Iterable[str]
+        The text, in pieces of any size (like blocks read from a file). A `BOOK_END` can be split between pieces.
+
+    Returns
+    -------
+    Iterator[str]
+        Each document, the same as `text.split(BOOK_END)` would give.
+    """
+
+    # the pieces of the current document, and its end, which could be the start of a BOOK_END
+    pending: list[str] = []
+    tail = ""
+    for chunk in chunks:
+        if BOOK_END not in tail + chunk:
+            pending.append(chunk)
+            tail = (tail + chunk)[1 - len(BOOK_END) :]
+            continue
+
+        *documents, rest = "".join(pending + [chunk]).split(BOOK_END)
+        yield from documents
+        pending = [rest]
+        tail = rest[1 - len(BOOK_END) :]
+
+    yield "".join(pending)
+
+
+def documents_to_books(
+    documents: Iterable[str],
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
+    layout_records: list[dict[str, Any]] | None = None,
+    jobs: int = 1,
+    executor: str = "process",
+) -> Iterator[str]:
+    """
+    Convert documents to Minecraft books one at a time, splitting any with too many pages for one book into volumes
+    (see `text_to_volumes`).
+
+    Parameters
+    ----------
+    documents: Iterable[str]
+        The text of each book.
+
+    layout_records: list[dict[str, Any]] | None
+        If given, the layout of each book is kept in it, in the same order as the documents, so converting
+        edited documents again with it only lays out the pages that changed (see `relay_out_pages`).
+
+    jobs: int
+        How many workers to lay out each book in (see `text_to_book`).
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `text_to_book`).
+
+    The other parameters are the same as `text_to_many_books`'s.
+
+    Returns
+    -------
+    Iterator[str]
+        The command to generate each book, as soon as it's converted.
+    """
+
+    num_documents = 0
+    for document in documents:
+        document = document.strip()
+        if in_line_titles:
+            title = document[: document.index("\n")].strip()
+            document = document[document.index("\n") + 1 :]
+        elif title is None:
+            title = ""
+
+        if author is None:
+            author = ""
 
+        if layout_records is None:
+            yield from text_to_volumes(
+                document,
+                title,
+                author,
+                mc_version,
+                pixel_widths,
+                engine,
+                layout,
+                book_format,
+                jobs=jobs,
+                executor=executor,
+            )
+        else:
+            if num_documents == len(layout_records):
+                layout_records.append({})
+            yield from text_to_volumes(
+                document,
+                title,
+                author,
+                mc_version,
+                pixel_widths,
+                engine,
+                layout,
+                book_format,
+                layout_records[num_documents],
+            )
+        num_documents += 1
+
+    # forget the layouts of documents that were removed
+    if layout_records is not None:
+        del layout_records[num_documents:]
+
+
+def iter_books(
+    text: str,
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
+) -> Iterator[str]:
+    """
+    Takes a body of text and converts it to many Minecraft books, yielding each command as soon as it's made.
 
-def get_command_by_version(command_dict: dict, mc_version: str) -> str:
+    The parameters are the same as `text_to_many_books`'s.
+
+    Returns
+    -------
+    Iterator[str]
+        The command to generate each book.
     """
-    Get the correct syntax for the Minecraft command depending on the Minecraft version.
+
+    return documents_to_books(
+        text.split(BOOK_END), title, author, in_line_titles, mc_version, pixel_widths, engine, layout, book_format
+    )
+
+
+def iter_books_from_chunks(
+    chunks: Iterable[str],
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
+) -> Iterator[str]:
+    """
+    Converts text read in pieces to many Minecraft books, yielding each command as soon as its `BOOK_END` is read.
+
+    Only one book's text is held at a time, so archives of any size can be converted with bounded memory.
 
     Parameters
     ----------
-    command_dict: {COMMAND_START, COMMAND_NEW_PAGE, COMMAND_END}
-        The dictionary containing the command portion corresponding to a specific Minecraft version.
+    chunks: Iterable[str]
+        The text, in pieces of any size (like blocks read from a file).
 
-    mc_version: str
-        The version of Minecraft being used for the command.
+    The other parameters are the same as `text_to_many_books`'s.
 
     Returns
     -------
-    str
-        The correct command portion corresponding to `mc_version`.
+    Iterator[str]
+        The command to generate each book.
     """
 
-    return command_dict[
-        max(
-            ([version for version in command_dict if Version(version) <= Version(mc_version)]), key=lambda x: Version(x)
-        )
-    ]
+    return documents_to_books(
+        split_documents(chunks), title, author, in_line_titles, mc_version, pixel_widths, engine, layout, book_format
+    )
 
 
-def text_to_book(text: str, title: str, author: str, mc_version: str) -> str:
+def find_documents(mapping: mmap.mmap | bytes) -> Iterator[tuple[int, int]]:
     """
-    Takes a body of text and converts it to a command for a single Minecraft book.
+    Find where each document between the `BOOK_END`s of an input file starts and ends, without decoding it.
 
     Parameters
     ----------
-    text: str
-        The text to convert to a Minecraft book.
+    mapping: mmap.mmap | bytes
+        The contents of the input file, usually memory-mapped.
 
-    title: str
-        The title to give the Minecraft book.
+    Returns
+    -------
+    Iterator[tuple[int, int]]
+        The byte offsets each document starts and ends at.
+    """
 
-    author: str
-        The author to give the Minecraft book.
+    # BOOK_END is ASCII, and UTF-8 never uses ASCII bytes inside other characters, so its bytes can be searched for
+    book_end = BOOK_END.encode("utf-8")
+
+    start = 0
+    while True:
+        end = mapping.find(book_end, start)
+        if end == -1:
+            break
+        yield start, end
+        start = end + len(book_end)
+
+    yield start, len(mapping)
+
+
+def decode_document(data: bytes) -> str:
+    """
+    Decode a document's bytes the same way reading its file in text mode would.
+
+    Parameters
+    ----------
+    data: bytes
+        The document's bytes, encoded as UTF-8.
 
     Returns
     -------
     str
-        The command to generate a book with the input text written in it.
+        The document's text, with every line ending made a newline.
     """
 
-    # add a space before and after every newline, then split by spaces
-    words = text.replace("\n", " \n ").split(" ")
+    return data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
 
-    command = get_command_by_version(COMMAND_START, mc_version)
 
-    curr_line = 1  # what number line of the current page the program is on
-    curr_num_pixels = 0  # how many pixels on the current line the program is on
+# the character widths each worker process lays out books with, set when the worker starts
+worker_pixel_widths = PIXEL_WIDTHS
 
-    # add every word to the command string
-    for i in range(len(words)):
 
-        curr_word_num_pixels = 0
-        new_word = ""
+def init_worker(pixel_widths: dict[str, int] | None) -> None:
+    """
+    Set up a worker process to convert books, so the character widths are only sent to it once.
 
-        # find the total pixel length of the word and generate the word to be added to the command string
-        for character in words[i]:
+    Parameters
+    ----------
+    pixel_widths: dict[str, int] | None
+        The pixel width of each character, or None to use the built-in widths the worker already has.
+    """
 
-            # if it's the very start of a new page, don't write any newlines
-            if curr_line == 1 and curr_num_pixels == 0 and character == "\n":
-                continue
+    global worker_pixel_widths
+    if pixel_widths is not None:
+        worker_pixel_widths = pixel_widths
 
-            # if a character isn't in the dictionary, assume a pixel spacing of 9 (the max potential spacing of a character)
-            # + 1 pixel because there is a 1 character spacing between characters (with a few but handleable exceptions)
-            curr_word_num_pixels += PIXEL_WIDTHS.get(character, 9) + 1
-
-            # if the character isn't in the dictionary, print which character wasn't recognized
-            if character not in PIXEL_WIDTHS:
-                print("Character currently unrecognized: " + character + ". Using default pixel width 9.")
-
-            # if the character is a \, ", ', or \n, escape it for command formatting
-            if character == "\\":
-                new_word += f"{get_command_by_version(ESCAPE_CHARS, mc_version)}{get_command_by_version(ESCAPE_CHARS, mc_version)}"
-            elif character == '"':
-                new_word += f'{get_command_by_version(ESCAPE_CHARS, mc_version)}"'
-            elif character == "'":
-                new_word += "\\'"
-            elif character == "\n":
-                new_word += f"{get_command_by_version(ESCAPE_CHARS, mc_version)}n"
-            else:
-                new_word += character
 
-        # if the addition of this word would make the line too long
-        if curr_num_pixels + curr_word_num_pixels > BOOK_WIDTH:
+# modules the fork server imports before starting any worker processes, so none of them imports them again: the
+# generator's own dependencies, which (unlike the generator) are found from any folder
+WORKER_PRELOAD_MODULES = ["concurrent.futures", "json", "mmap", "packaging.version"]
 
-            # if the word by itself is longer than a line, add it to the page piecemeal
-            if curr_word_num_pixels > BOOK_WIDTH:
 
-                # continue until every character from the word has been added
-                while len(new_word) > 0:
+def get_worker_context(other_threads: bool | None = None) -> multiprocessing.context.BaseContext:
+    """
+    Get how to start worker processes, so they start with as much as possible already loaded.
 
-                    # if the next character will push the word onto the next line, go to the next line
-                    if curr_num_pixels + PIXEL_WIDTHS.get(new_word[0], 9) + 1 > BOOK_WIDTH:
+    On Linux, a process with no other threads is forked, so its workers share the character widths, version
+    profiles and lookup tables it has loaded copy-on-write. Forking a process with other threads (like
+    `iter_books_pipelined`'s, or a threaded server's) isn't safe, and neither is forking on macOS, so workers are
+    forked from a fork server instead, which has `WORKER_PRELOAD_MODULES` loaded (each worker imports the generator
+    and builds what it needs itself). Where there's no fork server (on Windows), each worker is spawned.
 
-                        curr_line += 1
-                        curr_num_pixels = 0
+    Parameters
+    ----------
+    other_threads: bool | None
+        Whether the process starting the workers has other threads running while it does. If None, it's checked.
 
-                        # if the current line is off the page, go to the next page
-                        if curr_line > BOOK_HEIGHT:
+    Returns
+    -------
+    multiprocessing.context.BaseContext
+        The context to start worker processes with.
+    """
 
-                            command += get_command_by_version(COMMAND_NEW_PAGE, mc_version)
-                            curr_line = 1
+    if other_threads is None:
+        other_threads = threading.active_count() > 1
+    if sys.platform == "linux" and not other_threads:
+        return multiprocessing.get_context("fork")
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
 
-                    # if the character is a slash, then it is the start of an escape sequence
-                    if new_word[0] == "\\":
+    # the preload modules are only imported when the fork server starts, and every pool after that uses it too
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(WORKER_PRELOAD_MODULES)
+    return context
 
-                        # count the character after the slash but not the slash itself, then skip both
-                        curr_num_pixels += PIXEL_WIDTHS.get(new_word[1], 9) + 1
-                        command += new_word[0:2]
-                        new_word = new_word[2:]
 
-                    else:
+def warm_up(pixel_widths: dict[str, int] = PIXEL_WIDTHS) -> None:
+    """
+    Build every version profile and lookup table a conversion needs ahead of time, by converting small books with
+    each engine for each version with its own commands.
 
-                        # add the first character from the remaining word to the command
-                        curr_num_pixels += PIXEL_WIDTHS.get(new_word[0], 9) + 1
-                        command += new_word[0]
+    Parameters
+    ----------
+    pixel_widths: dict[str, int]
+        The pixel width of each character.
+    """
 
-                        # remove the first character from the word
-                        new_word = new_word[1:]
+    # a width table without the book's characters isn't worth warning about, since the book is never used
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UnrecognizedCharacterWarning)
+        for mc_version in {DEFAULT_MC_VERSION, *COMMAND_START, *ESCAPE_CHARS, *PAGE_QUOTES}:
+            for engine in ENGINES:
+                try:
+                    # ASCII and other text are measured with different tables, and long words with another
+                    for text in ('Warming up "the" tables\n\\', "éèü " + "日本語" * 10):
+                        text_to_many_books(text, mc_version=mc_version, pixel_widths=pixel_widths, engine=engine)
+                except ValueError:
+                    # the translate engine can't measure with every width table
+                    pass
 
-            # go to the next line
-            curr_line += 1
-            curr_num_pixels = 0
 
-        # if the current word is a newline
-        if new_word == f"{get_command_by_version(ESCAPE_CHARS, mc_version)}n":
+# the kinds of workers books can be converted in with more than one job
+EXECUTORS = ("process", "thread")
 
-            # if the current line is the last line of the page
-            if curr_line == BOOK_HEIGHT:
 
-                # go the next page and don't write the newline
-                command += get_command_by_version(COMMAND_NEW_PAGE, mc_version)
-                curr_line = 1
-                continue
+def make_executor(
+    executor: str, jobs: int, pixel_widths: dict[str, int], other_threads: bool | None = None
+) -> Executor:
+    """
+    Start the workers to convert books (or lay out pieces of a book) in.
 
-            else:
+    Processes convert books at once on any Python, but each document has to be sent to them (and their books sent
+    back). Threads share everything with the caller, but only convert books at once on free-threaded Python (3.13t
+    and later). Conversion keeps no shared state that changes, and width tables can't be changed (see
+    `FrozenWidthTable`), so any number of threads can convert books at once.
 
-                # go to the next line
-                curr_line += 1
+    Parameters
+    ----------
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads.
 
-            curr_num_pixels = 0
+    jobs: int
+        How many workers to start.
 
-        # if the current line is off the page,
-        if curr_line > BOOK_HEIGHT or new_word == PAGE_END:
+    pixel_widths: dict[str, int]
+        The pixel width of each character, which each process is sent once when it starts (unless they're the
+        built-in widths, which it already has).
 
-            # go the next page
-            command += get_command_by_version(COMMAND_NEW_PAGE, mc_version)
-            curr_line = 1
-            curr_num_pixels = 0
+    other_threads: bool | None
+        Whether the caller has other threads running while the processes start, or None to check (see
+        `get_worker_context`).
 
-        # add the current word to the page
-        if new_word != PAGE_END:
-            command += new_word
-            curr_num_pixels += curr_word_num_pixels
+    Returns
+    -------
+    Executor
+        The workers.
+    """
 
-            # if the word isn't made up of whitespace, add a space at the end of it
-            if len(new_word.strip()) > 0:
-                command += " "
-                curr_num_pixels += PIXEL_WIDTHS[" "] + 1
+    if executor == "thread":
+        return ThreadPoolExecutor(jobs)
+    return ProcessPoolExecutor(
+        jobs,
+        mp_context=get_worker_context(other_threads),
+        initializer=init_worker,
+        initargs=(None if pixel_widths is PIXEL_WIDTHS else pixel_widths,),
+    )
+
+
+def lay_out_chunk(
+    text: str, escape: str, engine: str, layout: str, pixel_widths: dict[str, int] | None = None
+) -> list[str]:
+    """
+    Lay out a piece of a text between page ends into pages, in a worker (see `lay_out_pages_in_parallel`).
+    """
+
+    return lay_out_pages(text, escape, worker_pixel_widths if pixel_widths is None else pixel_widths, engine, layout)
+
+
+def convert_file_slice(
+    path: str,
+    start: int,
+    end: int,
+    title: str | None,
+    author: str | None,
+    in_line_titles: bool,
+    mc_version: str,
+    engine: str,
+    layout: str,
+    book_format: str,
+    pixel_widths: dict[str, int] | None = None,
+) -> list[str]:
+    """
+    Read one document out of an input file and convert it to Minecraft books, in a worker.
+
+    Parameters
+    ----------
+    path: str
+        The name of the input file.
+
+    start: int
+        The byte offset the document starts at.
+
+    end: int
+        The byte offset the document ends at.
+
+    pixel_widths: dict[str, int] | None
+        The pixel width of each character, if the worker doesn't have them already (see `convert_document`).
 
-    # end the command and return it
-    command += get_command_by_version(COMMAND_END, mc_version).replace("{BOOK_TITLE}", title).replace("{BOOK_AUTHOR}", author)
-    return command
+    The other parameters are the same as `text_to_many_books`'s.
+
+    Returns
+    -------
+    list[str]
+        The command to generate each of the document's books (more than one if it's split into volumes).
+    """
+
+    with open(path, "rb") as file:
+        file.seek(start)
+        document = decode_document(file.read(end - start))
+
+    return convert_document(
+        document, title, author, in_line_titles, mc_version, engine, layout, book_format, pixel_widths
+    )
+
+
+def convert_document(
+    document: str,
+    title: str | None,
+    author: str | None,
+    in_line_titles: bool,
+    mc_version: str,
+    engine: str,
+    layout: str,
+    book_format: str,
+    pixel_widths: dict[str, int] | None = None,
+) -> list[str]:
+    """
+    Convert one document to Minecraft books, in a worker.
+
+    Parameters
+    ----------
+    pixel_widths: dict[str, int] | None
+        The pixel width of each character, or None for the ones the worker process was set up with (see
+        `init_worker`). Threads are given the caller's, since they share them.
+
+    The other parameters are the same as `text_to_many_books`'s.
+
+    Returns
+    -------
+    list[str]
+        The command to generate each of the document's books (more than one if it's split into volumes).
+    """
+
+    return list(
+        documents_to_books(
+            [document],
+            title,
+            author,
+            in_line_titles,
+            mc_version,
+            worker_pixel_widths if pixel_widths is None else pixel_widths,
+            engine,
+            layout,
+            book_format,
+        )
+    )
+
+
+def iter_books_from_file(
+    path: str,
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
+    jobs: int = 1,
+    layout_records: list[dict[str, Any]] | None = None,
+    executor: str = "process",
+) -> Iterator[str]:
+    """
+    Converts a text file to many Minecraft books, yielding each command in order as soon as it's made.
+
+    The file is memory-mapped and its `BOOK_END`s are found by searching its bytes, so only the book
+    being converted is ever decoded, and files far bigger than memory can be converted. With more than
+    one job, each worker is only sent where its book is in the file.
+
+    Parameters
+    ----------
+    path: str
+        The name of the file with the text to convert, encoded as UTF-8.
+
+    jobs: int
+        How many workers to convert books in at once. A file with only one book has its layout split
+        between the workers instead (see `text_to_book`).
+
+    executor: {"process", "thread"}
+        Whether the workers are processes or threads (see `make_executor`).
+
+    layout_records: list[dict[str, Any]] | None
+        Where to keep each book's layout between conversions (see `documents_to_books`). Only works with one job.
+
+    The other parameters are the same as `text_to_many_books`'s.
+
+    Returns
+    -------
+    Iterator[str]
+        The command to generate each book.
+    """
+
+    if layout_records is not None and jobs != 1:
+        raise ValueError("Layouts can only be kept when converting with one job.")
+
+    with open(path, "rb") as file:
+
+        # empty files can't be memory-mapped
+        if os.fstat(file.fileno()).st_size == 0:
+            yield from documents_to_books(
+                [""],
+                title,
+                author,
+                in_line_titles,
+                mc_version,
+                pixel_widths,
+                engine,
+                layout,
+                book_format,
+                layout_records,
+            )
+            return
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            if jobs == 1:
+                documents = (decode_document(mapping[start:end]) for start, end in find_documents(mapping))
+                yield from documents_to_books(
+                    documents,
+                    title,
+                    author,
+                    in_line_titles,
+                    mc_version,
+                    pixel_widths,
+                    engine,
+                    layout,
+                    book_format,
+                    layout_records,
+                )
+                return
+
+            starts, ends = zip(*find_documents(mapping))
+
+            # a single book can't be split between workers by book, but its layout can be split at its page ends
+            if len(starts) == 1:
+                yield from documents_to_books(
+                    [decode_document(mapping[:])],
+                    title,
+                    author,
+                    in_line_titles,
+                    mc_version,
+                    pixel_widths,
+                    engine,
+                    layout,
+                    book_format,
+                    jobs=jobs,
+                    executor=executor,
+                )
+                return
+
+    with make_executor(executor, jobs, pixel_widths) as workers:
+        for books in workers.map(
+            convert_file_slice,
+            repeat(path),
+            starts,
+            ends,
+            repeat(title),
+            repeat(author),
+            repeat(in_line_titles),
+            repeat(mc_version),
+            repeat(engine),
+            repeat(layout),
+            repeat(book_format),
+            repeat(pixel_widths if executor == "thread" else None),
+        ):
+            yield from books
+
+
+def prefetch(items: Iterable, max_queued: int) -> Iterator:
+    """
+    Get items from an iterable on a thread of its own, so the next items are ready as soon as they're needed.
+
+    Parameters
+    ----------
+    items: Iterable
+        The items to get, like documents read from a file. An error raised getting them is raised again here.
+
+    max_queued: int
+        How many items can be got ahead of the ones being used, so a fast iterable can't fill up memory.
+
+    Returns
+    -------
+    Iterator
+        The same items, in the same order.
+    """
+
+    done = object()
+    item_queue = queue.Queue(max_queued)
+    stopped = threading.Event()
+
+    def get_items() -> None:
+        try:
+            for item in items:
+                item_queue.put((item, None))
+                if stopped.is_set():
+                    break
+        except BaseException as error:
+            item_queue.put((done, error))
+        else:
+            item_queue.put((done, None))
+
+    threading.Thread(target=get_items, daemon=True).start()
+    item = None
+    try:
+        while True:
+            item, error = item_queue.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # if the items stopped being used early, make room in the queue until the thread stops
+        stopped.set()
+        while item is not done:
+            item, error = item_queue.get()
+
+
+def map_in_order(workers: Executor, function: Callable, items: Iterable, max_pending: int) -> Iterator:
+    """
+    Call a function on each item in an executor's workers, like `Executor.map`, but only take the next item
+    once fewer than `max_pending` are being worked on or waiting to be used.
+
+    `Executor.map` takes every item at once, so a slow reader (or a huge file) would hold up the first result.
+
+    Returns
+    -------
+    Iterator
+        The function's result for each item, in the same order as the items.
+    """
+
+    pending = deque()
+    try:
+        for item in items:
+            if len(pending) == max_pending:
+                yield pending.popleft().result()
+            pending.append(workers.submit(function, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def iter_books_pipelined(
+    path: str,
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
+    jobs: int = 1,
+    layout_records: list[dict[str, Any]] | None = None,
+    executor: str = "process",
+) -> Iterator[str]:
+    """
+    Converts a text file to many Minecraft books like `iter_books_from_file`, but reads the file on a thread
+    of its own, so reading the next books overlaps converting the current one.
+
+    This is faster than `iter_books_from_file` when reading is slow, like from network storage. The file is read
+    in blocks of `PIPELINE_READ_SIZE` characters, and at most `PIPELINE_QUEUE_SIZE` documents are read ahead of
+    the one being converted. With more than one job, each document is sent to a worker as it's read.
+
+    The parameters are the same as `iter_books_from_file`'s.
+
+    Returns
+    -------
+    Iterator[str]
+        The command to generate each book.
+    """
+
+    if layout_records is not None and jobs != 1:
+        raise ValueError("Layouts can only be kept when converting with one job.")
+
+    # text mode reads every line ending as a newline, the same as `decode_document`
+    with (
+        open(path, "r", encoding="utf-8") as file,
+        closing(
+            prefetch(split_documents(iter(partial(file.read, PIPELINE_READ_SIZE), "")), PIPELINE_QUEUE_SIZE)
+        ) as documents,
+    ):
+        if jobs == 1:
+            yield from documents_to_books(
+                documents,
+                title,
+                author,
+                in_line_titles,
+                mc_version,
+                pixel_widths,
+                engine,
+                layout,
+                book_format,
+                layout_records,
+            )
+            return
+
+        # the reading thread is already running, so the workers can't be forked from this process
+        with make_executor(executor, jobs, pixel_widths, other_threads=True) as workers:
+            convert = partial(
+                convert_document,
+                title=title,
+                author=author,
+                in_line_titles=in_line_titles,
+                mc_version=mc_version,
+                engine=engine,
+                layout=layout,
+                book_format=book_format,
+                pixel_widths=pixel_widths if executor == "thread" else None,
+            )
+            for books in map_in_order(workers, convert, documents, max(jobs, PIPELINE_QUEUE_SIZE)):
+                yield from books
 
 
 def text_to_many_books(
-    text: str, title: str = None, author: str = None, in_line_titles: bool = False, mc_version: str = DEFAULT_MC_VERSION
+    text: str,
+    title: str = None,
+    author: str = None,
+    in_line_titles: bool = False,
+    mc_version: str = DEFAULT_MC_VERSION,
+    pixel_widths: dict[str, int] = PIXEL_WIDTHS,
+    engine: str = "default",
+    layout: str = "greedy",
+    book_format: str = "command",
 ) -> list[str]:
     """
     Takes a body of text and converts it to many Minecraft books.
@@ -212,29 +3248,26 @@ def text_to_many_books(
     text: str
         The text to convert to a Minecraft books.
 
-    Returns
-    -------
-    str
-        The commands to generate books with the input text written in it.
-    """
+    pixel_widths: dict[str, int]
+        The pixel width of each character. Defaults to `PIXEL_WIDTHS`.
 
-    commands: list[str] = []
-    documents = text.split(BOOK_END)
+    engine: {"default", "translate"}
+        How to measure words (see `text_to_book`).
 
-    for document in documents:
-        document = document.strip()
-        if in_line_titles:
-            title = document[: document.index("\n")].strip()
-            document = document[document.index("\n") + 1 :]
-        elif title is None:
-            title = ""
+    layout: {"greedy", "optimal"}
+        How to choose where pages end (see `text_to_book`).
 
-        if author is None:
-            author = ""
+    book_format: {"command", "loot_table", "book_content", "book_nbt"}
+        What to convert each book to: a command that gives the book, a loot table that drops it, just its
+        contents (to bundle with `bundle_books`), or a book item in binary NBT (to write with `write_book_structure`).
 
-        commands.append(text_to_book(document, title, author, mc_version))
+    Returns
+    -------
+    str
+        The commands to generate books with the input text written in it (or their loot tables).
+    """
 
-    return commands
+    return list(iter_books(text, title, author, in_line_titles, mc_version, pixel_widths, engine, layout, book_format))
 
 
 if __name__ == "__main__":
@@ -282,6 +3315,144 @@ if __name__ == "__main__":
         help="Read the first line of each text document as the book title. Overrides --title.",
         dest="in_line_titles",
     )
+    parser.add_argument(
+        "-wt",
+        "--width-table",
+        default=None,
+        help="A binary width table (made by generate_width_table.py) to use instead of the built-in character widths.",
+        dest="width_table",
+    )
+    parser.add_argument(
+        "-fo",
+        "--font-overlay",
+        action="append",
+        default=[],
+        help="A resource pack's width overrides (a width table or JSON file) to layer over the character widths. "
+        + "Can be passed more than once, highest priority first.",
+        dest="font_overlays",
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        choices=list(ENGINES),
+        default="default",
+        help="How to measure words. 'translate' measures the whole text at once, which is faster on non-ASCII text "
+        + "with short words (like accented Latin or punctuated Chinese).",
+        dest="engine",
+    )
+    parser.add_argument(
+        "-l",
+        "--layout",
+        choices=LAYOUTS,
+        default="greedy",
+        help="How to choose where pages end. 'optimal' uses the fewest pages and avoids splitting paragraphs across them.",
+        dest="layout",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="How many processes (or threads, see --executor) to convert books in at once.",
+        dest="jobs",
+    )
+    parser.add_argument(
+        "-ex",
+        "--executor",
+        choices=EXECUTORS,
+        default="process",
+        help="Whether to convert books in processes or threads with more than one job. "
+        + "Threads only convert books at once on free-threaded Python (3.13t and later).",
+        dest="executor",
+    )
+    shard_group = parser.add_mutually_exclusive_group()
+    shard_group.add_argument(
+        "-sb",
+        "--shard-books",
+        type=int,
+        default=None,
+        help="Split the books across function files of at most this many books each, run by an index function.",
+        dest="shard_books",
+    )
+    shard_group.add_argument(
+        "-ss",
+        "--shard-size",
+        type=int,
+        default=None,
+        help="Split the books across function files of at most this many bytes each, run by an index function.",
+        dest="shard_bytes",
+    )
+    parser.add_argument(
+        "-lt",
+        "--loot-tables",
+        default=None,
+        help="Write each book as a loot table in this folder (a data pack's loot_table folder) "
+        + "and output /loot commands that give them.",
+        dest="loot_tables",
+    )
+    parser.add_argument(
+        "-c",
+        "--container",
+        choices=CONTAINERS,
+        default=None,
+        help=f"Pack the books into containers of {CONTAINER_SIZE}, with one command for each container.",
+        dest="container",
+    )
+    parser.add_argument(
+        "-p",
+        "--place",
+        action="store_true",
+        help="Place each container above the player with /setblock instead of giving it to them.",
+        dest="place",
+    )
+    parser.add_argument(
+        "-lc",
+        "--layout-cache",
+        default=None,
+        help="A file to keep each book's layout in between runs, so converting an edited document again only "
+        + "lays out the pages from the first edit on.",
+        dest="layout_cache",
+    )
+    parser.add_argument(
+        "-pi",
+        "--page-index",
+        default=None,
+        help="A JSON file to write where each page of each book came from in the text and is in the output file, "
+        + "so a single page can be read without converting the whole book again.",
+        dest="page_index",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="Keep running, and convert the input file again whenever it changes. Only the books that changed are "
+        + "laid out again, but the whole output file is rewritten every time (sharded function files and loot tables "
+        + "are only rewritten if their books changed).",
+        dest="watch",
+    )
+    parser.add_argument(
+        "-pl",
+        "--pipeline",
+        action="store_true",
+        help="Read the input and write the output on threads of their own while books are converted, "
+        + "which is faster when they're on slow or network storage.",
+        dest="pipeline",
+    )
+    parser.add_argument(
+        "-dr",
+        "--dry-run",
+        action="store_true",
+        help="Only count the books, pages and lines the input would make and how big the output file would be, "
+        + "without writing anything. The input is still laid out, so this takes about as long as converting it.",
+        dest="dry_run",
+    )
+    parser.add_argument(
+        "-ns",
+        "--namespace",
+        default=DEFAULT_FUNCTION_NAMESPACE,
+        help="The namespace of the data pack the sharded function files and loot tables are placed in.",
+        dest="namespace",
+    )
     args = parser.parse_args()
 
     if args.input_file is None:
@@ -296,10 +3467,211 @@ if __name__ == "__main__":
         mc_version = DEFAULT_MC_VERSION
     else:
         mc_version = args.mc_version
-
-    with open(input_file, "r", encoding="utf-8") as file:
-        text = file.read()
-    commands = text_to_many_books(text, args.title, args.author, args.in_line_titles, mc_version)
-    with open(output_file, "w", encoding="utf-8") as file:
-        for command in commands:
-            file.write(f"{command}\n")
+    pixel_widths = load_pixel_widths(args.width_table, args.font_overlays)
+    for shard_limit in (args.shard_books, args.shard_bytes):
+        if shard_limit is not None and shard_limit < 1:
+            parser.error("shards must hold at least one book or byte")
+    if (args.shard_books is not None or args.shard_bytes is not None) and output_file.lower().endswith(
+        tuple(COMPRESSED_OPENERS)
+    ):
+        parser.error("sharded function files can't be compressed")
+
+    if args.loot_tables is not None and Version(mc_version) < Version(LOOT_TABLE_MIN_VERSION):
+        parser.error(f"loot tables need Minecraft {LOOT_TABLE_MIN_VERSION} or later")
+    if args.container is not None and args.loot_tables is not None:
+        parser.error("books in loot tables can't be bundled in containers")
+    if args.place and args.container is None:
+        parser.error("--place needs --container")
+    if args.layout_cache is not None and (args.jobs != 1 or args.layout != "greedy"):
+        parser.error("--layout-cache only works with one job and the greedy layout")
+
+    # an output file ending in .nbt is a structure file of containers full of books
+    structure = output_file.lower().endswith(".nbt")
+    if structure and (args.loot_tables is not None or args.place or args.shard_books or args.shard_bytes):
+        parser.error("structure files can't have loot tables, placed containers, or shards")
+    if structure and Version(mc_version) < Version(min(DATA_VERSIONS, key=Version)):
+        parser.error(f"structure files need Minecraft {min(DATA_VERSIONS, key=Version)} or later")
+
+    if structure:
+        book_format = "book_nbt"
+    elif args.loot_tables is not None:
+        book_format = "loot_table"
+    elif args.container is not None:
+        book_format = "book_content"
+    else:
+        book_format = "command"
+
+    sharded = args.shard_books is not None or args.shard_bytes is not None
+    if args.page_index is not None and (
+        book_format != "command" or sharded or output_file.lower().endswith(tuple(COMPRESSED_OPENERS)) or args.jobs != 1
+    ):
+        parser.error("--page-index only works with one job and commands written to an uncompressed file")
+
+    if args.dry_run:
+        if (
+            book_format != "command"
+            or sharded
+            or args.watch
+            or args.page_index is not None
+            or args.layout_cache is not None
+        ):
+            parser.error(
+                "--dry-run only counts commands written to a single file, without watching, a page index or a layout cache"
+            )
+        totals = sum_estimates(
+            iter_books_from_file(
+                input_file,
+                args.title,
+                args.author,
+                args.in_line_titles,
+                mc_version,
+                pixel_widths,
+                args.engine,
+                args.layout,
+                "estimate",
+                args.jobs,
+                executor=args.executor,
+            )
+        )
+        print(
+            f"Would write {totals['books']} books of {totals['pages']} pages ({totals['lines']} lines) "
+            + f"to {output_file}, {totals['bytes']} bytes before any compression"
+        )
+        parser.exit()
+
+    # the cached layouts are only reused if the characters are measured the same way
+    layout_settings = {"width_table": args.width_table, "font_overlays": args.font_overlays}
+    layout_records = None
+    if args.layout_cache is not None:
+        layout_records = []
+        if os.path.exists(args.layout_cache):
+            with open(args.layout_cache, "r", encoding="utf-8") as file:
+                layout_cache = json.load(file)
+            if layout_cache["settings"] == layout_settings:
+                layout_records = layout_cache["books"]
+    if args.page_index is not None and layout_records is None:
+        layout_records = []
+
+    # keep each book's layout between conversions while watching, so only the books that changed are laid out again
+    if args.watch and args.jobs == 1 and layout_records is None:
+        layout_records = []
+
+    def convert_input() -> None:
+        """
+        Convert the input file and write every output file.
+        """
+
+        # write each book as soon as it's converted
+        commands = (iter_books_pipelined if args.pipeline else iter_books_from_file)(
+            input_file,
+            args.title,
+            args.author,
+            args.in_line_titles,
+            mc_version,
+            pixel_widths,
+            args.engine,
+            args.layout,
+            book_format,
+            args.jobs,
+            layout_records,
+            args.executor,
+        )
+        if args.loot_tables is not None:
+            loot_table_name = os.path.splitext(os.path.basename(output_file))[0].split(".")[0]
+            commands = write_loot_tables(commands, args.loot_tables, loot_table_name, args.namespace)
+        if args.container is not None and not structure:
+            commands = bundle_books(commands, mc_version, args.container, args.place)
+        if structure:
+            container = args.container or "chest"
+            num_containers = write_book_structure(
+                commands,
+                get_partial_path(output_file) if args.watch else output_file,
+                get_command_by_version(DATA_VERSIONS, mc_version),
+                container,
+                CONTAINER_PROPERTIES[container],
+                CONTAINER_SIZE,
+            )
+            if args.watch:
+                os.replace(get_partial_path(output_file), output_file)
+            print(f"Wrote a structure of {num_containers} containers of books")
+        elif sharded:
+            num_shards, num_written = write_sharded_functions(
+                commands, output_file, args.namespace, args.shard_books, args.shard_bytes
+            )
+            print(f"Wrote {num_written} of {num_shards} function files (the rest were unchanged)")
+        else:
+            page_index = []
+            position = document_num = volume_num = 0
+            # while watching, something (like a server) may read the output at any time, so it's replaced all at once
+            with (
+                (open_output_atomically if args.watch else open_output)(output_file) as file,
+                BackgroundWriter(file, PIPELINE_QUEUE_SIZE) if args.pipeline else nullcontext(file) as output,
+            ):
+                for command in commands:
+                    output.write(f"{command}\n")
+
+                    # the layout record of the book just converted knows where its pages are in its command
+                    if args.page_index is not None:
+                        command_size = len(command.encode("utf-8"))
+                        layout_record = layout_records[document_num]
+                        page_index.append(
+                            {
+                                "command": [position, position + command_size],
+                                "pages": index_pages(layout_record, position, volume_num),
+                            }
+                        )
+                        position += command_size + 1
+
+                        # a document split into volumes has a command for each
+                        volume_num += 1
+                        if volume_num == len(layout_record["volume_sizes"]):
+                            document_num += 1
+                            volume_num = 0
+
+            if args.page_index is not None:
+                with open(args.page_index, "w", encoding="utf-8") as file:
+                    json.dump({"output": output_file, "books": page_index}, file)
+
+        if args.layout_cache is not None:
+            with open(args.layout_cache, "w", encoding="utf-8") as file:
+                json.dump({"settings": layout_settings, "books": layout_records}, file, ensure_ascii=False)
+
+    convert_input()
+    if args.watch:
+        print(f"Watching {input_file} for changes (press Ctrl+C to stop)")
+
+        def get_input_state() -> tuple[int, int] | None:
+            try:
+                input_stat = os.stat(input_file)
+            except FileNotFoundError:
+                # editors that save by replacing the file can leave it missing for a moment
+                return None
+            return input_stat.st_mtime_ns, input_stat.st_size
+
+        input_state = get_input_state()
+        try:
+            while True:
+                time.sleep(WATCH_POLL_INTERVAL)
+                new_input_state = get_input_state()
+                if new_input_state == input_state:
+                    continue
+
+                # wait for the file to stop changing, so a save made in several writes is only converted once
+                while True:
+                    time.sleep(WATCH_SETTLE_TIME)
+                    input_state, new_input_state = new_input_state, get_input_state()
+                    if new_input_state == input_state:
+                        break
+                if input_state is None:
+                    continue
+
+                conversion_start = time.perf_counter()
+                try:
+                    convert_input()
+                except ValueError as error:
+                    # like a document without a title line, which may be fixed by the next save
+                    print(f"Couldn't convert {input_file}: {error}")
+                    continue
+                print(f"Converted {input_file} in {time.perf_counter() - conversion_start:.2f} seconds")
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,220 @@
+"""
+Writes Minecraft's binary NBT format, and structure files full of written books.
+
+Tags are written straight to a stream as they're made instead of being built up as a
+tree, so even a structure holding thousands of books is written with little memory. A
+structure file is gzipped NBT, and can be loaded in-game with a structure block or
+`/place template`, which is far cheaper than running a command for every book.
+"""
+
+import gzip
+import shutil
+import struct
+import tempfile
+from collections.abc import Iterable
+from typing import BinaryIO
+
+TAG_END = 0
+TAG_BYTE = 1
+TAG_INT = 3
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+
+# NBT strings are prefixed with their length in bytes as an unsigned short
+MAX_STRING_BYTES = 0xFFFF
+
+# how many containers to place in each row of a structure before starting the next
+STRUCTURE_ROW_LENGTH = 16
+
+
+def encode_string(value: str) -> bytes:
+    """
+    Encode a string the way NBT stores it: length-prefixed "modified UTF-8", like Java's `DataOutput.writeUTF`.
+
+    Modified UTF-8 is UTF-8, except that the null character takes two bytes, and characters outside the
+    Basic Multilingual Plane (like most emoji) are written as two UTF-16 surrogates of three bytes each.
+
+    Parameters
+    ----------
+    value: str
+        The string to encode.
+
+    Returns
+    -------
+    bytes
+        The string's length in bytes, followed by the string.
+    """
+
+    if not value.isascii():
+        value = "".join(
+            (
+                character
+                if ord(character) <= 0xFFFF
+                else chr(0xD800 + ((ord(character) - 0x10000) >> 10))
+                + chr(0xDC00 + ((ord(character) - 0x10000) & 0x3FF))
+            )
+            for character in value
+        )
+    data = value.encode("utf-8", "surrogatepass").replace(b"\x00", b"\xc0\x80")
+
+    if len(data) > MAX_STRING_BYTES:
+        raise ValueError(f"NBT strings can't be longer than {MAX_STRING_BYTES} bytes (this one is {len(data)}).")
+    return struct.pack(">H", len(data)) + data
+
+
+class NbtWriter:
+    """
+    Writes NBT tags to a binary stream one at a time.
+
+    Every method takes the tag's name, which is left out (None) for the elements of a list.
+
+    Parameters
+    ----------
+    file: BinaryIO
+        The stream to write to.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def write_header(self, tag_type: int, name: str | None) -> None:
+        if name is not None:
+            self.file.write(bytes((tag_type,)) + encode_string(name))
+
+    def write_byte(self, value: int, name: str | None = None) -> None:
+        self.write_header(TAG_BYTE, name)
+        self.file.write(struct.pack(">b", value))
+
+    def write_int(self, value: int, name: str | None = None) -> None:
+        self.write_header(TAG_INT, name)
+        self.file.write(struct.pack(">i", value))
+
+    def write_string(self, value: str, name: str | None = None) -> None:
+        self.write_header(TAG_STRING, name)
+        self.file.write(encode_string(value))
+
+    def begin_list(self, element_type: int, length: int, name: str | None = None) -> None:
+        """
+        Start a list, whose elements (written without names) must follow.
+        """
+
+        self.write_header(TAG_LIST, name)
+        self.file.write(struct.pack(">bi", element_type, length))
+
+    def begin_compound(self, name: str | None = None) -> None:
+        """
+        Start a compound, whose tags must follow, then `end_compound`.
+        """
+
+        self.write_header(TAG_COMPOUND, name)
+
+    def end_compound(self) -> None:
+        self.file.write(bytes((TAG_END,)))
+
+    def write_raw(self, data: bytes) -> None:
+        """
+        Write tags that were already encoded, like ones encoded in another process.
+        """
+
+        self.file.write(data)
+
+
+def write_book_structure(
+    book_items: Iterable[bytes],
+    path: str,
+    data_version: int,
+    container: str,
+    container_properties: dict[str, str],
+    container_size: int,
+) -> int:
+    """
+    Write a structure file of containers full of written books.
+
+    The containers are laid out in rows on the ground, each with up to `container_size` books.
+
+    Parameters
+    ----------
+    book_items: Iterable[bytes]
+        The encoded tags of each book item, besides its slot (see `text_to_book_nbt`).
+
+    path: str
+        The name of the structure file to write (usually ending in `.nbt`).
+
+    data_version: int
+        The data version of the Minecraft version the structure is for.
+
+    container: str
+        The container block to put the books in, like `chest`.
+
+    container_properties: dict[str, str]
+        The container's block state properties.
+
+    container_size: int
+        How many books fit in each container.
+
+    Returns
+    -------
+    int
+        How many containers the structure has.
+    """
+
+    num_containers = 0
+
+    # the number of containers has to be written before them, so they're written to a temporary file first
+    with tempfile.TemporaryFile() as blocks:
+        nbt = NbtWriter(blocks)
+
+        def write_container(items: list[bytes]) -> None:
+            nonlocal num_containers
+            nbt.begin_compound()
+            nbt.begin_list(TAG_INT, 3, "pos")
+            for coordinate in (num_containers % STRUCTURE_ROW_LENGTH, 0, num_containers // STRUCTURE_ROW_LENGTH):
+                nbt.write_int(coordinate)
+            nbt.write_int(0, "state")
+            nbt.begin_compound("nbt")
+            nbt.write_string(f"minecraft:{container}", "id")
+            nbt.begin_list(TAG_COMPOUND, len(items), "Items")
+            for slot, item in enumerate(items):
+                nbt.write_byte(slot, "Slot")
+                nbt.write_raw(item)
+                nbt.end_compound()
+            nbt.end_compound()
+            nbt.end_compound()
+            num_containers += 1
+
+        items: list[bytes] = []
+        for item in book_items:
+            items.append(item)
+            if len(items) == container_size:
+                write_container(items)
+                items = []
+        if items or not num_containers:
+            write_container(items)
+
+        with gzip.open(path, "wb") as file:
+            nbt = NbtWriter(file)
+            nbt.begin_compound("")
+            nbt.write_int(data_version, "DataVersion")
+
+            nbt.begin_list(TAG_INT, 3, "size")
+            for size in (min(num_containers, STRUCTURE_ROW_LENGTH), 1, -(-num_containers // STRUCTURE_ROW_LENGTH)):
+                nbt.write_int(size)
+
+            nbt.begin_list(TAG_COMPOUND, 1, "palette")
+            nbt.write_string(f"minecraft:{container}", "Name")
+            nbt.begin_compound("Properties")
+            for property_name, value in container_properties.items():
+                nbt.write_string(value, property_name)
+            nbt.end_compound()
+            nbt.end_compound()
+
+            nbt.begin_list(TAG_END, 0, "entities")
+
+            nbt.begin_list(TAG_COMPOUND, num_containers, "blocks")
+            blocks.seek(0)
+            shutil.copyfileobj(blocks, file)
+
+            nbt.end_compound()
+
+    return num_containers
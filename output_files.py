@@ -0,0 +1,327 @@
+"""
+Writes output files: compressed, or split into many small function files.
+
+Generated commands for a whole archive can take up hundreds of megabytes but compress
+extremely well, so naming the output file `makebook.mcfunction.gz` (or `.xz`) streams the
+commands through the compressor as they're written instead of writing them out in full.
+Writing (and compressing) can also be done on a thread of its own while the next commands are made.
+
+For use in a data pack, one huge function file is slow for the server to load, so the
+commands can instead be split across small function files run by one index function, and
+books can be written as loot tables that small `/loot` commands give.
+"""
+
+import gzip
+import lzma
+import os
+import queue
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from typing import TextIO
+
+# how to open a file for writing text, by file extension
+COMPRESSED_OPENERS = {
+    # gzip's default (9) is several times slower than 6 for a percent or two smaller file
+    ".gz": lambda path: gzip.open(path, "wt", encoding="utf-8", compresslevel=6),
+    ".xz": lambda path: lzma.open(path, "wt", encoding="utf-8"),
+}
+
+# the names of a data pack namespace's folder of function files (`functions` before Minecraft 1.21)
+FUNCTION_FOLDERS = ("function", "functions")
+
+
+def open_output(path: str) -> TextIO:
+    """
+    Open a file to write text to, compressing it with gzip or xz if its name ends in `.gz` or `.xz`.
+
+    Parameters
+    ----------
+    path: str
+        The name of the file to write to.
+
+    Returns
+    -------
+    TextIO
+        The file, open for writing UTF-8 text.
+    """
+
+    for extension, opener in COMPRESSED_OPENERS.items():
+        if path.lower().endswith(extension):
+            return opener(path)
+
+    return open(path, "w", encoding="utf-8")
+
+
+def get_partial_path(path: str) -> str:
+    """
+    Get the name to write a file under until it's complete: a hidden file in the same folder, with the same extension.
+    """
+
+    folder, name = os.path.split(path)
+    return os.path.join(folder, f".partial-{name}")
+
+
+@contextmanager
+def open_output_atomically(path: str) -> Iterator[TextIO]:
+    """
+    Open a file to write text to like `open_output`, but only replace the file once it's completely written.
+
+    The text is written to a temporary file next to it, which is renamed over the file at the end, so anything
+    reading the file (like a server reloading its functions) sees either the old file or the new one.
+
+    Parameters
+    ----------
+    path: str
+        The name of the file to write to.
+
+    Returns
+    -------
+    Iterator[TextIO]
+        The temporary file, open for writing UTF-8 text.
+    """
+
+    partial_path = get_partial_path(path)
+    try:
+        with open_output(partial_path) as file:
+            yield file
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, path)
+
+
+class BackgroundWriter:
+    """
+    Writes text to a file on a thread of its own, so whatever makes the text doesn't wait for slow storage
+    (or for the compressor, when the file is compressed).
+
+    Text is written in the order it's given. Once `max_queued` pieces of text are waiting to be written,
+    `write` waits for the file to catch up, so a slow file can't fill up memory. Use it as a context manager,
+    which waits for everything to be written when it exits. The file isn't closed.
+
+    Parameters
+    ----------
+    file: TextIO
+        The file to write to.
+
+    max_queued: int
+        How many pieces of text can wait to be written at once.
+    """
+
+    def __init__(self, file: TextIO, max_queued: int):
+        self.file = file
+        self.queue = queue.Queue(max_queued)
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        # None is put in the queue by close, after everything else
+        while (text := self.queue.get()) is not None:
+            if self.error is None:
+                try:
+                    self.file.write(text)
+                except BaseException as error:
+                    self.error = error
+
+    def write(self, text: str) -> None:
+        """
+        Queue text to be written, raising the error from an earlier write if one failed.
+        """
+
+        if self.error is not None:
+            raise self.error
+        self.queue.put(text)
+
+    def close(self) -> None:
+        """
+        Wait for everything queued to be written, raising the error from a write if one failed.
+        """
+
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_if_changed(path: str, contents: str) -> bool:
+    """
+    Write text to a file, unless the file already has exactly that text.
+
+    The file is replaced all at once (see `open_output_atomically`), so it's never seen half-written.
+
+    Parameters
+    ----------
+    path: str
+        The name of the file to write to.
+
+    contents: str
+        The text the file should have.
+
+    Returns
+    -------
+    bool
+        Whether the file was written.
+    """
+
+    data = contents.encode("utf-8")
+    if os.path.isfile(path):
+        with open(path, "rb") as file:
+            if file.read() == data:
+                return False
+
+    partial_path = get_partial_path(path)
+    with open(partial_path, "wb") as file:
+        file.write(data)
+    os.replace(partial_path, path)
+    return True
+
+
+def get_function_id(path: str) -> str:
+    """
+    Get the id a function file is run by, without its namespace.
+
+    A function file's id is its path from its data pack's function folder, so
+    `data/books/function/library/makebook.mcfunction` is run as `books:library/makebook`. A file that isn't in a
+    function folder is assumed to be placed straight in one.
+
+    Parameters
+    ----------
+    path: str
+        The name of the function file, with or without its extension.
+
+    Returns
+    -------
+    str
+        The function's id, like `library/makebook`.
+    """
+
+    folders = os.path.abspath(os.path.splitext(path)[0]).split(os.sep)
+    for folder_num in range(len(folders) - 2, -1, -1):
+        if folders[folder_num] in FUNCTION_FOLDERS:
+            return "/".join(folders[folder_num + 1 :])
+    return folders[-1]
+
+
+def write_sharded_functions(
+    commands: Iterable[str],
+    output_file: str,
+    namespace: str,
+    max_books: int | None = None,
+    max_bytes: int | None = None,
+) -> tuple[int, int]:
+    """
+    Split commands across numbered function files next to an index function that runs them all.
+
+    Writing `makebook.mcfunction` this way writes `makebook_1.mcfunction`, `makebook_2.mcfunction`, ...
+    and makes `makebook.mcfunction` run each of them with `function <namespace>:makebook_<n>` (or with their
+    whole id, like `<namespace>:library/makebook_<n>`, in a subfolder of the function folder). A shard whose
+    commands haven't changed isn't rewritten, and shards left over from a longer run are deleted.
+
+    Parameters
+    ----------
+    commands: Iterable[str]
+        The commands to write, one per line.
+
+    output_file: str
+        The name of the index function file. The shards are written to the same folder, which is made if it
+        doesn't exist, and are run by their path from the data pack's function folder (see `get_function_id`).
+
+    namespace: str
+        The namespace of the data pack the function files are placed in.
+
+    max_books: int | None
+        The most commands to put in each shard.
+
+    max_bytes: int | None
+        The largest size, in bytes, to let a shard grow to. A single command bigger than this gets a shard to itself.
+
+    Returns
+    -------
+    tuple[int, int]
+        How many shards there are, and how many of them were written.
+    """
+
+    stem, extension = os.path.splitext(output_file)
+    function_id = get_function_id(output_file)
+    folder = os.path.dirname(output_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    shard_names: list[str] = []
+    num_written = 0
+
+    def write_shard(lines: list[str]) -> None:
+        nonlocal num_written
+        shard_names.append(f"{function_id}_{len(shard_names) + 1}")
+        num_written += write_if_changed(f"{stem}_{len(shard_names)}{extension}", "".join(lines))
+
+    lines: list[str] = []
+    num_bytes = 0
+    for command in commands:
+        line = f"{command}\n"
+        line_num_bytes = len(line.encode("utf-8"))
+
+        # start a new shard if this command would push the current one over either limit
+        if lines and (
+            (max_books is not None and len(lines) >= max_books)
+            or (max_bytes is not None and num_bytes + line_num_bytes > max_bytes)
+        ):
+            write_shard(lines)
+            lines = []
+            num_bytes = 0
+
+        lines.append(line)
+        num_bytes += line_num_bytes
+
+    if lines:
+        write_shard(lines)
+
+    # delete shards from a previous run that had more of them
+    leftover_num = len(shard_names) + 1
+    while os.path.isfile(f"{stem}_{leftover_num}{extension}"):
+        os.remove(f"{stem}_{leftover_num}{extension}")
+        leftover_num += 1
+
+    write_if_changed(output_file, "".join(f"function {namespace}:{shard_name}\n" for shard_name in shard_names))
+    return len(shard_names), num_written
+
+
+def write_loot_tables(loot_tables: Iterable[str], folder: str, name: str, namespace: str) -> Iterator[str]:
+    """
+    Write each book's loot table to a data pack's loot table folder, and make the commands that give each book.
+
+    Loot tables whose contents haven't changed aren't rewritten.
+
+    Parameters
+    ----------
+    loot_tables: Iterable[str]
+        The JSON of each book's loot table.
+
+    folder: str
+        The folder to write the loot tables to (the data pack's `data/<namespace>/loot_table` folder).
+
+    name: str
+        The name to number the loot tables after, like `makebook` for `makebook_1.json`, `makebook_2.json`, ...
+
+    namespace: str
+        The namespace of the data pack the loot tables are placed in.
+
+    Returns
+    -------
+    Iterator[str]
+        The command that gives each book, as each loot table is written.
+    """
+
+    os.makedirs(folder, exist_ok=True)
+    for book_num, loot_table in enumerate(loot_tables, start=1):
+        write_if_changed(os.path.join(folder, f"{name}_{book_num}.json"), loot_table)
+        yield f"loot give @p loot {namespace}:{name}_{book_num}"
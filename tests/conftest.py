@@ -0,0 +1,86 @@
+"""
+Inputs shared by the tests: text full of escapes, quotes, newlines, page ends and runs of same-width characters,
+which is where layouts most easily go wrong.
+"""
+
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from CONSTANTS import BOOK_END
+
+GENERATOR = Path(__file__).parent.parent / "minecraft_book_generator.py"
+
+# a version whose escape sequence is one slash, and one whose escape sequence is two
+VERSIONS = ["1.21.5", "1.20.5"]
+
+PIECES = ["word ", "a", " ", "  ", "\n", "\n\n", "\\", '"', "'", "中", "W", "i", "{PAGE_END}", " {PAGE_END}\n"]
+
+
+def make_text(rng: random.Random, num_pieces: int) -> str:
+    """
+    Make a random text of short pieces and long runs of escaped, same-width and ordinary characters.
+    """
+
+    text = []
+    for _ in range(num_pieces):
+        kind = rng.random()
+        if kind < 0.05:
+            text.append(rng.choice(["\\", '"', "'", "中", "x"]) * rng.randint(20, 300))
+        elif kind < 0.08:
+            text.append("".join(rng.choice("\\\"'中ab") for _ in range(rng.randint(20, 200))))
+        elif kind < 0.1:
+            text.append("\n" * rng.randint(1, 20))
+        else:
+            text.append(rng.choice(PIECES))
+    return "".join(text)
+
+
+@pytest.fixture(params=VERSIONS)
+def mc_version(request) -> str:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def texts() -> list[str]:
+    rng = random.Random(0)
+    return [make_text(rng, rng.randint(0, 800)) for _ in range(40)] + [
+        "",
+        "x " + "\\" * 40 + "\n" * 14 + "end",
+        "b中文字" + "\\" * 20 + " \n中文字 " + "\\" * 20 + " " + "\\" * 20,
+    ]
+
+
+@pytest.fixture
+def run_generator(texts, tmp_path):
+    """
+    Run the generator from the command line on every text, as books of one input file.
+    """
+
+    input_file = tmp_path / "books.txt"
+    input_file.write_text(BOOK_END.join(texts), encoding="utf-8")
+
+    def run(output_file: Path, *args: str) -> None:
+        subprocess.run(
+            [
+                sys.executable,
+                str(GENERATOR),
+                "-i",
+                str(input_file),
+                "-o",
+                str(output_file),
+                "-t",
+                "T",
+                "-a",
+                "A",
+                *args,
+            ],
+            cwd=tmp_path,
+            check=True,
+            capture_output=True,
+        )
+
+    return run
@@ -0,0 +1,32 @@
+"""
+Tests that pure-ASCII text, which is measured a byte at a time, gives exactly the same books as the general path.
+"""
+
+import pytest
+
+from benchmark import NonAsciiStr
+from minecraft_book_generator import PIXEL_WIDTHS, text_to_book
+from width_table import FrozenWidthTable
+
+
+@pytest.fixture(scope="module")
+def ascii_texts(texts):
+    return ["".join(character if character.isascii() else "W" for character in text) for text in texts]
+
+
+@pytest.mark.parametrize("layout", ["greedy", "optimal"])
+@pytest.mark.parametrize("engine", ["default", "translate"])
+def test_ascii_fast_path_matches_general_path(mc_version, ascii_texts, engine, layout):
+    for text in ascii_texts:
+        assert text_to_book(text, "T", "A", mc_version, engine=engine, layout=layout) == text_to_book(
+            NonAsciiStr(text), "T", "A", mc_version, engine=engine, layout=layout
+        )
+
+
+@pytest.mark.filterwarnings("ignore::minecraft_book_generator.UnrecognizedCharacterWarning")
+def test_ascii_characters_missing_from_the_width_table_match_general_path(mc_version, ascii_texts):
+    pixel_widths = FrozenWidthTable({character: width for character, width in PIXEL_WIDTHS.items() if character != "a"})
+    for text in ascii_texts:
+        assert text_to_book(text, "T", "A", mc_version, pixel_widths) == text_to_book(
+            NonAsciiStr(text), "T", "A", mc_version, pixel_widths
+        )
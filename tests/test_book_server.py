@@ -0,0 +1,55 @@
+"""
+Tests that the conversion server answers every request, even ones it can't convert, and keeps the connection open.
+"""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from book_server import BookServer
+from minecraft_book_generator import PIXEL_WIDTHS, text_to_many_books
+
+
+@pytest.fixture(scope="module")
+def connection(tmp_path_factory):
+    socket_file = str(tmp_path_factory.mktemp("server") / "books.sock")
+    with BookServer(socket_file, PIXEL_WIDTHS) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        with socket.socket(socket.AF_UNIX) as client:
+            client.connect(socket_file)
+            with client.makefile("rwb") as file:
+
+                def send(request: dict) -> dict:
+                    file.write(json.dumps(request).encode("utf-8") + b"\n")
+                    file.flush()
+                    return json.loads(file.readline())
+
+                yield send
+        server.shutdown()
+
+
+def test_requests_are_converted(connection):
+    assert connection({"text": 'Some "text"', "title": "T", "author": "A"}) == {
+        "commands": text_to_many_books('Some "text"', "T", "A")
+    }
+
+
+@pytest.mark.filterwarnings("ignore::minecraft_book_generator.UnrecognizedCharacterWarning")
+@pytest.mark.parametrize(
+    "request_",
+    [
+        {"text": "\ud800"},
+        {"text": "text", "mc_version": "1.21.5.0.1"},
+        {"text": "text", "mc_version": "99.0"},
+        {"text": "text", "mc_version": "1.99"},
+        {"text": "text", "mc_version": "1.2"},
+        {"text": "text", "engine": "fast"},
+        {"text": 1},
+    ],
+)
+def test_bad_requests_get_an_error_and_the_connection_stays_open(connection, request_):
+    assert "error" in connection(request_)
+    assert "commands" in connection({"text": "still open"})
@@ -0,0 +1,20 @@
+"""
+Tests that compressed output files decompress to exactly the same commands as an uncompressed one.
+"""
+
+import gzip
+import lzma
+
+import pytest
+
+
+@pytest.mark.parametrize("extension, decompress", [(".gz", gzip.decompress), (".xz", lzma.decompress)])
+@pytest.mark.parametrize("args", [[], ["--pipeline"], ["--jobs", "2"]])
+def test_compressed_output_decompresses_to_plain_output(
+    mc_version, texts, run_generator, tmp_path, extension, decompress, args
+):
+    run_generator(tmp_path / "makebook.mcfunction", "-mcv", mc_version)
+    run_generator(tmp_path / f"makebook.mcfunction{extension}", "-mcv", mc_version, *args)
+    plain_output = (tmp_path / "makebook.mcfunction").read_bytes()
+    assert plain_output.count(b"\n") >= len(texts)
+    assert decompress((tmp_path / f"makebook.mcfunction{extension}").read_bytes()) == plain_output
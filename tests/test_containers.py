@@ -0,0 +1,33 @@
+"""
+Tests that books bundled into containers fill each container's 27 slots in order, with every book in exactly one.
+"""
+
+import re
+
+import pytest
+
+from CONSTANTS import CONTAINER_SIZE
+from minecraft_book_generator import bundle_books, text_to_book_content
+
+SLOT_PATTERN = re.compile(r"\{[Ss]lot:(\d+)b?,")
+
+
+@pytest.mark.parametrize("place", [False, True])
+@pytest.mark.parametrize("num_books", [0, 1, 26, 27, 28, 81, 100])
+def test_containers_hold_27_books_in_order(mc_version, texts, place, num_books):
+    book_contents = [
+        text_to_book_content(texts[book_num % len(texts)], "T", "A", mc_version) for book_num in range(num_books)
+    ]
+    containers = list(bundle_books(book_contents, mc_version, "barrel", place))
+    assert len(containers) == -(-num_books // CONTAINER_SIZE)
+
+    for container_num, container in enumerate(containers):
+        assert container.startswith("setblock ~ ~1 ~ barrel" if place else "give @p barrel")
+        container_books = book_contents[container_num * CONTAINER_SIZE : (container_num + 1) * CONTAINER_SIZE]
+        num_slots = 27 if container_num < len(containers) - 1 else num_books - 27 * container_num
+        assert [int(slot) for slot in SLOT_PATTERN.findall(container)] == list(range(num_slots))
+
+        # each book follows the one before it
+        position = 0
+        for book_content in container_books:
+            position = container.index(book_content, position) + len(book_content)
@@ -0,0 +1,28 @@
+"""
+Tests that the translate engine measures every word exactly like the default engine, including with width tables
+where some character is as wide as the byte it separates words with would be.
+"""
+
+import pytest
+
+from minecraft_book_generator import PIXEL_WIDTHS, measure_words, measure_words_translated, text_to_book
+from width_table import FrozenWidthTable
+
+
+@pytest.mark.filterwarnings("ignore::minecraft_book_generator.UnrecognizedCharacterWarning")
+@pytest.mark.parametrize("extra_widths", [{}, {"é": 31, "ü": 3, "ñ": 254}])
+def test_translate_engine_matches_default(mc_version, texts, extra_widths):
+    pixel_widths = FrozenWidthTable({**PIXEL_WIDTHS, **extra_widths})
+    extra_text = " ".join(extra_widths) + " éüñ€"
+    for text in texts + [extra_text, extra_text * 50]:
+        words = text.replace("\n", " \n ").split(" ")
+        assert list(measure_words_translated(words, pixel_widths)) == list(measure_words(words, pixel_widths))
+        assert text_to_book(text, "T", "A", mc_version, pixel_widths, "translate") == text_to_book(
+            text, "T", "A", mc_version, pixel_widths
+        )
+
+
+def test_translate_engine_needs_an_unused_width():
+    pixel_widths = FrozenWidthTable({**PIXEL_WIDTHS, **{chr(0x2000 + width): width for width in range(-1, 255)}})
+    with pytest.raises(ValueError):
+        list(measure_words_translated(["word"], pixel_widths))
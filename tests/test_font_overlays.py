@@ -0,0 +1,74 @@
+"""
+Tests that resource pack width overrides are layered over the character widths in priority order, can't be changed,
+and are used to lay out books.
+"""
+
+import json
+
+import pytest
+
+from minecraft_book_generator import (
+    PIXEL_WIDTHS,
+    get_version_profile,
+    lay_out_pages,
+    load_pixel_widths,
+    text_to_book,
+)
+from width_table import write_width_table
+
+
+@pytest.fixture
+def overlay_files(tmp_path):
+    first_overlay = tmp_path / "first.json"
+    first_overlay.write_text(json.dumps({"a": 1, "U+0062": 2, "u+1f600": 3}), encoding="utf-8")
+    second_overlay = tmp_path / "second.bin"
+    write_width_table({"a": 7, "b": 7, "c": 7}, str(second_overlay))
+    return [str(first_overlay), str(second_overlay)]
+
+
+def test_earlier_overlays_take_priority(overlay_files):
+    pixel_widths = load_pixel_widths(font_overlays=overlay_files)
+    assert (pixel_widths["a"], pixel_widths["b"], pixel_widths["\U0001f600"]) == (1, 2, 3)
+    assert pixel_widths["c"] == 7
+    assert pixel_widths["d"] == PIXEL_WIDTHS["d"]
+
+    reversed_widths = load_pixel_widths(font_overlays=overlay_files[::-1])
+    assert (reversed_widths["a"], reversed_widths["b"], reversed_widths["c"]) == (7, 7, 7)
+    assert reversed_widths["\U0001f600"] == 3
+
+
+def test_overlays_cannot_be_changed(overlay_files):
+    pixel_widths = load_pixel_widths(font_overlays=overlay_files)
+    for change in (
+        lambda: pixel_widths.__setitem__("a", 5),
+        lambda: pixel_widths.__setitem__("d", 5),
+        lambda: pixel_widths.__delitem__("a"),
+        lambda: pixel_widths.update({"a": 5}),
+        lambda: pixel_widths.pop("a"),
+        lambda: pixel_widths.clear(),
+    ):
+        with pytest.raises(TypeError):
+            change()
+    assert pixel_widths["a"] == 1
+    assert PIXEL_WIDTHS.get("\U0001f600") != 3
+
+
+def test_malformed_json_overlays_are_rejected(tmp_path):
+    overlay_file = tmp_path / "overlay.json"
+    overlay_file.write_text(json.dumps({"ab": 1}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_pixel_widths(font_overlays=[str(overlay_file)])
+
+
+def test_books_are_laid_out_with_overlaid_widths(mc_version, tmp_path):
+    text = "a" * 2000
+    overlay_file = tmp_path / "overlay.json"
+    overlay_file.write_text(json.dumps({"a": PIXEL_WIDTHS["a"]}), encoding="utf-8")
+    assert text_to_book(text, "T", "A", mc_version, load_pixel_widths(font_overlays=[str(overlay_file)])) == (
+        text_to_book(text, "T", "A", mc_version)
+    )
+
+    overlay_file.write_text(json.dumps({"a": PIXEL_WIDTHS["a"] * 2 + 1}), encoding="utf-8")
+    escape = get_version_profile(mc_version)[2]
+    wide_pages = lay_out_pages(text, escape, load_pixel_widths(font_overlays=[str(overlay_file)]))
+    assert len(wide_pages) > len(lay_out_pages(text, escape))
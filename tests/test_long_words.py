@@ -0,0 +1,43 @@
+"""
+Tests that words longer than a line are broken across lines and pages exactly like placing them one character at a
+time does, whether they're runs of same-width characters or full of escape sequences.
+"""
+
+import random
+
+import pytest
+
+from minecraft_book_generator import (
+    PIXEL_WIDTHS,
+    add_long_word,
+    add_long_word_by_character,
+    escape_text,
+    get_version_profile,
+)
+
+
+def make_words() -> list[str]:
+    rng = random.Random(1)
+    words = ["\\" * 40, "中文字" + "\\" * 20, '"' * 150, "'" * 150, "中" * 300, "x" * 500]
+    for _ in range(100):
+        characters = rng.choice(["中", "\\", '"', "\\中", "\\\"'", "ab中", "iW\\"])
+        words.append("".join(rng.choice(characters) for _ in range(rng.randint(20, 400))))
+    return words
+
+
+WORDS = make_words()
+
+
+@pytest.mark.parametrize("curr_line, curr_num_pixels", [(1, 0), (1, 60), (7, 113), (14, 0), (14, 100)])
+def test_long_words_break_like_one_character_at_a_time(mc_version, curr_line, curr_num_pixels):
+    escape = get_version_profile(mc_version)[2]
+    for word in WORDS:
+        escaped_word = escape_text(word, escape)
+        command = []
+        expected_command = []
+        position = add_long_word(escaped_word, curr_line, curr_num_pixels, PIXEL_WIDTHS, command, "\n")
+        expected_position = add_long_word_by_character(
+            escaped_word, curr_line, curr_num_pixels, PIXEL_WIDTHS, expected_command, "\n"
+        )
+        assert "".join(command) == "".join(expected_command), word
+        assert position == expected_position, word
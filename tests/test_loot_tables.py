@@ -0,0 +1,40 @@
+"""
+Tests that books written as loot tables are valid JSON holding each book's pages, title and author, and are given by
+the commands written in their place.
+"""
+
+import json
+
+import pytest
+
+from minecraft_book_generator import text_to_loot_table, text_to_pages
+from output_files import write_loot_tables
+
+
+def test_loot_tables_are_valid_json_with_every_page(mc_version, texts):
+    for text in texts:
+        loot_table = json.loads(text_to_loot_table(text, 'A "quoted" \\ title', "A'uthor", mc_version))
+        (entry,) = loot_table["pools"][0]["entries"]
+        assert entry["name"] == "minecraft:written_book"
+        pages_function, cover_function = entry["functions"]
+        assert pages_function["function"] == "minecraft:set_written_book_pages"
+        assert pages_function["pages"] == text_to_pages(text, mc_version)
+        assert cover_function == {
+            "function": "minecraft:set_book_cover",
+            "title": 'A "quoted" \\ title',
+            "author": "A'uthor",
+        }
+
+
+def test_loot_tables_need_a_recent_version():
+    with pytest.raises(ValueError):
+        text_to_loot_table("text", "T", "A", "1.20.4")
+
+
+def test_loot_tables_are_written_and_given(mc_version, texts, tmp_path):
+    loot_tables = [text_to_loot_table(text, "T", "A", mc_version) for text in texts]
+    folder = tmp_path / "data" / "books" / "loot_table"
+    commands = list(write_loot_tables(loot_tables, str(folder), "makebook", "books"))
+    assert commands == [f"loot give @p loot books:makebook_{book_num}" for book_num in range(1, len(texts) + 1)]
+    for book_num, loot_table in enumerate(loot_tables, 1):
+        assert (folder / f"makebook_{book_num}.json").read_text(encoding="utf-8") == loot_table
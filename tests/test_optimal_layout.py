@@ -0,0 +1,19 @@
+"""
+Tests that the optimal layout never uses more pages than the greedy one.
+"""
+
+from minecraft_book_generator import get_version_profile, lay_out_pages
+
+# paragraphs of every length, so many pages could end between paragraphs by ending a few lines early
+PARAGRAPH_TEXT = "\n\n".join("word " * (length * 7 % 60 + 1) + "end." for length in range(300))
+
+
+def test_optimal_layout_never_uses_more_pages_than_greedy(mc_version, texts):
+    escape = get_version_profile(mc_version)[2]
+    for text in texts + [PARAGRAPH_TEXT]:
+        assert len(lay_out_pages(text, escape, layout="optimal")) <= len(lay_out_pages(text, escape))
+
+
+def test_optimal_layout_changes_where_pages_end(mc_version):
+    escape = get_version_profile(mc_version)[2]
+    assert lay_out_pages(PARAGRAPH_TEXT, escape, layout="optimal") != lay_out_pages(PARAGRAPH_TEXT, escape)
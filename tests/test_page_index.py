@@ -0,0 +1,40 @@
+"""
+Tests that the page index's byte ranges slice every command and every page back out of the output file, and that
+each book's pages come from consecutive ranges of its text.
+"""
+
+import json
+
+from minecraft_book_generator import get_version_profile, lay_out_pages, quote_page
+
+
+def test_page_index_slices_back_to_every_page(mc_version, texts, run_generator, tmp_path):
+    run_generator(tmp_path / "makebook.mcfunction", "-mcv", mc_version, "--page-index", str(tmp_path / "index.json"))
+    output = (tmp_path / "makebook.mcfunction").read_bytes()
+    with open(tmp_path / "index.json", "r", encoding="utf-8") as file:
+        page_index = json.load(file)
+    assert page_index["output"] == str(tmp_path / "makebook.mcfunction")
+
+    # every command, one per line
+    command_ranges = [book["command"] for book in page_index["books"]]
+    assert [output[start:end] for start, end in command_ranges] == output.splitlines()
+    assert [start for start, _ in command_ranges] == [0] + [end + 1 for _, end in command_ranges[:-1]]
+
+    # every page, in order, inside its command and separated by commas (each book's text is stripped when it's read)
+    _, _, escape, page_quotes = get_version_profile(mc_version)
+    expected_pages = [
+        quote_page(page, escape, page_quotes) for text in texts for page in lay_out_pages(text.strip(), escape)
+    ]
+    indexed_pages = []
+    for book in page_index["books"]:
+        command_start, command_end = book["command"]
+        page_ranges = [page["bytes"] for page in book["pages"]]
+        assert command_start < page_ranges[0][0] and page_ranges[-1][1] < command_end
+        for (_, end), (next_start, _) in zip(page_ranges, page_ranges[1:]):
+            assert output[end:next_start] == b","
+        indexed_pages += [output[start:end].decode("utf-8") for start, end in page_ranges]
+
+        text_ranges = [page["text"] for page in book["pages"]]
+        assert all(start <= end for start, end in text_ranges)
+        assert [start for start, _ in text_ranges[1:]] == [end for _, end in text_ranges[:-1]]
+    assert indexed_pages == expected_pages
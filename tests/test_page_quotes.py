@@ -0,0 +1,66 @@
+"""
+Tests that pages quoted in whichever quote makes them shortest read back, the way Minecraft parses them, as exactly
+the pages they were laid out as.
+"""
+
+import json
+
+import pytest
+from packaging.version import Version
+
+from minecraft_book_generator import get_version_profile, text_to_book, text_to_pages
+
+# the escapes Minecraft reads in a quoted string, and the versions that read them
+SNBT_ESCAPES = {"\\": "\\", "'": "'", '"': '"'}
+SNBT_NEWLINE_MIN_VERSION = "1.21"
+
+
+def read_quoted_pages(command: str, mc_version: str) -> list[str]:
+    # read each quoted string in the command's list of pages, like Minecraft's SNBT parser does
+    command_start, command_end = get_version_profile(mc_version)[:2]
+    assert command.startswith(command_start)
+    escapes = dict(SNBT_ESCAPES, **({"n": "\n"} if Version(mc_version) >= Version(SNBT_NEWLINE_MIN_VERSION) else {}))
+
+    quoted_pages = []
+    position = len(command_start)
+    while command[position] != "]":
+        quote = command[position]
+        assert quote in "'\""
+        page = []
+        position += 1
+        while command[position] != quote:
+            if command[position] == "\\":
+                position += 1
+                page.append(escapes[command[position]])
+            else:
+                page.append(command[position])
+            position += 1
+        quoted_pages.append("".join(page))
+        position += 1
+        if command[position] == ",":
+            position += 1
+
+    assert command[position:] == command_end.replace("{BOOK_TITLE}", "T").replace("{BOOK_AUTHOR}", "A")
+    return quoted_pages
+
+
+def read_page(quoted_page: str, mc_version: str) -> str:
+    # pages are plain text from Minecraft 1.21, and JSON text components before that
+    if Version(mc_version) >= Version("1.21"):
+        return quoted_page
+    component = json.loads(quoted_page)
+    return component[0][0] if Version(mc_version) >= Version("1.20.5") else component["text"]
+
+
+@pytest.mark.parametrize("mc_version", ["1.21.5", "1.20.6", "1.19"])
+def test_quoted_pages_read_back_as_their_pages(mc_version, texts):
+    for text in texts + ["it's " * 300, '"quoted" ' * 300, "'\"" * 300]:
+        quoted_pages = read_quoted_pages(text_to_book(text, "T", "A", mc_version), mc_version)
+        assert [read_page(quoted_page, mc_version) for quoted_page in quoted_pages] == text_to_pages(text, mc_version)
+
+
+@pytest.mark.parametrize("mc_version", ["1.21.5", "1.20.6", "1.19"])
+def test_pages_are_quoted_in_the_quote_they_have_fewest_of(mc_version):
+    command_start = get_version_profile(mc_version)[0]
+    assert text_to_book("it's " * 10, "T", "A", mc_version).startswith(command_start + '"')
+    assert text_to_book('"quoted" ' * 10, "T", "A", mc_version).startswith(command_start + "'")
@@ -0,0 +1,47 @@
+"""
+Tests that laying a book out in several workers, split at its page ends, gives exactly the same pages as laying it
+out in one piece.
+"""
+
+import sys
+import threading
+
+import pytest
+
+import minecraft_book_generator
+from minecraft_book_generator import get_version_profile, get_worker_context, lay_out_pages, text_to_book
+
+# a book with page ends in every kind of place: between paragraphs, inside words and lines, and next to each other
+PAGE_END_TEXT = ('para "quoted" \\ ' * 200 + "\n\n{PAGE_END}\n") * 20 + "x{PAGE_END}y {PAGE_END}{PAGE_END} {PAGE_END}\n"
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # split even short texts, so every text with page ends is laid out in pieces
+    monkeypatch.setattr(minecraft_book_generator, "PARALLEL_CHUNK_MIN_LENGTH", 50)
+
+
+@pytest.mark.parametrize("layout", ["greedy", "optimal"])
+def test_parallel_layout_matches_serial(mc_version, texts, layout):
+    escape = get_version_profile(mc_version)[2]
+    for text in texts + [PAGE_END_TEXT]:
+        expected_pages = lay_out_pages(text, escape, layout=layout)
+        assert lay_out_pages(text, escape, layout=layout, jobs=3, executor="thread") == expected_pages
+
+
+def test_parallel_books_in_processes_match_serial(mc_version, texts):
+    for text in [PAGE_END_TEXT] + [text for text in texts if "{PAGE_END}" in text][:3]:
+        assert text_to_book(text, "T", "A", mc_version, jobs=2) == text_to_book(text, "T", "A", mc_version)
+
+
+def test_workers_are_not_forked_while_other_threads_run():
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        assert get_worker_context().get_start_method() != "fork"
+    finally:
+        stop.set()
+        thread.join()
+    if sys.platform == "linux":
+        assert get_worker_context().get_start_method() == "fork"
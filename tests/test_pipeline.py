@@ -0,0 +1,37 @@
+"""
+Tests that reading and writing on threads of their own (`--pipeline`) gives output byte for byte identical to
+converting one book after another.
+"""
+
+import pytest
+
+import minecraft_book_generator
+from CONSTANTS import BOOK_END
+from minecraft_book_generator import iter_books_from_file, iter_books_pipelined
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 16])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_pipelined_books_match_serial(mc_version, texts, tmp_path, monkeypatch, read_size, jobs):
+    # small reads split documents, and the marks between them, across blocks
+    monkeypatch.setattr(minecraft_book_generator, "PIPELINE_READ_SIZE", read_size)
+    input_file = tmp_path / "books.txt"
+    input_file.write_text(BOOK_END.join(texts), encoding="utf-8")
+    serial_books = list(iter_books_from_file(str(input_file), "T", "A", mc_version=mc_version))
+    pipelined_books = list(iter_books_pipelined(str(input_file), "T", "A", mc_version=mc_version, jobs=jobs))
+    assert pipelined_books == serial_books
+
+
+@pytest.mark.parametrize("args", [[], ["--jobs", "2"], ["--container", "chest"], ["--layout", "optimal"]])
+def test_pipelined_output_is_identical_to_serial(mc_version, run_generator, tmp_path, args):
+    run_generator(tmp_path / "serial.mcfunction", "-mcv", mc_version, *args)
+    run_generator(tmp_path / "pipelined.mcfunction", "-mcv", mc_version, "--pipeline", *args)
+    assert (tmp_path / "pipelined.mcfunction").read_bytes() == (tmp_path / "serial.mcfunction").read_bytes()
+
+
+def test_pipelined_page_index_is_identical_to_serial(mc_version, run_generator, tmp_path):
+    run_generator(tmp_path / "makebook.mcfunction", "-mcv", mc_version, "--page-index", "serial.json")
+    serial_output = (tmp_path / "makebook.mcfunction").read_bytes()
+    run_generator(tmp_path / "makebook.mcfunction", "-mcv", mc_version, "--page-index", "pipelined.json", "--pipeline")
+    assert (tmp_path / "makebook.mcfunction").read_bytes() == serial_output
+    assert (tmp_path / "pipelined.json").read_bytes() == (tmp_path / "serial.json").read_bytes()
@@ -0,0 +1,44 @@
+"""
+Tests that laying a book out again from its first changed page gives exactly the same pages as laying out the edited
+text from scratch.
+"""
+
+import random
+
+from minecraft_book_generator import get_version_profile, lay_out_pages, relay_out_pages, text_to_book
+
+EDITS = ["a", " ", "\n", "\n\n", "'", '"', "\\", "word ", "中", "x" * 40, "\\" * 30, "{PAGE_END}"]
+
+
+def edit(text: str, rng: random.Random) -> str:
+    """
+    Replace a few random spans of a text with a few random pieces.
+    """
+
+    for _ in range(rng.randint(1, 3)):
+        start = rng.randint(0, len(text))
+        stop = min(len(text), start + rng.randint(0, 30))
+        text = text[:start] + "".join(rng.choice(EDITS) for _ in range(rng.randint(0, 8))) + text[stop:]
+    return text
+
+
+def test_relayout_matches_full_layout(mc_version, texts):
+    escape = get_version_profile(mc_version)[2]
+    rng = random.Random(2)
+    for text in texts:
+        layout_record = {}
+        for _ in range(5):
+            assert relay_out_pages(text, escape, layout_record) == lay_out_pages(text, escape)
+            text = edit(text, rng)
+
+
+def test_books_converted_with_a_layout_record_match(mc_version, texts):
+    rng = random.Random(3)
+    layout_record = {}
+    for text in texts:
+        for _ in range(2):
+            edited_text = edit(text, rng)
+            assert text_to_book(edited_text, "T", "A", mc_version, layout_record=layout_record) == text_to_book(
+                edited_text, "T", "A", mc_version
+            )
+            text = edited_text
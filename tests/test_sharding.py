@@ -0,0 +1,58 @@
+"""
+Tests that sharded function files hold every command in order, within their limits, are run by the right ids from
+the index function, and are only rewritten when their commands change.
+"""
+
+import pytest
+
+from minecraft_book_generator import text_to_book
+from output_files import write_sharded_functions
+
+
+@pytest.fixture
+def commands(mc_version, texts):
+    return [text_to_book(text, "T", "A", mc_version) for text in texts]
+
+
+def read_shards(index_file, namespace):
+    # run each function the index runs, by finding its file from its id
+    function_folder = index_file.parent
+    while function_folder.name != "function":
+        function_folder = function_folder.parent
+    shards = []
+    for line in index_file.read_text(encoding="utf-8").splitlines():
+        command, function_id = line.split(" ")
+        assert command == "function"
+        assert function_id.startswith(f"{namespace}:")
+        shard_file = function_folder / f"{function_id.removeprefix(f'{namespace}:')}.mcfunction"
+        shards.append(shard_file.read_text(encoding="utf-8").splitlines())
+    return shards
+
+
+@pytest.mark.parametrize("subfolder", ["", "library", "library/old"])
+@pytest.mark.parametrize("max_books, max_bytes", [(1, None), (7, None), (None, 50_000), (None, 1)])
+def test_shards_hold_every_command_and_are_run_by_their_ids(commands, tmp_path, subfolder, max_books, max_bytes):
+    index_file = tmp_path / "data" / "books" / "function" / subfolder / "makebook.mcfunction"
+    num_shards, num_written = write_sharded_functions(commands, str(index_file), "books", max_books, max_bytes)
+    shards = read_shards(index_file, "books")
+    assert num_shards == num_written == len(shards)
+    assert [command for shard in shards for command in shard] == commands
+    for shard in shards:
+        if max_books is not None:
+            assert len(shard) <= max_books
+        if max_bytes is not None and len(shard) > 1:
+            assert sum(len(f"{command}\n".encode("utf-8")) for command in shard) <= max_bytes
+
+
+def test_unchanged_shards_are_not_rewritten(commands, tmp_path):
+    index_file = tmp_path / "function" / "makebook.mcfunction"
+    assert write_sharded_functions(commands, str(index_file), "books", 5) == (9, 9)
+    assert write_sharded_functions(commands, str(index_file), "books", 5) == (9, 0)
+
+    # changing one book only rewrites its shard, and shards left over from the longer run are deleted
+    changed_commands = commands[:12] + ["say changed"] + commands[13:30]
+    assert write_sharded_functions(changed_commands, str(index_file), "books", 5) == (6, 1)
+    assert sorted(path.name for path in index_file.parent.iterdir()) == sorted(
+        ["makebook.mcfunction"] + [f"makebook_{shard_num}.mcfunction" for shard_num in range(1, 7)]
+    )
+    assert [command for shard in read_shards(index_file, "books") for command in shard] == changed_commands
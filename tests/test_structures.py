@@ -0,0 +1,132 @@
+"""
+Tests that structure files of books are valid NBT, read back the way Minecraft reads them, with every string in
+modified UTF-8.
+"""
+
+import gzip
+import json
+import struct
+
+import pytest
+from packaging.version import Version
+
+from CONSTANTS import CONTAINER_PROPERTIES, CONTAINER_SIZE, DATA_VERSIONS
+from minecraft_book_generator import get_command_by_version, text_to_book_nbt, text_to_pages
+from nbt_writer import STRUCTURE_ROW_LENGTH, encode_string, write_book_structure
+
+# text with the characters modified UTF-8 encodes differently from UTF-8
+SPECIAL_TEXT = "nul \0 emoji \U0001f600 bmp 中 \uffff end"
+
+
+def decode_string(data: bytes) -> str:
+    # like Java's DataInput.readUTF: nulls are two bytes, and characters outside the BMP are surrogate pairs
+    assert b"\x00" not in data
+    utf16 = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+    return utf16.encode("utf-16-be", "surrogatepass").decode("utf-16-be")
+
+
+def read_tag(data: bytes, position: int, tag_type: int):
+    # read a tag's value, returning it and where it ends
+    if tag_type == 1:
+        return struct.unpack_from(">b", data, position)[0], position + 1
+    if tag_type == 3:
+        return struct.unpack_from(">i", data, position)[0], position + 4
+    if tag_type == 8:
+        (length,) = struct.unpack_from(">H", data, position)
+        return decode_string(data[position + 2 : position + 2 + length]), position + 2 + length
+    if tag_type == 9:
+        element_type, length = struct.unpack_from(">bi", data, position)
+        position += 5
+        assert element_type != 0 or length == 0
+        elements = []
+        for _ in range(length):
+            element, position = read_tag(data, position, element_type)
+            elements.append(element)
+        return elements, position
+    if tag_type == 10:
+        compound = {}
+        while (child_type := data[position]) != 0:
+            name, position = read_tag(data, position + 1, 8)
+            assert name not in compound
+            compound[name], position = read_tag(data, position, child_type)
+        return compound, position + 1
+    raise AssertionError(f"unexpected tag type {tag_type}")
+
+
+def read_structure(path) -> dict:
+    data = gzip.decompress(path.read_bytes())
+    assert data[0] == 10
+    name, position = read_tag(data, 1, 8)
+    assert name == ""
+    structure, position = read_tag(data, position, 10)
+    assert position == len(data)
+    return structure
+
+
+@pytest.mark.parametrize(
+    "value, encoded",
+    [
+        ("", b""),
+        ("ascii", b"ascii"),
+        ("\0", b"\xc0\x80"),
+        ("中", "中".encode("utf-8")),
+        ("\U0001f600", b"\xed\xa0\xbd\xed\xb8\x80"),
+        ("a\0\U0010ffff", b"a\xc0\x80\xed\xaf\xbf\xed\xbf\xbf"),
+    ],
+)
+def test_strings_are_modified_utf8(value, encoded):
+    assert encode_string(value) == struct.pack(">H", len(encoded)) + encoded
+    assert decode_string(encoded) == value
+
+
+def test_strings_too_long_for_nbt_are_rejected():
+    with pytest.raises(ValueError):
+        encode_string("中" * 30000)
+
+
+@pytest.mark.filterwarnings("ignore::minecraft_book_generator.UnrecognizedCharacterWarning")
+@pytest.mark.parametrize("mc_version", ["1.21.5", "1.20.5", "1.19"])
+def test_structures_are_valid_nbt_holding_every_book(mc_version, texts, tmp_path):
+    book_texts = texts + [SPECIAL_TEXT]
+    path = tmp_path / "books.nbt"
+    book_items = (text_to_book_nbt(text, "T \0 \U0001f600", "A", mc_version) for text in book_texts)
+    data_version = get_command_by_version(DATA_VERSIONS, mc_version)
+    num_containers = write_book_structure(
+        book_items, str(path), data_version, "chest", CONTAINER_PROPERTIES["chest"], CONTAINER_SIZE
+    )
+    assert num_containers == -(-len(book_texts) // CONTAINER_SIZE)
+
+    structure = read_structure(path)
+    assert structure["DataVersion"] == data_version
+    assert structure["size"] == [
+        min(num_containers, STRUCTURE_ROW_LENGTH),
+        1,
+        -(-num_containers // STRUCTURE_ROW_LENGTH),
+    ]
+    assert structure["palette"] == [{"Name": "minecraft:chest", "Properties": CONTAINER_PROPERTIES["chest"]}]
+    assert structure["entities"] == []
+    assert len(structure["blocks"]) == num_containers
+
+    items = []
+    for container_num, block in enumerate(structure["blocks"]):
+        assert block["pos"] == [container_num % STRUCTURE_ROW_LENGTH, 0, container_num // STRUCTURE_ROW_LENGTH]
+        assert block["state"] == 0
+        assert block["nbt"]["id"] == "minecraft:chest"
+        assert [item["Slot"] for item in block["nbt"]["Items"]] == list(range(len(block["nbt"]["Items"])))
+        items += block["nbt"]["Items"]
+
+    assert len(items) == len(book_texts)
+    for item, text in zip(items, book_texts):
+        assert item["id"] == "minecraft:written_book"
+        book = item["components"]["minecraft:written_book_content"] if "components" in item else item["tag"]
+        assert book["title"] == "T \0 \U0001f600"
+        assert book["author"] == "A"
+
+        # pages are plain text from Minecraft 1.21, and JSON text components before that
+        pages = text_to_pages(text, mc_version)
+        if Version(mc_version) >= Version("1.21"):
+            assert book["pages"] == pages
+        elif Version(mc_version) >= Version("1.20.5"):
+            assert [json.loads(page) for page in book["pages"]] == [[[page]] for page in pages]
+        else:
+            assert [json.loads(page) for page in book["pages"]] == [{"text": page} for page in pages]
@@ -0,0 +1,39 @@
+"""
+Tests that converting books in threads gives exactly the same books as converting them one at a time.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from CONSTANTS import BOOK_END
+from minecraft_book_generator import PIXEL_WIDTHS, iter_books_from_file, text_to_book
+from width_table import FrozenWidthTable
+
+
+def test_thread_jobs_match_serial(mc_version, texts, tmp_path):
+    input_file = tmp_path / "books.txt"
+    input_file.write_text(BOOK_END.join(texts), encoding="utf-8")
+    serial_books = list(iter_books_from_file(str(input_file), "T", "A", mc_version=mc_version))
+    thread_books = list(
+        iter_books_from_file(str(input_file), "T", "A", mc_version=mc_version, jobs=3, executor="thread")
+    )
+    assert thread_books == serial_books
+
+
+@pytest.mark.parametrize("engine", ["default", "translate"])
+def test_threads_building_lookup_tables_at_once_match_serial(mc_version, texts, engine):
+    # a new width table has none of its lookup tables built yet, so the threads all build them at once
+    pixel_widths = FrozenWidthTable(PIXEL_WIDTHS)
+    with ThreadPoolExecutor(8) as workers:
+        thread_books = list(
+            workers.map(lambda text: text_to_book(text, "T", "A", mc_version, pixel_widths, engine), texts)
+        )
+    assert thread_books == [text_to_book(text, "T", "A", mc_version, PIXEL_WIDTHS, engine) for text in texts]
+
+
+def test_width_tables_cannot_be_changed():
+    with pytest.raises(TypeError):
+        PIXEL_WIDTHS["a"] = 1
+    with pytest.raises(TypeError):
+        PIXEL_WIDTHS.update({"a": 1})
@@ -0,0 +1,44 @@
+"""
+Tests that a text too long for one book is split into volumes holding all of its pages in order, titled with their
+numbers within Minecraft's title length limit.
+"""
+
+import pytest
+
+from CONSTANTS import BOOK_MAX_TITLE_LENGTH
+from minecraft_book_generator import get_version_profile, get_volume_title, lay_out_pages, text_to_volumes
+
+
+@pytest.mark.parametrize("max_pages", [1, 3, 100])
+def test_volumes_hold_every_page_in_order(mc_version, texts, max_pages):
+    escape = get_version_profile(mc_version)[2]
+    for text in texts:
+        layout_record = {}
+        books = text_to_volumes(text, "T", "A", mc_version, layout_record=layout_record, max_pages=max_pages)
+        num_pages = len(lay_out_pages(text, escape))
+        assert len(books) == len(layout_record["volume_sizes"]) == -(-num_pages // max_pages)
+        assert layout_record["volume_sizes"] == [max_pages] * (len(books) - 1) + [
+            num_pages - max_pages * (len(books) - 1)
+        ]
+
+
+def test_volumes_are_titled_with_their_numbers(mc_version, texts):
+    text = max(texts, key=len)
+    books = text_to_volumes(text, "Title", "A", mc_version, max_pages=2)
+    assert len(books) > 1
+    for volume_num, book in enumerate(books, 1):
+        assert f'title:"Title (Vol. {volume_num})"' in book
+    assert 'title:"Title"' in text_to_volumes(text, "Title", "A", mc_version, max_pages=len(books) * 2)[0]
+
+
+@pytest.mark.parametrize(
+    "title", ["", "Short", "A title exactly 21 ch", "A very long title that doesn't fit in one book"]
+)
+@pytest.mark.parametrize("volume_num", [1, 9, 10, 99, 100, 12345])
+def test_volume_titles_fit_the_title_limit(title, volume_num):
+    volume_title = get_volume_title(title, volume_num)
+    assert len(volume_title) <= BOOK_MAX_TITLE_LENGTH
+    assert volume_title.endswith(f"(Vol. {volume_num})")
+    assert title.startswith(volume_title.removesuffix(f"(Vol. {volume_num})").strip())
+    if len(f"{title} (Vol. {volume_num})") <= BOOK_MAX_TITLE_LENGTH:
+        assert volume_title == f"{title} (Vol. {volume_num})".strip()
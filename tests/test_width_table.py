@@ -0,0 +1,55 @@
+"""
+Tests that width tables measured from Minecraft font assets are written to and read back from binary width tables
+unchanged.
+"""
+
+import json
+import struct
+import zlib
+
+from generate_width_table import PNG_SIGNATURE, AssetSource, font_widths
+from minecraft_book_generator import PIXEL_WIDTHS
+from width_table import read_width_table, write_width_table
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data))
+
+
+def write_png(path, rows: list[bytes]):
+    # an RGBA image, with each pixel opaque where its row has a 1
+    raw = b"".join(b"\0" + bytes(255 if pixel == ord("1") else 0 for pixel in row for _ in range(4)) for row in rows)
+    header = struct.pack(">IIBBBBB", len(rows[0]), len(rows), 8, 6, 0, 0, 0)
+    path.write_bytes(
+        PNG_SIGNATURE + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", zlib.compress(raw)) + png_chunk(b"IEND", b"")
+    )
+
+
+def test_builtin_width_table_round_trips(tmp_path):
+    write_width_table(PIXEL_WIDTHS, str(tmp_path / "pixel_widths.bin"))
+
+    # keys that aren't a single character (like the empty string) can't be looked up, so aren't written
+    assert read_width_table(str(tmp_path / "pixel_widths.bin")) == {
+        character: width for character, width in PIXEL_WIDTHS.items() if len(character) == 1
+    }
+
+
+def test_generated_width_table_round_trips(tmp_path):
+    font_folder = tmp_path / "pack" / "assets" / "minecraft" / "font"
+    texture_folder = tmp_path / "pack" / "assets" / "minecraft" / "textures" / "font"
+    font_folder.mkdir(parents=True)
+    texture_folder.mkdir(parents=True)
+
+    # two rows of 4 by 2 pixel glyphs, with the first cell of the second row left empty
+    write_png(texture_folder / "glyphs.png", [b"11000111", b"11000111", b"00001000", b"00000010"])
+    providers = [
+        {"type": "space", "advances": {" ": 4, "\u200c": 0, "\U0001f600": 10}},
+        {"type": "bitmap", "file": "minecraft:font/glyphs.png", "height": 2, "chars": ["ab", "\0c"]},
+    ]
+    (font_folder / "default.json").write_text(json.dumps({"providers": providers}), encoding="utf-8")
+
+    widths = font_widths("minecraft:default", AssetSource([str(tmp_path / "pack")]))
+    assert widths == {" ": 3, "\u200c": -1, "\U0001f600": 9, "a": 2, "b": 4, "c": 3}
+
+    write_width_table(widths, str(tmp_path / "pixel_widths.bin"))
+    assert read_width_table(str(tmp_path / "pixel_widths.bin")) == widths
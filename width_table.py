@@ -0,0 +1,178 @@
+"""
+Reads and writes compact binary character width tables.
+
+A width table holds the same information as `PIXEL_WIDTHS` (the pixel width of every
+character Minecraft can render) but stores it as runs of consecutive codepoints sharing
+a width, so a full table for every Unicode character fits in a few kilobytes and loads
+without importing a 25,000 line Python module.
+
+File layout (little-endian):
+    4 bytes     magic, b"MCPW"
+    1 byte      format version
+    4 bytes     number of runs
+    7 bytes     per run: first codepoint (u32), run length (u16), pixel width (i8)
+
+Resource packs that replace glyphs only change a handful of widths, so their tables can be
+layered over a base table (like `PIXEL_WIDTHS`) without copying it.
+
+Width tables are read as `FrozenWidthTable`s, which can't be changed once they're made, so one
+table can be shared by every thread converting books at once.
+"""
+
+import json
+import struct
+from collections import ChainMap
+
+WIDTH_TABLE_MAGIC = b"MCPW"
+WIDTH_TABLE_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sBI")
+_RUN = struct.Struct("<IHb")
+_MAX_RUN_LENGTH = 0xFFFF
+
+
+class FrozenWidthTable(dict):
+    """
+    A dictionary of character pixel widths that can't be changed once it's made.
+
+    The lookup tables built from a width table are cached by its identity, and any number of threads can lay
+    out books with the same table at once, which both rely on the table never changing. Looking up widths is
+    exactly as fast as in a dictionary.
+    """
+
+    def _refuse_change(self, *args, **kwargs):
+        raise TypeError("Width tables can't be changed; copy one with dict() to make a changed version.")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _refuse_change
+
+    def __reduce__(self):
+        # pickle (to send to worker processes) without setting each item
+        return type(self), (dict(self),)
+
+
+def write_width_table(widths: dict[str, int], path: str) -> None:
+    """
+    Write a dictionary of character pixel widths to a binary width table file.
+
+    Parameters
+    ----------
+    widths: dict[str, int]
+        The pixel width of each character, in the same form as `PIXEL_WIDTHS`.
+
+    path: str
+        The name of the file to write the width table to.
+    """
+
+    # malformed keys (anything that isn't a single character) can't be looked up anyway
+    codepoints = sorted((ord(character), width) for character, width in widths.items() if len(character) == 1)
+
+    runs: list[list[int]] = []
+    for codepoint, width in codepoints:
+
+        # extend the previous run if this codepoint directly follows it with the same width
+        if runs and runs[-1][0] + runs[-1][1] == codepoint and runs[-1][2] == width and runs[-1][1] < _MAX_RUN_LENGTH:
+            runs[-1][1] += 1
+        else:
+            runs.append([codepoint, 1, width])
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(WIDTH_TABLE_MAGIC, WIDTH_TABLE_FORMAT_VERSION, len(runs)))
+        for run in runs:
+            file.write(_RUN.pack(*run))
+
+
+def read_width_table(path: str) -> FrozenWidthTable:
+    """
+    Read a binary width table file into a dictionary of character pixel widths.
+
+    Parameters
+    ----------
+    path: str
+        The name of the width table file to read.
+
+    Returns
+    -------
+    FrozenWidthTable
+        The pixel width of each character, in the same form as `PIXEL_WIDTHS`.
+    """
+
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a width table.")
+    magic, format_version, num_runs = _HEADER.unpack_from(data)
+    if magic != WIDTH_TABLE_MAGIC:
+        raise ValueError(f"{path} is not a width table.")
+    if format_version != WIDTH_TABLE_FORMAT_VERSION:
+        raise ValueError(f"{path} uses unsupported width table format version {format_version}.")
+    if len(data) != _HEADER.size + num_runs * _RUN.size:
+        raise ValueError(f"{path} is truncated or has trailing data.")
+
+    widths = FrozenWidthTable()
+    for first_codepoint, length, width in _RUN.iter_unpack(data[_HEADER.size :]):
+        dict.update(widths, dict.fromkeys(map(chr, range(first_codepoint, first_codepoint + length)), width))
+
+    return widths
+
+
+def read_width_overlay(path: str) -> dict[str, int]:
+    """
+    Read the character widths a resource pack overrides.
+
+    Parameters
+    ----------
+    path: str
+        Either a binary width table (like one `generate_width_table.py` makes from a resource pack) or
+        a JSON object mapping characters (or `U+XXXX` codepoints) to pixel widths.
+
+    Returns
+    -------
+    dict[str, int]
+        The pixel width of each overridden character.
+    """
+
+    if not path.endswith(".json"):
+        return read_width_table(path)
+
+    with open(path, "r", encoding="utf-8") as file:
+        overrides = json.load(file)
+
+    widths: dict[str, int] = {}
+    for character, width in overrides.items():
+        if character.upper().startswith("U+") and len(character) > 2:
+            character = chr(int(character[2:], 16))
+        if len(character) != 1:
+            raise ValueError(f"{path}: {character!r} is not a single character or U+XXXX codepoint.")
+        widths[character] = int(width)
+
+    return widths
+
+
+def layer_width_tables(base: dict[str, int], overlays: list[dict[str, int]]) -> ChainMap:
+    """
+    Layer resource pack width overrides on top of a base width table.
+
+    The overrides are merged into one small dictionary in front of the base table, so every
+    lookup checks at most two dictionaries no matter how many packs are loaded, and the base
+    table is shared rather than copied.
+
+    Parameters
+    ----------
+    base: dict[str, int]
+        The width table to fall back on for characters no pack overrides.
+
+    overlays: list[dict[str, int]]
+        The width overrides of each resource pack, highest priority first.
+
+    Returns
+    -------
+    ChainMap
+        A read-through mapping of every character's pixel width, which can't be changed.
+    """
+
+    merged: dict[str, int] = {}
+    for overlay in reversed(overlays):
+        merged.update(overlay)
+
+    return ChainMap(FrozenWidthTable(merged), base)